@@ -1,11 +1,19 @@
 import os
 import re
+import click
 from markupsafe import Markup, escape
 from flask import Flask, render_template, g
 from sqlalchemy import inspect, text
-from models import db, Project, Task, Person, Team, Milestone, Workspace
+from models import db, Project, Task, Person, Team, Milestone, Workspace, refresh_milestone_statuses
 from flask import url_for as flask_url_for
 from routes import register_blueprints
+from search import ensure_search_index
+from cloning import clone_workspace
+from dependency_graph import ensure_schedule_triggers
+from deletion import note_request, purge_deleted, start_purger, start_workspace_deletion
+from memberships import member_counts
+from request_timing import RequestTiming
+from roster import load_roster
 from datetime import date
 
 try:
@@ -16,6 +24,7 @@ except ModuleNotFoundError:
             return None
 
 migrate = Migrate()
+request_timing = RequestTiming()
 
 
 def create_app(test_config=None):
@@ -30,6 +39,7 @@ def create_app(test_config=None):
 
     db.init_app(app)
     migrate.init_app(app, db)
+    request_timing.init_app(app)
 
     with app.app_context():
         db.create_all()
@@ -37,6 +47,61 @@ def create_app(test_config=None):
 
     register_blueprints(app)
 
+    # Milestone.status depends on today's date, so recompute it once per day
+    # per process (and on demand via `flask refresh-milestones` from cron).
+    milestones_refreshed_on = {'date': None}
+
+    @app.before_request
+    def refresh_milestones_daily():
+        today = date.today()
+        if milestones_refreshed_on['date'] != today:
+            refresh_milestone_statuses(today=today)
+            db.session.commit()
+            milestones_refreshed_on['date'] = today
+
+    # Soft-deleted rows are purged by a background thread that backs off
+    # while requests are coming in (and on demand via `flask purge-deleted`).
+    @app.before_request
+    def schedule_purge():
+        note_request()
+        if app.config.get('PURGE_DELETED_IN_BACKGROUND', True):
+            start_purger(app)
+
+    @app.cli.command('refresh-milestones')
+    def refresh_milestones_command():
+        """Recompute every milestone's stored status for today."""
+        changed = refresh_milestone_statuses()
+        db.session.commit()
+        print(f'Updated {changed} milestone(s).')
+
+    @app.cli.command('delete-workspaces')
+    def delete_workspaces_command():
+        """Finish deleting workspaces whose background deletion was interrupted."""
+        for workspace in Workspace.query.filter(Workspace.deleting_at.isnot(None)).all():
+            progress = start_workspace_deletion(workspace, background=False)
+            print(f'Deleted workspace {workspace.id} ({progress.deleted} rows).')
+
+    @app.cli.command('clone-workspace')
+    @click.argument('source_slug')
+    @click.argument('slug')
+    @click.option('--name', help='Name of the new workspace (defaults to the slug).')
+    @click.option('--days', type=int, default=0, help='Move every date by this many days.')
+    def clone_workspace_command(source_slug, slug, name, days):
+        """Create workspace SLUG as a copy of SOURCE_SLUG, e.g. from a template."""
+        source = Workspace.query.filter_by(slug=source_slug, deleting_at=None).first()
+        if source is None:
+            raise click.ClickException(f'No workspace "{source_slug}".')
+        if Workspace.query.filter_by(slug=slug).first():
+            raise click.ClickException(f'The slug "{slug}" is already taken.')
+        _, counts = clone_workspace(source, name or slug, slug, days=days)
+        db.session.commit()
+        print(f'Created workspace {slug}: ' + ', '.join(f'{n} {kind}' for kind, n in counts.items()))
+
+    @app.cli.command('purge-deleted')
+    def purge_deleted_command():
+        """Permanently remove soft-deleted rows whose undo window has passed."""
+        print(f'Purged {purge_deleted()} row(s).')
+
     @app.context_processor
     def inject_branding():
         return {
@@ -46,7 +111,12 @@ def create_app(test_config=None):
 
     @app.after_request
     def add_no_cache_headers(response):
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+        # Responses with an ETag may be stored but must be revalidated;
+        # everything else is never stored.
+        if response.get_etag()[0]:
+            response.headers['Cache-Control'] = 'private, no-cache'
+        else:
+            response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
         return response
@@ -83,13 +153,13 @@ def create_app(test_config=None):
             safe_name = escape(name.strip())
             workspace = getattr(g, 'workspace', None)
             if workspace:
-                person = Person.query.filter_by(workspace_id=workspace.id).filter(
-                    Person.name.ilike(name.strip())
-                ).first()
+                # The cached roster resolves names without a query per mention.
+                person_id = load_roster(workspace).find(name.strip())
             else:
                 person = Person.query.filter(Person.name.ilike(name.strip())).first()
-            if person:
-                url = flask_url_for('people.detail', id=person.id,
+                person_id = person.id if person else None
+            if person_id:
+                url = flask_url_for('people.detail', id=person_id,
                                     workspace_slug=getattr(g, 'workspace_slug', None))
                 return f'<a href="{url}" class="mention-tag text-decoration-none">@{safe_name}</a>'
             return f'<span class="mention-tag">@{safe_name}</span>'
@@ -102,12 +172,13 @@ def create_app(test_config=None):
 
     @app.route('/')
     def index():
-        workspaces = Workspace.query.order_by(Workspace.name).all()
-        return render_template('landing.html', workspaces=workspaces)
+        workspaces = Workspace.query.filter_by(deleting_at=None).order_by(Workspace.name).all()
+        deleting = Workspace.query.filter(Workspace.deleting_at.isnot(None)).order_by(Workspace.name).all()
+        return render_template('landing.html', workspaces=workspaces, deleting=deleting)
 
     @app.route('/w/<workspace_slug>/')
     def workspace_dashboard(workspace_slug):
-        workspace = Workspace.query.filter_by(slug=workspace_slug).first_or_404()
+        workspace = Workspace.query.filter_by(slug=workspace_slug, deleting_at=None).first_or_404()
         g.workspace = workspace
         g.workspace_slug = workspace_slug
 
@@ -137,6 +208,7 @@ def create_app(test_config=None):
                                overdue_tasks=overdue_tasks,
                                total_people=total_people,
                                teams=teams,
+                               member_counts=member_counts(workspace.id),
                                recent_projects=recent_projects)
 
     return app
@@ -145,6 +217,47 @@ def create_app(test_config=None):
 def ensure_compatible_schema():
     """Apply tiny additive SQLite fixes for older local databases."""
     inspector = inspect(db.engine)
+    if ensure_search_index(db.session.connection()):
+        db.session.commit()
+    if 'workspace' in inspector.get_table_names():
+        if 'roster_version' not in {col['name'] for col in inspector.get_columns('workspace')}:
+            db.session.execute(text(
+                "ALTER TABLE workspace ADD COLUMN roster_version VARCHAR(32) NOT NULL DEFAULT '0'"
+            ))
+            db.session.execute(text('UPDATE workspace SET roster_version = lower(hex(randomblob(16)))'))
+            db.session.commit()
+        if 'deleting_at' not in {col['name'] for col in inspector.get_columns('workspace')}:
+            db.session.execute(text('ALTER TABLE workspace ADD COLUMN deleting_at DATETIME'))
+            db.session.commit()
+        if 'schedule_version' not in {col['name'] for col in inspector.get_columns('workspace')}:
+            db.session.execute(text(
+                "ALTER TABLE workspace ADD COLUMN schedule_version VARCHAR(32) NOT NULL DEFAULT '0'"
+            ))
+            db.session.execute(text('UPDATE workspace SET schedule_version = lower(hex(randomblob(16)))'))
+            db.session.commit()
+    for table in ('team', 'person', 'project', 'task'):
+        if table in inspector.get_table_names() and \
+                'deleted_at' not in {col['name'] for col in inspector.get_columns(table)}:
+            db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN deleted_at DATETIME'))
+            db.session.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table}_deleted_at ON {table} (deleted_at)'))
+            db.session.commit()
+    if 'milestone' in inspector.get_table_names():
+        if 'status' not in {col['name'] for col in inspector.get_columns('milestone')}:
+            db.session.execute(text(
+                "ALTER TABLE milestone ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'on_track'"
+            ))
+            db.session.execute(text('CREATE INDEX IF NOT EXISTS ix_milestone_status ON milestone (status)'))
+            refresh_milestone_statuses()
+            db.session.commit()
+    if 'task_dependency' in inspector.get_table_names():
+        ensure_schedule_triggers(db.session.connection())
+        db.session.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_task_dependency_task_id ON task_dependency (task_id)'
+        ))
+        db.session.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_task_dependency_depends_on_id ON task_dependency (depends_on_id)'
+        ))
+        db.session.commit()
     if 'status_update' not in inspector.get_table_names():
         return
 
@@ -152,6 +265,12 @@ def ensure_compatible_schema():
     if 'external_id' not in columns:
         db.session.execute(text('ALTER TABLE status_update ADD COLUMN external_id VARCHAR(255)'))
         db.session.commit()
+    if 'content_hash' not in columns:
+        db.session.execute(text('ALTER TABLE status_update ADD COLUMN content_hash VARCHAR(64)'))
+        db.session.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_status_update_content_hash ON status_update (content_hash)'
+        ))
+        db.session.commit()
 
 
 if __name__ == '__main__':
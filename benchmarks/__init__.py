@@ -0,0 +1 @@
+"""Endpoint benchmarks over synthetic workspaces; run with ``python -m benchmarks.run``."""
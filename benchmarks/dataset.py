@@ -0,0 +1,155 @@
+"""Synthetic workspaces for the endpoint benchmarks.
+
+build_workspace() fills a new workspace with roughly ``tasks`` tasks and
+the rows around them, drawn from a seeded random generator so the same
+arguments always give the same data:
+
+- one project per ~100 tasks, with skewed sizes (a few big projects),
+- one person per ~40 tasks in teams of ~8, a fifth of them in two teams,
+- a lead plus up to two more assignees per task, busy people picked more often,
+- dependencies on recent earlier tasks of the same project for about half the tasks,
+- a milestone on about a third of the tasks,
+- zero to eight status updates per task, some mentioning a person,
+- statuses that follow the dates: past tasks mostly done, current ones in progress.
+
+Rows are written with Core executemany inserts under precomputed ids.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from models import (db, Milestone, Person, Project, StatusUpdate, Tag, Task, TaskAssignment, TaskDependency,
+                    Team, Workspace, person_teams, refresh_milestone_statuses, status_update_mentions,
+                    status_update_fingerprint, task_tags)
+
+VERBS = ['Design', 'Review', 'Build', 'Migrate', 'Test', 'Document', 'Plan', 'Ship', 'Audit', 'Refactor']
+NOUNS = ['billing', 'onboarding', 'search', 'reports', 'mobile app', 'API', 'dashboard', 'exports',
+         'permissions', 'notifications', 'pricing page', 'data pipeline']
+FIRST_NAMES = ['Ana', 'Ben', 'Chloe', 'Dev', 'Elif', 'Farid', 'Greta', 'Hiro', 'Ines', 'Jonas', 'Kemi', 'Liam',
+               'Mara', 'Noor', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sven', 'Tara']
+LAST_NAMES = ['Adams', 'Borg', 'Costa', 'Diaz', 'Engel', 'Fox', 'Gupta', 'Hale', 'Ito', 'Jensen', 'Kim', 'Lund',
+              'Moreau', 'Nagy', 'Okafor', 'Park', 'Quist', 'Rossi', 'Silva', 'Tanaka']
+UPDATE_TEXTS = ['Started work, first draft up for review.', 'Blocked on feedback, following up tomorrow.',
+                'About halfway there.', 'Review comments addressed.', 'Done pending sign-off.',
+                'Scope changed, re-estimating.']
+TAG_NAMES = ['frontend', 'backend', 'infra', 'design', 'research', 'customer', 'security', 'performance',
+             'quick-win', 'tech-debt', 'q1', 'q2', 'q3', 'q4', 'launch', 'compliance', 'ops', 'growth',
+             'mobile', 'data']
+
+
+def _next_id(model) -> int:
+    return db.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar() + 1
+
+
+def _insert(table, rows: list[dict]) -> None:
+    if rows:
+        db.session.execute(table.insert(), rows)
+
+
+def build_workspace(slug: str, tasks: int, seed: int = 0) -> tuple[Workspace, dict[str, int]]:
+    """Create workspace ``slug`` with about ``tasks`` tasks; returns it with row counts per table."""
+    rng = random.Random(seed)
+    today = date.today()
+    workspace = Workspace(name=f'Benchmark {tasks}', slug=slug)
+    db.session.add(workspace)
+    db.session.flush()
+    ws = workspace.id
+
+    team_id, person_id, tag_id = _next_id(Team), _next_id(Person), _next_id(Tag)
+    project_id, task_id = _next_id(Project), _next_id(Task)
+    n_people = max(10, tasks // 40)
+    n_teams = max(2, n_people // 8)
+    n_projects = max(1, tasks // 100)
+
+    teams = [{'id': team_id + i, 'name': f'Team {i + 1}', 'workspace_id': ws} for i in range(n_teams)]
+    people = [{'id': person_id + i, 'workspace_id': ws,
+               'name': f'{FIRST_NAMES[i % 20]} {LAST_NAMES[i // 20 % 20]}' + (f' {i // 400 + 1}' if i >= 400 else ''),
+               'email': f'person{i}@example.com'} for i in range(n_people)]
+    memberships = set()
+    for i, person in enumerate(people):
+        memberships.add((person['id'], teams[i % n_teams]['id']))
+        if rng.random() < 0.2:
+            memberships.add((person['id'], rng.choice(teams)['id']))
+    tags = [{'id': tag_id + i, 'name': name, 'workspace_id': ws} for i, name in enumerate(TAG_NAMES)]
+
+    # Skewed project sizes and workloads: a few big projects, a few busy people.
+    project_weights = [rng.lognormvariate(0, 0.8) for _ in range(n_projects)]
+    person_weights = [1 / (rank + 1) ** 0.8 for rank in range(n_people)]
+    projects = []
+    for i in range(n_projects):
+        start = today - timedelta(days=rng.randint(0, 240))
+        projects.append({'id': project_id + i, 'workspace_id': ws, 'name': f'Project {i + 1}',
+                         'description': f'{rng.choice(VERBS)} the {rng.choice(NOUNS)}.',
+                         'start_date': start, 'end_date': start + timedelta(days=rng.randint(60, 360)),
+                         'status': rng.choices(['active', 'completed', 'on_hold'], [80, 12, 8])[0]})
+
+    task_rows, assignments, dependencies, milestones, updates, mentions, tag_links = [], [], [], [], [], [], []
+    project_tasks: dict[int, list[int]] = {}
+    update_id = _next_id(StatusUpdate)
+    for i, project in enumerate(rng.choices(projects, project_weights, k=tasks)):
+        tid = task_id + i
+        span = (project['end_date'] - project['start_date']).days
+        start = project['start_date'] + timedelta(days=rng.randint(0, span))
+        end = start + timedelta(days=rng.randint(2, 30))
+        if end < today:
+            status = 'done' if rng.random() < 0.9 else 'in_progress'
+        elif start <= today:
+            status = rng.choices(['in_progress', 'todo', 'done'], [60, 30, 10])[0]
+        else:
+            status = 'todo'
+        task_rows.append({'id': tid, 'workspace_id': ws, 'project_id': project['id'], 'status': status,
+                          'title': f'{rng.choice(VERBS)} {rng.choice(NOUNS)} #{i + 1}',
+                          'description': 'Synthetic benchmark task.', 'start_date': start, 'end_date': end,
+                          'priority': rng.choices(['low', 'medium', 'high', 'critical'], [25, 45, 22, 8])[0]})
+
+        assignees = set()
+        while len(assignees) < rng.choices([1, 2, 3], [50, 35, 15])[0]:
+            assignees.add(rng.choices(people, person_weights)[0]['id'])
+        for n, pid in enumerate(sorted(assignees)):
+            assignments.append({'task_id': tid, 'person_id': pid, 'is_lead': n == 0})
+
+        earlier = project_tasks.setdefault(project['id'], [])
+        if earlier and rng.random() < 0.5:
+            for depends_on in set(rng.choices(earlier[-10:], k=rng.choices([1, 2], [80, 20])[0])):
+                dependencies.append({'task_id': tid, 'depends_on_id': depends_on})
+        earlier.append(tid)
+
+        for n in range(rng.choices([0, 1, 2], [67, 28, 5])[0]):
+            milestones.append({'task_id': tid, 'name': f'Milestone {n + 1}',
+                               'date': start + timedelta(days=rng.randint(0, (end - start).days)),
+                               'status': 'on_track'})
+        for n in range(rng.choices([0, 1, 2, 3, 5, 8], [30, 25, 20, 12, 8, 5])[0]):
+            content = rng.choice(UPDATE_TEXTS)
+            if rng.random() < 0.3:
+                mentioned = rng.choices(people, person_weights)[0]
+                content += f' cc @"{mentioned["name"]}"'
+                mentions.append({'status_update_id': update_id, 'person_id': mentioned['id']})
+            created_at = datetime.combine(start, datetime.min.time()) + timedelta(hours=9 + 24 * n)
+            updates.append({'id': update_id, 'task_id': tid, 'content': content, 'created_at': created_at,
+                            'content_hash': status_update_fingerprint(tid, created_at, content)})
+            update_id += 1
+        if rng.random() < 0.5:
+            for tag in {rng.choice(tags)['id'] for _ in range(rng.choice([1, 2]))}:
+                tag_links.append({'task_id': tid, 'tag_id': tag})
+
+    _insert(Team.__table__, teams)
+    _insert(Person.__table__, people)
+    _insert(person_teams, [{'person_id': p, 'team_id': t} for p, t in sorted(memberships)])
+    _insert(Tag.__table__, tags)
+    _insert(Project.__table__, projects)
+    _insert(Task.__table__, task_rows)
+    _insert(TaskAssignment.__table__, assignments)
+    _insert(TaskDependency.__table__, dependencies)
+    _insert(Milestone.__table__, milestones)
+    _insert(StatusUpdate.__table__, updates)
+    _insert(status_update_mentions, mentions)
+    _insert(task_tags, tag_links)
+    refresh_milestone_statuses(project_ids=[project['id'] for project in projects])
+    return workspace, {'teams': len(teams), 'people': len(people), 'projects': len(projects),
+                       'tasks': len(task_rows), 'assignments': len(assignments),
+                       'dependencies': len(dependencies), 'milestones': len(milestones),
+                       'status_updates': len(updates), 'mentions': len(mentions)}
@@ -0,0 +1,193 @@
+"""Time the main routes against synthetic workspaces of several sizes.
+
+Usage:
+    python -m benchmarks.run [--tasks 1000,10000] [--repeat 10] [--out results.json] [--compare old.json]
+
+For each scale a fresh SQLite database is built in a temporary directory
+(see benchmarks/dataset.py) and every route in ROUTES is requested through
+the Flask test client: once to warm up, ``--repeat`` times under the clock,
+and once more under tracemalloc. The results file records p50/p95/mean
+latency, SQL statements per request and peak Python memory per route and
+scale, together with the commit they were measured at, so two runs can be
+compared with ``--compare``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+import click
+from sqlalchemy import event
+
+from app import create_app
+from benchmarks.dataset import build_workspace
+from models import db, Person, Project, StatusUpdate, Task, TaskAssignment, Team
+
+SLUG = 'bench'
+
+# name -> path under /w/<slug>; {project}, {task}, {person} and {team} are
+# the biggest project, the task with most updates, the busiest person and
+# the first team.
+ROUTES = {
+    'dashboard': '/',
+    'tasks.list': '/tasks',
+    'tasks.detail': '/tasks/{task}',
+    'people.list': '/people',
+    'people.detail': '/people/{person}',
+    'people.workload_data': '/people/workload-data',
+    'people.search_json': '/people/search.json?q=an',
+    'teams.list': '/teams',
+    'teams.edit': '/teams/{team}/edit',
+    'projects.list': '/projects',
+    'projects.detail': '/projects/{project}',
+    'projects.gantt_data': '/projects/{project}/gantt-data?critical=1',
+    'projects.dashboard_gantt_data': '/projects/dashboard-gantt-data',
+    'projects.export_excel': '/projects/{project}/export/excel',
+    'search.search_json': '/search.json?q=review',
+}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _commit() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '-uno'))}
+
+
+def _targets(workspace_id: int) -> dict[str, int]:
+    biggest = (db.session.query(Task.project_id).filter_by(workspace_id=workspace_id)
+               .group_by(Task.project_id).order_by(db.func.count().desc()).limit(1).scalar())
+    busiest = (db.session.query(TaskAssignment.person_id).join(Person)
+               .filter(Person.workspace_id == workspace_id)
+               .group_by(TaskAssignment.person_id).order_by(db.func.count().desc()).limit(1).scalar())
+    chattiest = (db.session.query(StatusUpdate.task_id).join(Task).filter(Task.workspace_id == workspace_id)
+                 .group_by(StatusUpdate.task_id).order_by(db.func.count().desc()).limit(1).scalar())
+    return {'project': biggest or Project.query.filter_by(workspace_id=workspace_id).first().id,
+            'task': chattiest or Task.query.filter_by(workspace_id=workspace_id).first().id,
+            'person': busiest or Person.query.filter_by(workspace_id=workspace_id).first().id,
+            'team': Team.query.filter_by(workspace_id=workspace_id).order_by(Team.id).first().id}
+
+
+def run_scale(tasks: int, repeat: int, seed: int) -> dict:
+    """Build a workspace of ``tasks`` tasks in a scratch database and time every route."""
+    with tempfile.TemporaryDirectory() as scratch:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{Path(scratch) / "bench.db"}',
+            'PURGE_DELETED_IN_BACKGROUND': False,
+            'REQUEST_TIMING_LOG': False,
+        })
+        with app.app_context():
+            started = perf_counter()
+            workspace, rows = build_workspace(SLUG, tasks, seed=seed)
+            db.session.commit()
+            seed_seconds = perf_counter() - started
+            targets = _targets(workspace.id)
+            engine = db.engine
+            db.session.remove()
+
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        client = app.test_client()
+        client.get(f'/w/{SLUG}/')
+        results = {}
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            for name, path in ROUTES.items():
+                url = f'/w/{SLUG}' + path.format(**targets)
+                response = client.get(url)
+                timings, queries = [], []
+                for _ in range(repeat):
+                    statements.clear()
+                    start = perf_counter()
+                    response = client.get(url)
+                    timings.append((perf_counter() - start) * 1000)
+                    queries.append(len(statements))
+                tracemalloc.start()
+                client.get(url)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results[name] = {
+                    'path': path, 'status': response.status_code,
+                    'p50_ms': round(_percentile(timings, 50), 2), 'p95_ms': round(_percentile(timings, 95), 2),
+                    'mean_ms': round(statistics.fmean(timings), 2),
+                    'queries': max(queries), 'peak_kib': round(peak / 1024, 1),
+                }
+                click.echo(f'  {name:<32} p50 {results[name]["p50_ms"]:>9.2f} ms  '
+                           f'p95 {results[name]["p95_ms"]:>9.2f} ms  {results[name]["queries"]:>4} queries  '
+                           f'{results[name]["peak_kib"]:>10.1f} KiB')
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+            with app.app_context():
+                db.session.remove()
+                db.engine.dispose()
+        return {'rows': rows, 'seed_seconds': round(seed_seconds, 2), 'routes': results}
+
+
+def compare(old: dict, new: dict) -> None:
+    """Print p50 and query count changes between two results files."""
+    click.echo(f'\n{old.get("commit")} -> {new.get("commit")}')
+    for scale, data in new['scales'].items():
+        before = old.get('scales', {}).get(scale)
+        if not before:
+            continue
+        click.echo(f'{scale} tasks')
+        for name, result in data['routes'].items():
+            previous = before['routes'].get(name)
+            if not previous:
+                continue
+            change = (result['p50_ms'] / previous['p50_ms'] - 1) * 100 if previous['p50_ms'] else 0.0
+            click.echo(f'  {name:<32} p50 {previous["p50_ms"]:>9.2f} -> {result["p50_ms"]:>9.2f} ms '
+                       f'({change:+6.1f}%)  queries {previous["queries"]} -> {result["queries"]}')
+
+
+@click.command()
+@click.option('--tasks', default='1000,10000', show_default=True,
+              help='Comma-separated workspace sizes, in tasks.')
+@click.option('--repeat', type=click.IntRange(1), default=10, show_default=True,
+              help='Timed requests per route.')
+@click.option('--seed', type=int, default=0, show_default=True, help='Random seed for the data.')
+@click.option('--out', type=click.Path(dir_okay=False), default='benchmarks/results.json', show_default=True,
+              help='Where to write the results.')
+@click.option('--compare', 'baseline', type=click.Path(exists=True, dir_okay=False),
+              help='Earlier results file to compare against.')
+def main(tasks, repeat, seed, out, baseline):
+    """Benchmark the main routes at several workspace sizes."""
+    try:
+        scales = [int(n) for n in tasks.split(',') if n.strip()]
+    except ValueError:
+        raise click.BadParameter('expected comma-separated integers', param_hint='--tasks')
+    results = {**_commit(), 'created_at': datetime.now().isoformat(timespec='seconds'),
+               'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+               'repeat': repeat, 'seed': seed, 'scales': {}}
+    for n in scales:
+        click.echo(f'{n} tasks')
+        results['scales'][str(n)] = run_scale(n, repeat, seed)
+    Path(out).write_text(json.dumps(results, indent=2) + '\n')
+    click.echo(f'Wrote {out}')
+    if baseline:
+        compare(json.loads(Path(baseline).read_text()), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Cloning a whole workspace, or one project, inside SQLite.
+
+Rows are copied with INSERT ... SELECT statements, one per table, so nothing
+is loaded into Python however big the template is. Rows that other rows
+point at (teams, people, tags, projects, tasks) get their new ids from a
+temporary id map (kind, old_id -> new_id), numbered after the table's
+current maximum id with row_number(); foreign keys of copied rows are
+translated through the map with an indexed lookup. Ids that are not in the
+map (the people and tags a project clone shares with its source) are kept
+as they are. Milestones, assignments, dependencies and link rows are copied
+by joining them to the map and numbered by SQLite.
+
+A workspace clone copies its teams, people, tags, projects, tasks,
+assignments, dependencies and milestones; a project clone copies the project
+with its tasks, milestones, tag links, assignments and dependencies into the
+same workspace. Status updates are not copied. All task, project and
+milestone dates can be moved by a number of days. Deleted rows are skipped.
+Nothing is committed here; the caller commits once.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, and_, func, insert, literal, select
+
+from models import (db, Milestone, Person, Project, Tag, Task, TaskAssignment, TaskDependency, Team,
+                    Workspace, person_teams, refresh_milestone_statuses, task_tags)
+
+# Per-connection scratch table; emptied before and after every clone.
+_id_map = Table(
+    'clone_id_map', MetaData(),
+    Column('kind', String, primary_key=True),
+    Column('old_id', Integer, primary_key=True),
+    Column('new_id', Integer, nullable=False),
+    prefixes=['TEMPORARY'],
+)
+
+
+def _reset_map() -> None:
+    _id_map.create(db.session.connection(), checkfirst=True)
+    db.session.execute(_id_map.delete())
+
+
+def _mapped_ids(kind: str):
+    return select(_id_map.c.old_id).where(_id_map.c.kind == kind)
+
+
+def _new_ids(kind: str) -> list[int]:
+    return list(db.session.execute(select(_id_map.c.new_id).where(_id_map.c.kind == kind)).scalars())
+
+
+def _remap(kind: str, column):
+    """``column`` translated through the id map, or unchanged when it is not mapped."""
+    m = _id_map.alias()
+    new_id = select(m.c.new_id).where(m.c.kind == kind, m.c.old_id == column).scalar_subquery()
+    return func.coalesce(new_id.correlate_except(m), column)
+
+
+def _shift(column, days: int):
+    return func.date(column, f'{days:+d} days') if days else column
+
+
+def _assign_ids(kind: str, table, where) -> int:
+    """Map the ids of the ``table`` rows matching ``where`` to fresh ids; returns the row count."""
+    start = db.session.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+    return db.session.execute(insert(_id_map).from_select(
+        ['kind', 'old_id', 'new_id'],
+        select(literal(kind), table.c.id, start + func.row_number().over(order_by=table.c.id)).where(where),
+    )).rowcount
+
+
+def _copy(kind: str, table, **values) -> None:
+    """Insert a copy of every mapped row of ``table`` under its new id, with ``values`` replacing columns."""
+    columns = [column.name for column in table.c]
+    exprs = [_id_map.c.new_id if name == 'id' else values.get(name, table.c[name]) for name in columns]
+    db.session.execute(insert(table).from_select(columns, select(*exprs).select_from(table).join(
+        _id_map, and_(_id_map.c.kind == kind, _id_map.c.old_id == table.c.id)
+    )))
+
+
+def _copy_linked(table, kind: str, column, where=None, **values) -> int:
+    """Copy the rows of ``table`` whose ``column`` holds a mapped ``kind`` id; returns the row count.
+
+    Nothing references these rows, so they are not mapped themselves and
+    SQLite numbers them.
+    """
+    columns = [c.name for c in table.c if c.name != 'id']
+    exprs = [_id_map.c.new_id if name == column.name else values.get(name, table.c[name]) for name in columns]
+    query = select(*exprs).select_from(table).join(
+        _id_map, and_(_id_map.c.kind == kind, _id_map.c.old_id == column))
+    if where is not None:
+        query = query.where(where)
+    return db.session.execute(insert(table).from_select(columns, query)).rowcount
+
+
+def _clone_task_rows(workspace_id: int, days: int, shared: bool) -> dict[str, int]:
+    """Copy the mapped tasks and the rows hanging off them.
+
+    With ``shared`` set (a project clone) assignments keep their people and
+    dependencies on tasks outside the clone keep pointing at those tasks;
+    otherwise only links between copied rows are kept.
+    """
+    t, m = Task.__table__, Milestone.__table__
+    a, dep, p = TaskAssignment.__table__, TaskDependency.__table__, Person.__table__
+    people = (select(p.c.id).where(p.c.workspace_id == workspace_id, p.c.deleted_at.is_(None))
+              if shared else _mapped_ids('person'))
+    predecessors = (select(t.c.id).where(t.c.workspace_id == workspace_id, t.c.deleted_at.is_(None))
+                    if shared else _mapped_ids('task'))
+
+    _copy('task', t, project_id=_remap('project', t.c.project_id), workspace_id=literal(workspace_id),
+          start_date=_shift(t.c.start_date, days), end_date=_shift(t.c.end_date, days))
+    counts = {
+        'milestones': _copy_linked(m, 'task', m.c.task_id, date=_shift(m.c.date, days)),
+        'assignments': _copy_linked(a, 'task', a.c.task_id, a.c.person_id.in_(people),
+                                    person_id=_remap('person', a.c.person_id)),
+        'dependencies': _copy_linked(dep, 'task', dep.c.task_id, dep.c.depends_on_id.in_(predecessors),
+                                     depends_on_id=_remap('task', dep.c.depends_on_id)),
+    }
+    _copy_linked(task_tags, 'task', task_tags.c.task_id, tag_id=_remap('tag', task_tags.c.tag_id))
+    if days:
+        # Milestone status depends on the date; without a shift the copied status still holds.
+        refresh_milestone_statuses(project_ids=_new_ids('project'))
+    return counts
+
+
+def clone_workspace(source: Workspace, name: str, slug: str, days: int = 0) -> tuple[Workspace, dict[str, int]]:
+    """Create a workspace holding a copy of ``source``'s data; returns it with copied row counts."""
+    tm, p, tg = Team.__table__, Person.__table__, Tag.__table__
+    pr, t = Project.__table__, Task.__table__
+    workspace = Workspace(name=name, slug=slug)
+    db.session.add(workspace)
+    db.session.flush()
+    _reset_map()
+
+    def live(table):
+        return and_(table.c.workspace_id == source.id, table.c.deleted_at.is_(None))
+
+    counts = {'teams': _assign_ids('team', tm, live(tm)),
+              'people': _assign_ids('person', p, live(p)),
+              'tags': _assign_ids('tag', tg, tg.c.workspace_id == source.id),
+              'projects': _assign_ids('project', pr, live(pr)),
+              'tasks': _assign_ids('task', t, and_(live(t), t.c.project_id.in_(_mapped_ids('project'))))}
+    in_workspace = {'workspace_id': literal(workspace.id)}
+    _copy('team', tm, **in_workspace)
+    _copy('person', p, **in_workspace)
+    _copy('tag', tg, **in_workspace)
+    _copy('project', pr, start_date=_shift(pr.c.start_date, days), end_date=_shift(pr.c.end_date, days),
+          **in_workspace)
+    _copy_linked(person_teams, 'person', person_teams.c.person_id, person_teams.c.team_id.in_(_mapped_ids('team')),
+                 team_id=_remap('team', person_teams.c.team_id))
+    counts.update(_clone_task_rows(workspace.id, days, shared=False))
+    db.session.execute(_id_map.delete())
+    return workspace, counts
+
+
+def clone_project(source: Project, name: str | None = None, days: int = 0) -> tuple[Project, dict[str, int]]:
+    """Copy a project and its tasks within its workspace; returns the copy with copied row counts."""
+    pr, t = Project.__table__, Task.__table__
+    _reset_map()
+    _assign_ids('project', pr, pr.c.id == source.id)
+    counts = {'tasks': _assign_ids('task', t, and_(t.c.project_id == source.id, t.c.deleted_at.is_(None)))}
+    _copy('project', pr, name=literal(name or f'{source.name} (copy)'),
+          start_date=_shift(pr.c.start_date, days), end_date=_shift(pr.c.end_date, days))
+    project_id = _new_ids('project')[0]
+    counts.update(_clone_task_rows(source.workspace_id, days, shared=True))
+    db.session.execute(_id_map.delete())
+    return db.session.get(Project, project_id), counts
@@ -0,0 +1,379 @@
+"""Deleting large amounts of workspace data without the ORM.
+
+Tasks and projects are deleted with set-based DELETE statements per table
+(delete_tasks, delete_project_data) rather than through the ORM cascades, which
+would load every child row into the session first. The purge of soft-deleted
+projects below runs delete_project_data on each batch.
+
+Workspace deletion runs as a background job. The request only marks the
+workspace as deleting (it disappears from every workspace route and frees
+its slug at once); the job then removes its rows table by table, children
+before parents and association tables first, in batches of at most
+DELETE_BATCH_SIZE parent ids. Every batch is its own short transaction, so
+other requests can write between batches and memory stays flat however big
+the workspace is. Progress is kept per process and can be polled.
+
+A deletion interrupted by a restart is finished by ``flask delete-workspaces``
+or by starting it again from the landing page.
+
+Tasks, projects, people and teams are soft-deleted: the request only sets
+deleted_at (models.py hides such rows from ORM queries), which can be undone
+within the undo window. Afterwards purge_deleted() removes the rows in the
+same kind of batches, from a background thread that waits for a pause in
+requests, or from ``flask purge-deleted``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, or_, select
+
+from models import (db, ImportPreview, Milestone, Person, Project, StatusUpdate, Tag, Task, TaskAssignment,
+                    TaskDependency, Team, Workspace, person_teams, status_update_mentions, task_tags)
+
+CHUNK_SIZE = 500
+DELETE_BATCH_SIZE = 500
+# Pause between batches so waiting writers get the SQLite lock.
+DELETE_BATCH_PAUSE = 0.01
+# How long a soft-deleted row can be restored (config UNDO_DELETE_SECONDS).
+UNDO_DELETE_WINDOW = timedelta(minutes=10)
+# The purger runs this often (config PURGE_INTERVAL_SECONDS) and, before each
+# batch, waits until no request has started for PURGE_QUIET_SECONDS, giving
+# up after PURGE_MAX_WAIT seconds so constant traffic cannot stall it.
+PURGE_INTERVAL = 300
+PURGE_QUIET_SECONDS = 2.0
+PURGE_MAX_WAIT = 60.0
+
+
+@dataclass
+class DeletionProgress:
+    workspace_id: int
+    name: str
+    state: str = 'deleting'  # deleting, done, failed
+    step: str = ''
+    deleted: int = 0
+    total: int = 0
+    error: str | None = None
+    started_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def percent(self) -> int:
+        if self.state == 'done':
+            return 100
+        return min(99, self.deleted * 100 // self.total) if self.total else 0
+
+    def to_json(self) -> dict:
+        return {'workspace_id': self.workspace_id, 'name': self.name, 'state': self.state,
+                'step': self.step, 'deleted': self.deleted, 'total': self.total,
+                'percent': self.percent, 'error': self.error}
+
+
+_progress: dict[int, DeletionProgress] = {}
+_progress_lock = threading.Lock()
+
+
+@dataclass
+class _Step:
+    label: str
+    key: object  # column the batches are paged on
+    keys: object  # query selecting ``key`` for the rows still to delete
+    table: object  # table deleted from, where ``column`` is in the batch
+    column: object
+    children: list = field(default_factory=list)  # (table, column) deleted first
+    count: object = None  # query counting the rows ``table`` will lose
+    before: object = None  # callable given each batch of keys, run before the children
+    delete: object = None  # callable deleting each batch of keys and returning rows deleted, instead of ``table``
+
+    def total(self) -> int:
+        query = self.count if self.count is not None else select(func.count()).select_from(self.keys.subquery())
+        return db.session.execute(query).scalar()
+
+
+def _workspace_steps(workspace_id: int) -> list[_Step]:
+    """The deletion plan, children before parents.
+
+    Keys are paged in ascending order (keyset pagination), so each batch
+    continues the previous scan instead of starting over, and every delete
+    hits a primary key or the leading column of one. By the time people,
+    teams and tags are deleted, the workspace's tasks and everything linking
+    to them are already gone.
+    """
+    t, su, m = Task.__table__, StatusUpdate.__table__, Milestone.__table__
+    a, dep = TaskAssignment.__table__, TaskDependency.__table__
+    p, tm, tg, pr = Person.__table__, Team.__table__, Tag.__table__, Project.__table__
+    ip = ImportPreview.__table__
+    in_ws = t.c.workspace_id == workspace_id
+    ws_tasks = select(t.c.id).where(in_ws)
+
+    def via_task(table):
+        return select(table.c.id).join(t, t.c.id == table.c.task_id).where(in_ws)
+
+    return [
+        _Step('status updates', su.c.id, via_task(su), su, su.c.id,
+              [(status_update_mentions, status_update_mentions.c.status_update_id)]),
+        _Step('milestones', m.c.id, via_task(m), m, m.c.id),
+        _Step('task tags', t.c.id, ws_tasks, task_tags, task_tags.c.task_id,
+              count=select(func.count()).select_from(task_tags).where(task_tags.c.task_id.in_(ws_tasks))),
+        _Step('assignments', a.c.id, via_task(a), a, a.c.id),
+        _Step('dependencies', dep.c.id,
+              select(dep.c.id).where(or_(dep.c.task_id.in_(ws_tasks), dep.c.depends_on_id.in_(ws_tasks))),
+              dep, dep.c.id),
+        _Step('tasks', t.c.id, ws_tasks, t, t.c.id),
+        _Step('people', p.c.id, select(p.c.id).where(p.c.workspace_id == workspace_id), p, p.c.id,
+              [(person_teams, person_teams.c.person_id)]),
+        _Step('teams', tm.c.id, select(tm.c.id).where(tm.c.workspace_id == workspace_id), tm, tm.c.id),
+        _Step('tags', tg.c.id, select(tg.c.id).where(tg.c.workspace_id == workspace_id), tg, tg.c.id),
+        _Step('projects', pr.c.id, select(pr.c.id).where(pr.c.workspace_id == workspace_id), pr, pr.c.id),
+        _Step('import previews', ip.c.token, select(ip.c.token).where(ip.c.workspace_id == workspace_id),
+              ip, ip.c.token),
+    ]
+
+
+def _run_steps(steps: list[_Step], progress: DeletionProgress | None, batch_size: int, pause: float,
+               quiet: float = 0) -> int:
+    """Run the steps batch by batch, committing after each; returns rows deleted."""
+    deleted = 0
+    for step in steps:
+        if progress:
+            progress.step = step.label
+        last = 0
+        while True:
+            if quiet:
+                _wait_for_quiet(quiet)
+            ids = list(db.session.execute(
+                step.keys.where(step.key > last).order_by(step.key).limit(batch_size)
+            ).scalars())
+            if not ids:
+                break
+            if step.before:
+                step.before(ids)
+            for child, column in step.children:
+                db.session.execute(child.delete().where(column.in_(ids)))
+            if step.delete:
+                count = step.delete(ids)
+            else:
+                count = db.session.execute(step.table.delete().where(step.column.in_(ids))).rowcount
+            db.session.commit()
+            deleted += count
+            if progress:
+                progress.deleted += count
+            last = ids[-1]
+            if pause:
+                time.sleep(pause)
+    return deleted
+
+
+def delete_workspace_data(workspace_id: int, progress: DeletionProgress | None = None,
+                          batch_size: int = DELETE_BATCH_SIZE, pause: float = DELETE_BATCH_PAUSE) -> int:
+    """Delete every row of the workspace, committing after each batch; returns rows deleted."""
+    progress = progress or DeletionProgress(workspace_id, '')
+    steps = _workspace_steps(workspace_id)
+    progress.total = sum(step.total() for step in steps) + 1
+    db.session.commit()
+    _run_steps(steps, progress, batch_size, pause)
+
+    progress.step = 'workspace'
+    w = Workspace.__table__
+    progress.deleted += db.session.execute(w.delete().where(w.c.id == workspace_id)).rowcount
+    db.session.commit()
+    progress.state = 'done'
+    return progress.deleted
+
+
+def _delete_task_children(task_ids) -> None:
+    """Delete every row referencing the tasks selected by ``task_ids`` (a list or a subquery)."""
+    su, m = StatusUpdate.__table__, Milestone.__table__
+    a, dep = TaskAssignment.__table__, TaskDependency.__table__
+    db.session.execute(status_update_mentions.delete().where(
+        status_update_mentions.c.status_update_id.in_(select(su.c.id).where(su.c.task_id.in_(task_ids)))
+    ))
+    db.session.execute(su.delete().where(su.c.task_id.in_(task_ids)))
+    db.session.execute(m.delete().where(m.c.task_id.in_(task_ids)))
+    db.session.execute(task_tags.delete().where(task_tags.c.task_id.in_(task_ids)))
+    db.session.execute(a.delete().where(a.c.task_id.in_(task_ids)))
+    db.session.execute(dep.delete().where(or_(dep.c.task_id.in_(task_ids), dep.c.depends_on_id.in_(task_ids))))
+
+
+def _delete_task_rows(task_ids) -> None:
+    """Delete the tasks selected by ``task_ids`` (a list or a subquery) and every row referencing them."""
+    t = Task.__table__
+    _delete_task_children(task_ids)
+    db.session.execute(t.delete().where(t.c.id.in_(task_ids)))
+
+
+def delete_tasks(task_ids) -> None:
+    """Delete tasks and every row that references them with set-based DELETEs (not committed)."""
+    ids = sorted(task_ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        _delete_task_rows(ids[start:start + CHUNK_SIZE])
+
+
+def delete_project_data(project_ids) -> int:
+    """Delete projects, their tasks and their rows with a fixed number of DELETEs (not committed).
+
+    ``project_ids`` is a list or a subquery; returns the number of projects
+    deleted. Unlike session.delete(project), nothing is loaded into the
+    session: each child table is cleared with one ``DELETE ... WHERE task_id
+    IN (SELECT id FROM task WHERE project_id IN ...)``. Soft-deleted tasks
+    go too.
+    """
+    t, p = Task.__table__, Project.__table__
+    _delete_task_rows(select(t.c.id).where(t.c.project_id.in_(project_ids)))
+    return db.session.execute(p.delete().where(p.c.id.in_(project_ids))).rowcount
+
+
+def undo_window() -> timedelta:
+    seconds = current_app.config.get('UNDO_DELETE_SECONDS')
+    return UNDO_DELETE_WINDOW if seconds is None else timedelta(seconds=seconds)
+
+
+def soft_delete(obj) -> None:
+    """Hide a task, project, person or team until it is restored or purged (not committed).
+
+    A project takes its live tasks with it in one UPDATE, stamped with the
+    project's deleted_at so restore() brings back exactly those.
+    """
+    obj.deleted_at = datetime.now()
+    if isinstance(obj, Project):
+        t = Task.__table__
+        db.session.execute(t.update().where(t.c.project_id == obj.id, t.c.deleted_at.is_(None))
+                           .values(deleted_at=obj.deleted_at))
+
+
+def can_restore(obj) -> bool:
+    return obj.deleted_at is not None and obj.deleted_at > datetime.now() - undo_window()
+
+
+def restore(obj) -> None:
+    """Undo soft_delete() (not committed)."""
+    if isinstance(obj, Project):
+        t = Task.__table__
+        db.session.execute(t.update().where(t.c.project_id == obj.id, t.c.deleted_at == obj.deleted_at)
+                           .values(deleted_at=None))
+    obj.deleted_at = None
+
+
+def _purge_steps(cutoff: datetime) -> list[_Step]:
+    """Soft-deleted rows whose undo window ended before ``cutoff``, children first."""
+    t, pr, p, tm = Task.__table__, Project.__table__, Person.__table__, Team.__table__
+    a = TaskAssignment.__table__
+
+    def expired(table):
+        return select(table.c.id).where(table.c.deleted_at < cutoff)
+
+    return [
+        _Step('tasks', t.c.id, expired(t), t, t.c.id, before=_delete_task_children),
+        _Step('projects', pr.c.id, expired(pr), pr, pr.c.id, delete=delete_project_data),
+        _Step('people', p.c.id, expired(p), p, p.c.id,
+              [(status_update_mentions, status_update_mentions.c.person_id),
+               (person_teams, person_teams.c.person_id), (a, a.c.person_id)]),
+        _Step('teams', tm.c.id, expired(tm), tm, tm.c.id, [(person_teams, person_teams.c.team_id)]),
+    ]
+
+
+def purge_deleted(cutoff: datetime | None = None, batch_size: int = DELETE_BATCH_SIZE,
+                  pause: float = DELETE_BATCH_PAUSE, quiet: float = 0) -> int:
+    """Permanently delete soft-deleted rows, committing after each batch; returns rows purged.
+
+    ``cutoff`` defaults to now minus the undo window. With ``quiet`` set, each
+    batch first waits until no request has started for that many seconds.
+    """
+    cutoff = cutoff or datetime.now() - undo_window()
+    return _run_steps(_purge_steps(cutoff), None, batch_size, pause, quiet)
+
+
+_last_request = 0.0
+_purger: threading.Thread | None = None
+_purger_lock = threading.Lock()
+
+
+def note_request() -> None:
+    """Record that a request started; the purger holds off while requests keep coming."""
+    global _last_request
+    _last_request = time.monotonic()
+
+
+def _wait_for_quiet(quiet: float) -> None:
+    deadline = time.monotonic() + PURGE_MAX_WAIT
+    while time.monotonic() - _last_request < quiet and time.monotonic() < deadline:
+        time.sleep(quiet)
+
+
+def _purge_loop(app, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                purged = purge_deleted(quiet=PURGE_QUIET_SECONDS)
+                if purged:
+                    app.logger.info('Purged %s deleted row(s)', purged)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Purging deleted rows failed')
+            finally:
+                db.session.remove()
+
+
+def start_purger(app) -> None:
+    """Start this process's background purger if it is not running yet."""
+    global _purger
+    if _purger is not None and _purger.is_alive():
+        return
+    with _purger_lock:
+        if _purger is None or not _purger.is_alive():
+            interval = app.config.get('PURGE_INTERVAL_SECONDS', PURGE_INTERVAL)
+            _purger = threading.Thread(target=_purge_loop, args=(app, interval),
+                                       name='purge-deleted', daemon=True)
+            _purger.start()
+
+
+def _run(app, workspace_id: int, progress: DeletionProgress) -> None:
+    with app.app_context():
+        try:
+            delete_workspace_data(workspace_id, progress)
+        except Exception as exc:  # reported through the progress endpoint
+            db.session.rollback()
+            progress.state, progress.error = 'failed', str(exc)
+            app.logger.exception('Deleting workspace %s failed', workspace_id)
+        finally:
+            db.session.remove()
+
+
+def start_workspace_deletion(workspace: Workspace, background: bool | None = None) -> DeletionProgress:
+    """Mark the workspace as deleting and remove its data, by default in a background thread.
+
+    ``background`` defaults to the DELETE_WORKSPACES_IN_BACKGROUND config
+    value (True when unset).
+    """
+    if workspace.deleting_at is None:
+        workspace.deleting_at = datetime.now()
+        # Free the slug straight away so it can be reused.
+        workspace.slug = f'~deleting-{workspace.id}'
+        db.session.commit()
+
+    with _progress_lock:
+        progress = _progress.get(workspace.id)
+        if progress and progress.state == 'deleting':
+            return progress
+        progress = _progress[workspace.id] = DeletionProgress(workspace.id, workspace.name)
+
+    if background is None:
+        background = current_app.config.get('DELETE_WORKSPACES_IN_BACKGROUND', True)
+    if background:
+        app = current_app._get_current_object()
+        threading.Thread(target=_run, args=(app, workspace.id, progress),
+                         name=f'delete-workspace-{workspace.id}', daemon=True).start()
+    else:
+        delete_workspace_data(workspace.id, progress)
+    return progress
+
+
+def deletion_progress(workspace_id: int) -> DeletionProgress | None:
+    """Progress of a deletion started by this process, if any."""
+    with _progress_lock:
+        return _progress.get(workspace_id)
@@ -0,0 +1,405 @@
+"""Critical-path analysis over task dependencies.
+
+A project's (or workspace's) tasks and dependency edges are loaded with one
+query each and analysed in O(V + E):
+
+    topological order -> forward pass (earliest start/finish)
+                      -> backward pass (latest start/finish) -> slack
+
+Dates are whole days. A task's duration is ``end_date - start_date`` and a
+dependent may start on the day its predecessor ends, which matches how plans
+are entered in this app. A task never starts earlier than its planned
+start_date, so slack reflects the plan as written.
+
+find_dependency_cycle() validates new edges by searching upstream from the
+edge targets only, so a write costs time proportional to the ancestors it
+can reach rather than the size of the project.
+
+push_dependents() applies the same earliest-start rule downstream of one
+edited task, touching only the tasks reachable from it.
+
+Results are cached per scope and reused until the workspace's
+schedule_version changes. SQLite triggers replace that token whenever a
+task is added, removed, moved or has its dates changed, or a dependency edge
+is written, so repeated reads of a large programme skip the analysis
+entirely, including across processes and after bulk SQL writes that bypass
+the ORM.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+
+from sqlalchemy import bindparam, event, select, text
+
+from models import db, Project, Task, TaskDependency, Workspace
+
+CACHE_MAX_ENTRIES = 128
+# Keep IN lists well under SQLite's bound-parameter limit.
+CHUNK_SIZE = 500
+
+
+class DependencyCycleError(ValueError):
+    """Raised when the dependency edges in a scope contain a cycle."""
+
+    def __init__(self, task_ids: list[int]):
+        self.task_ids = sorted(task_ids)
+        super().__init__(f'dependency cycle among tasks {self.task_ids}')
+
+
+@dataclass
+class TaskSchedule:
+    task_id: int
+    earliest_start: date
+    earliest_finish: date
+    latest_start: date
+    latest_finish: date
+    slack: int
+
+    @property
+    def critical(self) -> bool:
+        return self.slack == 0
+
+
+@dataclass
+class ScheduleAnalysis:
+    order: list[int] = field(default_factory=list)
+    tasks: dict[int, TaskSchedule] = field(default_factory=dict)
+    critical_path: list[int] = field(default_factory=list)
+    finish: date | None = None
+
+    @property
+    def critical_ids(self) -> set[int]:
+        return {task_id for task_id, s in self.tasks.items() if s.critical}
+
+    def to_json(self) -> dict:
+        return {
+            'finish': self.finish.isoformat() if self.finish else None,
+            'critical_path': [f'task-{task_id}' for task_id in self.critical_path],
+            'tasks': [{
+                'id': f'task-{task_id}',
+                'earliest_start': self.tasks[task_id].earliest_start.isoformat(),
+                'earliest_finish': self.tasks[task_id].earliest_finish.isoformat(),
+                'latest_start': self.tasks[task_id].latest_start.isoformat(),
+                'latest_finish': self.tasks[task_id].latest_finish.isoformat(),
+                'slack': self.tasks[task_id].slack,
+                'critical': self.tasks[task_id].critical,
+            } for task_id in self.order],
+        }
+
+
+def topological_order(task_ids, successors: dict[int, list[int]]) -> list[int]:
+    """Kahn's algorithm; raises DependencyCycleError if any task is left over."""
+    indegree = {task_id: 0 for task_id in task_ids}
+    for task_id in indegree:
+        for succ in successors.get(task_id, ()):
+            indegree[succ] += 1
+
+    queue = deque(sorted(task_id for task_id, degree in indegree.items() if degree == 0))
+    order = []
+    while queue:
+        task_id = queue.popleft()
+        order.append(task_id)
+        for succ in successors.get(task_id, ()):
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                queue.append(succ)
+
+    if len(order) != len(indegree):
+        raise DependencyCycleError([task_id for task_id, degree in indegree.items() if degree > 0])
+    return order
+
+
+def analyze_schedule(spans: dict[int, tuple[date, date]],
+                     edges: list[tuple[int, int]]) -> ScheduleAnalysis:
+    """Run the critical-path method.
+
+    ``spans`` maps task id to (start_date, end_date); ``edges`` are
+    (task_id, depends_on_id) pairs. Edges touching tasks outside ``spans``
+    are ignored.
+    """
+    successors: dict[int, list[int]] = {}
+    predecessors: dict[int, list[int]] = {}
+    for task_id, depends_on_id in set(edges):
+        if task_id in spans and depends_on_id in spans:
+            successors.setdefault(depends_on_id, []).append(task_id)
+            predecessors.setdefault(task_id, []).append(depends_on_id)
+
+    order = topological_order(spans, successors)
+    if not order:
+        return ScheduleAnalysis()
+
+    duration = {task_id: (end - start).days for task_id, (start, end) in spans.items()}
+    es: dict[int, int] = {}
+    ef: dict[int, int] = {}
+    for task_id in order:
+        start = spans[task_id][0].toordinal()
+        for pred in predecessors.get(task_id, ()):
+            start = max(start, ef[pred])
+        es[task_id] = start
+        ef[task_id] = start + duration[task_id]
+
+    finish = max(ef.values())
+    ls: dict[int, int] = {}
+    lf: dict[int, int] = {}
+    for task_id in reversed(order):
+        latest = finish
+        for succ in successors.get(task_id, ()):
+            latest = min(latest, ls[succ])
+        lf[task_id] = latest
+        ls[task_id] = latest - duration[task_id]
+
+    analysis = ScheduleAnalysis(order=order, finish=date.fromordinal(finish))
+    for task_id in order:
+        analysis.tasks[task_id] = TaskSchedule(
+            task_id=task_id,
+            earliest_start=date.fromordinal(es[task_id]),
+            earliest_finish=date.fromordinal(ef[task_id]),
+            latest_start=date.fromordinal(ls[task_id]),
+            latest_finish=date.fromordinal(lf[task_id]),
+            slack=ls[task_id] - es[task_id],
+        )
+
+    # Walk back from the first critical task that ends the schedule, always
+    # following a critical predecessor that drives the current task's start.
+    current = next(t for t in order if ef[t] == finish and ls[t] == es[t])
+    path = [current]
+    while True:
+        driver = next((p for p in sorted(predecessors.get(current, ()))
+                       if ls[p] == es[p] and ef[p] == es[current]), None)
+        if driver is None:
+            break
+        path.append(driver)
+        current = driver
+    analysis.critical_path = path[::-1]
+    return analysis
+
+
+# ── Loading and caching ──────────────────────────────────────────────────────
+
+_cache: OrderedDict[tuple, tuple[str | None, ScheduleAnalysis]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _scope_filter(project_id: int | None, workspace_id: int | None):
+    if project_id is not None:
+        return Task.project_id == project_id
+    return Task.workspace_id == workspace_id
+
+
+def _schedule_version(project_id: int | None, workspace_id: int | None) -> str | None:
+    w, p = Workspace.__table__, Project.__table__
+    if project_id is not None:
+        workspace_filter = w.c.id == select(p.c.workspace_id).where(p.c.id == project_id).scalar_subquery()
+    else:
+        workspace_filter = w.c.id == workspace_id
+    # Flush first so the triggers have seen any pending ORM changes.
+    db.session.flush()
+    return db.session.execute(select(w.c.schedule_version).where(workspace_filter)).scalar()
+
+
+def load_schedule_analysis(project_id: int | None = None,
+                           workspace_id: int | None = None) -> ScheduleAnalysis:
+    """Analyse one project, or every task in a workspace when project_id is None."""
+    if project_id is None and workspace_id is None:
+        raise ValueError('project_id or workspace_id is required')
+    key = ('project', project_id) if project_id is not None else ('workspace', workspace_id)
+    scope_filter = _scope_filter(project_id, workspace_id)
+
+    version = _schedule_version(project_id, workspace_id)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and version is not None and cached[0] == version:
+            _cache.move_to_end(key)
+            return cached[1]
+
+    spans = {row.id: (row.start_date, row.end_date) for row in db.session.execute(
+        select(Task.id, Task.start_date, Task.end_date).where(scope_filter)
+    )}
+    edges = [(row.task_id, row.depends_on_id) for row in db.session.execute(
+        select(TaskDependency.task_id, TaskDependency.depends_on_id)
+        .join(Task, TaskDependency.task_id == Task.id).where(scope_filter)
+    )]
+    analysis = analyze_schedule(spans, edges)
+
+    with _cache_lock:
+        _cache[key] = (version, analysis)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return analysis
+
+
+_BUMP = "UPDATE workspace SET schedule_version = lower(hex(randomblob(16))) WHERE id = {workspace}"
+_EDGE_WORKSPACE = '(SELECT workspace_id FROM task WHERE id = {row}.task_id)'
+
+
+def _schedule_trigger_sql() -> list[str]:
+    bump_new = _BUMP.format(workspace='new.workspace_id')
+    bump_old = _BUMP.format(workspace='old.workspace_id')
+    edge_new = _BUMP.format(workspace=_EDGE_WORKSPACE.format(row='new'))
+    edge_old = _BUMP.format(workspace=_EDGE_WORKSPACE.format(row='old'))
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS schedule_task_ai AFTER INSERT ON task BEGIN {bump_new}; END",
+        f"CREATE TRIGGER IF NOT EXISTS schedule_task_ad AFTER DELETE ON task BEGIN {bump_old}; END",
+        f"CREATE TRIGGER IF NOT EXISTS schedule_task_au AFTER UPDATE OF "
+        f"start_date, end_date, project_id, workspace_id, deleted_at ON task BEGIN {bump_old}; {bump_new}; END",
+        f"CREATE TRIGGER IF NOT EXISTS schedule_task_dependency_ai AFTER INSERT ON task_dependency BEGIN "
+        f"{edge_new}; END",
+        f"CREATE TRIGGER IF NOT EXISTS schedule_task_dependency_ad AFTER DELETE ON task_dependency BEGIN "
+        f"{edge_old}; END",
+        f"CREATE TRIGGER IF NOT EXISTS schedule_task_dependency_au AFTER UPDATE ON task_dependency BEGIN "
+        f"{edge_old}; {edge_new}; END",
+    ]
+
+
+def ensure_schedule_triggers(connection) -> None:
+    """Create the triggers that keep Workspace.schedule_version current, if missing."""
+    if connection.dialect.name != 'sqlite':
+        return
+    for statement in _schedule_trigger_sql():
+        connection.execute(text(statement))
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_with_tables(target, connection, **kw):
+    ensure_schedule_triggers(connection)
+
+
+def _chunks(ids, size: int = CHUNK_SIZE):
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+# ── Cycle checks ─────────────────────────────────────────────────────────────
+
+def find_dependency_cycle(task_id: int, depends_on_ids) -> list[int] | None:
+    """Return the cycle that making ``task_id`` depend on ``depends_on_ids`` would close.
+
+    Searches breadth-first through the predecessors of the new edge targets,
+    one chunked query per level, and stops as soon as ``task_id`` is reached.
+    Existing edges out of ``task_id`` are never followed, so this also checks
+    a replacement dependency list. The result reads in dependency order:
+    ``[task_id, depends_on, ..., task_id]``; None means the edges are safe.
+    """
+    targets = set(depends_on_ids)
+    if task_id in targets:
+        return [task_id, task_id]
+
+    parent: dict[int, int] = {target: task_id for target in targets}
+    frontier = targets
+    while frontier:
+        found = set()
+        for chunk in _chunks(frontier):
+            for succ, pred in db.session.execute(
+                select(TaskDependency.task_id, TaskDependency.depends_on_id)
+                .where(TaskDependency.task_id.in_(chunk))
+            ):
+                if pred == task_id:
+                    chain = [succ]
+                    while chain[-1] != task_id:
+                        chain.append(parent[chain[-1]])
+                    return chain[::-1] + [task_id]
+                if pred not in parent:
+                    parent[pred] = succ
+                    found.add(pred)
+        frontier = found
+    return None
+
+
+def find_cycle(edges) -> list[int] | None:
+    """Return the task ids that cannot be ordered (a cycle and anything downstream of it).
+
+    ``edges`` are in-memory (task_id, depends_on_id) pairs; None means acyclic.
+    """
+    successors: dict[int, list[int]] = {}
+    nodes: set[int] = set()
+    for task_id, depends_on_id in edges:
+        successors.setdefault(depends_on_id, []).append(task_id)
+        nodes.update((task_id, depends_on_id))
+    try:
+        topological_order(nodes, successors)
+    except DependencyCycleError as exc:
+        return exc.task_ids
+    return None
+
+
+# ── Downstream propagation ───────────────────────────────────────────────────
+
+
+def push_dependents(task_ids: int | Iterable[int], workspace_id: int) -> list[tuple[int, date, date]]:
+    """Shift tasks downstream of the edited task(s) that now start before a predecessor ends.
+
+    Walks successors breadth-first from the edited tasks, orders that subgraph
+    topologically and moves each violating task later by just enough to
+    satisfy its predecessors, keeping its duration. Tasks are only ever pushed
+    later, and the edited tasks themselves are never moved. All moves are
+    written with one executemany UPDATE (not committed); returns the
+    (task_id, start_date, end_date) of every shifted task. Pending ORM changes
+    are flushed first so the edited tasks' new dates count.
+    """
+    db.session.flush()
+    sources = {task_ids} if isinstance(task_ids, int) else set(task_ids)
+
+    successors: dict[int, list[int]] = {}
+    downstream: set[int] = set()
+    frontier = set(sources)
+    while frontier:
+        found = set()
+        for chunk in _chunks(frontier):
+            for succ, pred in db.session.execute(
+                select(TaskDependency.task_id, TaskDependency.depends_on_id)
+                .where(TaskDependency.depends_on_id.in_(chunk))
+            ):
+                successors.setdefault(pred, []).append(succ)
+                if succ not in downstream and succ not in sources:
+                    found.add(succ)
+        downstream |= found
+        frontier = found
+    if not downstream:
+        return []
+
+    predecessors: dict[int, list[int]] = {}
+    for chunk in _chunks(downstream):
+        for succ, pred in db.session.execute(
+            select(TaskDependency.task_id, TaskDependency.depends_on_id)
+            .where(TaskDependency.task_id.in_(chunk))
+        ):
+            predecessors.setdefault(succ, []).append(pred)
+
+    needed = downstream | sources | {p for preds in predecessors.values() for p in preds}
+    spans: dict[int, tuple[date, date]] = {}
+    for chunk in _chunks(needed):
+        for row in db.session.execute(
+            select(Task.id, Task.start_date, Task.end_date)
+            .where(Task.id.in_(chunk), Task.workspace_id == workspace_id)
+        ):
+            spans[row.id] = (row.start_date, row.end_date)
+
+    subgraph = {t: [s for s in successors.get(t, ()) if s in spans] for t in downstream | sources}
+    order = topological_order(subgraph, subgraph)
+
+    shifted = []
+    for current in order:
+        if current in sources or current not in spans:
+            continue
+        start, end = spans[current]
+        required = max((spans[p][1] for p in predecessors.get(current, ()) if p in spans), default=start)
+        if required > start:
+            delta = required - start
+            spans[current] = (start + delta, end + delta)
+            shifted.append((current, start + delta, end + delta))
+
+    if shifted:
+        table = Task.__table__
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('_id'))
+            .values(start_date=bindparam('_start'), end_date=bindparam('_end')),
+            [{'_id': t, '_start': start, '_end': end} for t, start, end in shifted],
+        )
+    return shifted
@@ -1,22 +1,206 @@
-"""CLI for bulk importing task status updates from CSV."""
+"""CLI for bulk importing task status updates from CSV.
+
+Usage:
+    python import_status_updates.py <workspace_slug> <csv_path> [--dry-run] [--dedupe-content]
+    python import_status_updates.py --batch <manifest.csv|directory> [--workers N] [--dry-run] [--dedupe-content]
+
+Batch mode takes either a manifest CSV with ``workspace_slug,csv_path`` columns
+(paths relative to the manifest) or a directory laid out as
+``<directory>/<workspace_slug>/*.csv``. Files are imported concurrently in a
+process pool; each worker builds the app once and uses its own DB session.
+
+--dedupe-content skips rows whose task, created_at and normalized content
+match an existing update, for feeds that do not supply external_id.
+"""
 
 from __future__ import annotations
 
+import csv
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
 from app import create_app
-from status_update_import import import_status_updates_from_text
+from models import db
+from status_update_import import ImportSummary, import_status_updates_from_text
+
+USAGE = (
+    'Usage: python import_status_updates.py <workspace_slug> <csv_path> [--dry-run] [--dedupe-content]\n'
+    '       python import_status_updates.py --batch <manifest.csv|directory> [--workers N] [--dry-run] '
+    '[--dedupe-content]'
+)
+
+# Concurrent workers all write to the same SQLite file; give them room to wait
+# for each other's write locks instead of failing with "database is locked".
+BATCH_SQLITE_TIMEOUT_SECONDS = 60
+
+
+@dataclass
+class BatchJob:
+    workspace_slug: str
+    csv_path: Path
+
+
+@dataclass
+class BatchResult:
+    job: BatchJob
+    summary: ImportSummary | None = None
+    error: str | None = None
+
+    @property
+    def exit_code(self) -> int:
+        if self.error:
+            return 1
+        return 0 if self.summary.errors == 0 else 2
+
+
+def collect_batch_jobs(source: Path) -> list[BatchJob]:
+    """Expand a manifest file or a per-workspace directory into import jobs."""
+    if source.is_dir():
+        jobs = []
+        for workspace_dir in sorted(p for p in source.iterdir() if p.is_dir()):
+            for csv_path in sorted(workspace_dir.glob('*.csv')):
+                jobs.append(BatchJob(workspace_dir.name, csv_path))
+        return jobs
+
+    with source.open(newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        missing = {'workspace_slug', 'csv_path'} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f'manifest is missing required columns: {", ".join(sorted(missing))}')
+        jobs = []
+        for row_num, row in enumerate(reader, start=2):
+            slug = (row['workspace_slug'] or '').strip()
+            raw_path = (row['csv_path'] or '').strip()
+            if not slug or not raw_path:
+                raise ValueError(f'manifest row {row_num}: workspace_slug and csv_path are required')
+            jobs.append(BatchJob(slug, source.parent / raw_path))
+        return jobs
+
+
+_worker_app = None
+
+
+def _init_worker() -> None:
+    global _worker_app
+    _worker_app = create_app({
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': BATCH_SQLITE_TIMEOUT_SECONDS}},
+    })
+
+
+def _run_job(job: BatchJob, dry_run: bool, dedupe_content: bool) -> BatchResult:
+    if not job.csv_path.exists():
+        return BatchResult(job, error=f'{job.csv_path} not found')
+    with _worker_app.app_context():
+        try:
+            summary = import_status_updates_from_text(
+                job.csv_path.read_text(encoding='utf-8'),
+                workspace_slug=job.workspace_slug,
+                dry_run=dry_run,
+                dedupe_content=dedupe_content,
+            )
+        except (ValueError, UnicodeDecodeError) as exc:
+            db.session.rollback()
+            return BatchResult(job, error=str(exc))
+        except Exception as exc:  # reported as this file's failure; the rest of the batch carries on
+            db.session.rollback()
+            return BatchResult(job, error=f'{type(exc).__name__}: {exc}')
+        finally:
+            db.session.remove()
+    return BatchResult(job, summary=summary)
+
+
+def run_batch(jobs: list[BatchJob], dry_run: bool = False, dedupe_content: bool = False,
+              workers: int | None = None) -> list[BatchResult]:
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_run_job, jobs, [dry_run] * len(jobs), [dedupe_content] * len(jobs)))
+
+
+def print_summary(summary: ImportSummary) -> None:
+    print(
+        f'Workspace: {summary.workspace_slug}\n'
+        f'Mode: {"dry-run" if summary.dry_run else "import"}\n'
+        f'Imported: {summary.imported}\n'
+        f'Skipped: {summary.skipped}\n'
+        f'Errors: {summary.errors}\n'
+    )
+    for result in summary.results:
+        print(f'row {result.row_num}: {result.status} - {result.message}')
+
+
+def batch_main(args: list[str]) -> int:
+    dry_run = '--dry-run' in args
+    dedupe_content = '--dedupe-content' in args
+    workers = None
+    if '--workers' in args:
+        idx = args.index('--workers')
+        try:
+            workers = int(args[idx + 1])
+        except (IndexError, ValueError):
+            print('Error: --workers expects a number')
+            return 1
+        del args[idx:idx + 2]
+    positional = [a for a in args if not a.startswith('--')]
+    if len(positional) != 1:
+        print(USAGE)
+        return 1
+
+    source = Path(positional[0])
+    if not source.exists():
+        print(f'Error: {source} not found')
+        return 1
+    try:
+        jobs = collect_batch_jobs(source)
+    except ValueError as exc:
+        print(f'Error: {exc}')
+        return 1
+    if not jobs:
+        print(f'No CSV files found in {source}')
+        return 0
+
+    results = run_batch(jobs, dry_run=dry_run, dedupe_content=dedupe_content, workers=workers)
+
+    totals = {'imported': 0, 'skipped': 0, 'errors': 0}
+    for result in results:
+        label = f'{result.job.workspace_slug} <- {result.job.csv_path}'
+        if result.error:
+            print(f'{label}: failed - {result.error}')
+            continue
+        summary = result.summary
+        totals['imported'] += summary.imported
+        totals['skipped'] += summary.skipped
+        totals['errors'] += summary.errors
+        print(f'{label}: imported {summary.imported}, skipped {summary.skipped}, errors {summary.errors}')
+        for row in summary.results:
+            if row.status == 'error':
+                print(f'  row {row.row_num}: {row.message}')
+
+    failed = sum(1 for r in results if r.error)
+    print(
+        f'\nMode: {"dry-run" if dry_run else "import"}\n'
+        f'Files: {len(results)} ({failed} failed)\n'
+        f'Imported: {totals["imported"]}\n'
+        f'Skipped: {totals["skipped"]}\n'
+        f'Errors: {totals["errors"]}'
+    )
+    return max(r.exit_code for r in results)
 
 
 def main() -> int:
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        return batch_main(sys.argv[2:])
+
     if len(sys.argv) < 3:
-        print('Usage: python import_status_updates.py <workspace_slug> <csv_path> [--dry-run]')
+        print(USAGE)
         return 1
 
     workspace_slug = sys.argv[1]
     csv_path = Path(sys.argv[2])
     dry_run = '--dry-run' in sys.argv[3:]
+    dedupe_content = '--dedupe-content' in sys.argv[3:]
 
     if not csv_path.exists():
         print(f'Error: {csv_path} not found')
@@ -28,18 +212,10 @@ def main() -> int:
             csv_path.read_text(encoding='utf-8'),
             workspace_slug=workspace_slug,
             dry_run=dry_run,
+            dedupe_content=dedupe_content,
         )
 
-    print(
-        f'Workspace: {summary.workspace_slug}\n'
-        f'Mode: {"dry-run" if summary.dry_run else "import"}\n'
-        f'Imported: {summary.imported}\n'
-        f'Skipped: {summary.skipped}\n'
-        f'Errors: {summary.errors}\n'
-    )
-    for result in summary.results:
-        print(f'row {result.row_num}: {result.status} - {result.message}')
-
+    print_summary(summary)
     return 0 if summary.errors == 0 else 2
 
 
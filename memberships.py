@@ -0,0 +1,99 @@
+"""Set-based team membership handling for the team and person forms.
+
+The submitted ids are checked against the workspace's live people or teams
+with one IN query, compared with the current person_teams rows, and only
+the rows that actually change are inserted or deleted. Links to deleted
+people or teams are left alone so an undo brings them back intact. Saving a
+team costs the same handful of statements however big the workspace is.
+
+Lists show member counts and a short preview of names per team, each read
+with one grouped query instead of loading every team's members.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import func, select
+
+from models import db, Person, Team, person_teams
+
+MEMBER_PREVIEW = 12
+
+
+def _set_links(owner, owner_column, other_column, other_model, wanted_ids) -> tuple[int, int]:
+    other = other_model.__table__
+    live = select(other.c.id).where(other.c.workspace_id == owner.workspace_id, other.c.deleted_at.is_(None))
+    db.session.flush()
+    wanted = set(db.session.execute(live.where(other.c.id.in_(wanted_ids))).scalars()) if wanted_ids else set()
+    current = set(db.session.execute(
+        select(other_column).where(owner_column == owner.id, other_column.in_(live))
+    ).scalars())
+
+    stale, added = current - wanted, wanted - current
+    if stale:
+        db.session.execute(person_teams.delete().where(owner_column == owner.id, other_column.in_(stale)))
+    if added:
+        db.session.execute(person_teams.insert(), [{owner_column.key: owner.id, other_column.key: other_id}
+                                                   for other_id in sorted(added)])
+    return len(added), len(stale)
+
+
+def set_team_members(team: Team, person_ids) -> tuple[int, int]:
+    """Make the team's live members exactly ``person_ids``; returns (added, removed)."""
+    counts = _set_links(team, person_teams.c.team_id, person_teams.c.person_id, Person, set(person_ids))
+    # The links were written behind the ORM's back.
+    db.session.expire(team, ['members'])
+    return counts
+
+
+def set_person_teams(person: Person, team_ids) -> tuple[int, int]:
+    """Make the person's live teams exactly ``team_ids``; returns (added, removed)."""
+    counts = _set_links(person, person_teams.c.person_id, person_teams.c.team_id, Team, set(team_ids))
+    db.session.expire(person, ['teams'])
+    return counts
+
+
+def _live_members():
+    p = Person.__table__
+    return person_teams.join(p, (p.c.id == person_teams.c.person_id) & p.c.deleted_at.is_(None))
+
+
+def member_counts(workspace_id: int) -> dict[int, int]:
+    """Live member count per team id; teams without members are missing."""
+    p = Person.__table__
+    return dict(db.session.execute(
+        select(person_teams.c.team_id, func.count())
+        .select_from(_live_members())
+        .where(p.c.workspace_id == workspace_id)
+        .group_by(person_teams.c.team_id)
+    ).all())
+
+
+def member_previews(workspace_id: int, limit: int = MEMBER_PREVIEW) -> dict[int, list]:
+    """The first ``limit`` live members of every team by name, as rows with id and name."""
+    p = Person.__table__
+    rank = func.row_number().over(partition_by=person_teams.c.team_id, order_by=(p.c.name, p.c.id))
+    ranked = (select(person_teams.c.team_id, p.c.id, p.c.name, rank.label('rank'))
+              .select_from(_live_members())
+              .where(p.c.workspace_id == workspace_id)
+              .subquery())
+    previews: dict[int, list] = {}
+    for row in db.session.execute(
+        select(ranked.c.team_id, ranked.c.id, ranked.c.name)
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.team_id, ranked.c.rank)
+    ):
+        previews.setdefault(row.team_id, []).append(row)
+    return previews
+
+
+def team_ids_by_person(workspace_id: int) -> dict[int, list[int]]:
+    """Live team ids of every person in the workspace, for membership checkboxes."""
+    t = Team.__table__
+    teams: dict[int, list[int]] = {}
+    for person_id, team_id in db.session.execute(
+        select(person_teams.c.person_id, person_teams.c.team_id)
+        .join(t, (t.c.id == person_teams.c.team_id) & t.c.deleted_at.is_(None))
+        .where(t.c.workspace_id == workspace_id)
+    ):
+        teams.setdefault(person_id, []).append(team_id)
+    return teams
@@ -0,0 +1,48 @@
+"""Add content_hash to status updates
+
+Revision ID: 004_add_status_update_content_hash
+Revises: 003_add_status_update_external_id
+Create Date: 2026-10-19
+"""
+import hashlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004_add_status_update_content_hash'
+down_revision = '003_add_status_update_external_id'
+branch_labels = None
+depends_on = None
+
+
+def _fingerprint(task_id, created_at, content):
+    # Mirrors models.status_update_fingerprint at the time of this migration.
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    normalized = ' '.join((content or '').split()).casefold()
+    stamp = created_at.replace(tzinfo=None).isoformat(sep=' ') if created_at else ''
+    return hashlib.sha256(f'{task_id}\x1f{stamp}\x1f{normalized}'.encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    conn = op.get_bind()
+    # app.ensure_compatible_schema may already have added the column on startup.
+    columns = {col['name'] for col in sa.inspect(conn).get_columns('status_update')}
+    if 'content_hash' not in columns:
+        with op.batch_alter_table('status_update') as batch_op:
+            batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+            batch_op.create_index('ix_status_update_content_hash', ['content_hash'], unique=False)
+
+    rows = conn.execute(sa.text('SELECT id, task_id, created_at, content FROM status_update')).fetchall()
+    if rows:
+        conn.execute(
+            sa.text('UPDATE status_update SET content_hash = :content_hash WHERE id = :id'),
+            [{'id': r[0], 'content_hash': _fingerprint(r[1], r[2], r[3])} for r in rows],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('status_update') as batch_op:
+        batch_op.drop_index('ix_status_update_content_hash')
+        batch_op.drop_column('content_hash')
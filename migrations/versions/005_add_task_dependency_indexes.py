@@ -0,0 +1,23 @@
+"""Index task_dependency on both endpoints
+
+Revision ID: 005_add_task_dependency_indexes
+Revises: 004_add_status_update_content_hash
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '005_add_task_dependency_indexes'
+down_revision = '004_add_status_update_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # app.ensure_compatible_schema may already have created these on startup.
+    op.execute('CREATE INDEX IF NOT EXISTS ix_task_dependency_task_id ON task_dependency (task_id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_task_dependency_depends_on_id ON task_dependency (depends_on_id)')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_task_dependency_depends_on_id')
+    op.execute('DROP INDEX IF EXISTS ix_task_dependency_task_id')
@@ -0,0 +1,44 @@
+"""Materialize milestone status
+
+Revision ID: 006_add_milestone_status
+Revises: 005_add_task_dependency_indexes
+Create Date: 2026-10-19
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006_add_milestone_status'
+down_revision = '005_add_task_dependency_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    # app.ensure_compatible_schema may already have added the column on startup.
+    columns = {col['name'] for col in sa.inspect(conn).get_columns('milestone')}
+    if 'status' not in columns:
+        with op.batch_alter_table('milestone') as batch_op:
+            batch_op.add_column(sa.Column('status', sa.String(length=20), nullable=False,
+                                          server_default='on_track'))
+            batch_op.create_index('ix_milestone_status', ['status'], unique=False)
+
+    # Mirrors models.refresh_milestone_statuses at the time of this migration.
+    conn.execute(sa.text("""
+        UPDATE milestone SET status = CASE
+            WHEN COALESCE(status_override, '') != '' THEN status_override
+            WHEN (SELECT project.status FROM project JOIN task ON task.project_id = project.id
+                  WHERE task.id = milestone.task_id) = 'on_hold' THEN 'on_hold'
+            WHEN milestone.date < :today
+                 AND (SELECT task.status FROM task WHERE task.id = milestone.task_id) != 'done' THEN 'delayed'
+            ELSE 'on_track'
+        END
+    """), {'today': date.today().isoformat()})
+
+
+def downgrade():
+    with op.batch_alter_table('milestone') as batch_op:
+        batch_op.drop_index('ix_milestone_status')
+        batch_op.drop_column('status')
@@ -0,0 +1,27 @@
+"""Add the FTS5 search index over tasks, projects and status updates
+
+Revision ID: 007_add_search_index
+Revises: 006_add_milestone_status
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from search import ensure_search_index
+
+revision = '007_add_search_index'
+down_revision = '006_add_milestone_status'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Creates the table and triggers if missing and backfills a new index;
+    # app.ensure_compatible_schema may already have done this on startup.
+    ensure_search_index(op.get_bind())
+
+
+def downgrade():
+    for table in ('task', 'project', 'status_update'):
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS search_{table}_{suffix}')
+    op.execute('DROP TABLE IF EXISTS search_index')
@@ -0,0 +1,29 @@
+"""Add workspace.roster_version
+
+Revision ID: 008_add_workspace_roster_version
+Revises: 007_add_search_index
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008_add_workspace_roster_version'
+down_revision = '007_add_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    # app.ensure_compatible_schema may already have added the column on startup.
+    columns = {col['name'] for col in sa.inspect(conn).get_columns('workspace')}
+    if 'roster_version' not in columns:
+        with op.batch_alter_table('workspace') as batch_op:
+            batch_op.add_column(sa.Column('roster_version', sa.String(length=32), nullable=False,
+                                          server_default='0'))
+        conn.execute(sa.text("UPDATE workspace SET roster_version = lower(hex(randomblob(16)))"))
+
+
+def downgrade():
+    with op.batch_alter_table('workspace') as batch_op:
+        batch_op.drop_column('roster_version')
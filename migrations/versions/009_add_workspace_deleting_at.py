@@ -0,0 +1,26 @@
+"""Add workspace.deleting_at for background deletion
+
+Revision ID: 009_add_workspace_deleting_at
+Revises: 008_add_workspace_roster_version
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009_add_workspace_deleting_at'
+down_revision = '008_add_workspace_roster_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # app.ensure_compatible_schema may already have added the column on startup.
+    columns = {col['name'] for col in sa.inspect(op.get_bind()).get_columns('workspace')}
+    if 'deleting_at' not in columns:
+        with op.batch_alter_table('workspace') as batch_op:
+            batch_op.add_column(sa.Column('deleting_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('workspace') as batch_op:
+        batch_op.drop_column('deleting_at')
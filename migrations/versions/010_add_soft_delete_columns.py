@@ -0,0 +1,33 @@
+"""Add deleted_at to team, person, project and task for soft delete
+
+Revision ID: 010_add_soft_delete_columns
+Revises: 009_add_workspace_deleting_at
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '010_add_soft_delete_columns'
+down_revision = '009_add_workspace_deleting_at'
+branch_labels = None
+depends_on = None
+
+TABLES = ('team', 'person', 'project', 'task')
+
+
+def upgrade():
+    # app.ensure_compatible_schema may already have added the columns on startup.
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        if 'deleted_at' not in {col['name'] for col in inspector.get_columns(table)}:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_{table}_deleted_at ON {table} (deleted_at)')
+
+
+def downgrade():
+    # Dropped in place (SQLite 3.35+) rather than in batch mode, which would
+    # recreate task and break the search_index triggers that reference it.
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_deleted_at', table_name=table)
+        op.execute(f'ALTER TABLE {table} DROP COLUMN deleted_at')
@@ -0,0 +1,35 @@
+"""Add workspace.schedule_version and the triggers that replace it
+
+Revision ID: 011_add_workspace_schedule_version
+Revises: 010_add_soft_delete_columns
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from dependency_graph import ensure_schedule_triggers
+
+revision = '011_add_workspace_schedule_version'
+down_revision = '010_add_soft_delete_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    # app.ensure_compatible_schema may already have added the column on startup.
+    columns = {col['name'] for col in sa.inspect(conn).get_columns('workspace')}
+    if 'schedule_version' not in columns:
+        with op.batch_alter_table('workspace') as batch_op:
+            batch_op.add_column(sa.Column('schedule_version', sa.String(length=32), nullable=False,
+                                          server_default='0'))
+        conn.execute(sa.text("UPDATE workspace SET schedule_version = lower(hex(randomblob(16)))"))
+    ensure_schedule_triggers(conn)
+
+
+def downgrade():
+    for table in ('task', 'task_dependency'):
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS schedule_{table}_{suffix}')
+    with op.batch_alter_table('workspace') as batch_op:
+        batch_op.drop_column('schedule_version')
@@ -0,0 +1,32 @@
+"""Add import_preview for status update previews shared across workers
+
+Revision ID: 012_add_import_preview
+Revises: 011_add_workspace_schedule_version
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '012_add_import_preview'
+down_revision = '011_add_workspace_schedule_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() on startup may already have created the table.
+    if 'import_preview' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'import_preview',
+        sa.Column('token', sa.String(length=32), primary_key=True),
+        sa.Column('workspace_id', sa.Integer(), sa.ForeignKey('workspace.id'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('plan', sa.Text(), nullable=False),
+    )
+    op.create_index('ix_import_preview_expires_at', 'import_preview', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_import_preview_expires_at', table_name='import_preview')
+    op.drop_table('import_preview')
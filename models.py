@@ -1,4 +1,8 @@
+import hashlib
+import uuid
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, case, event, exists, func, inspect as sa_inspect, or_, select
+from sqlalchemy.orm import Session, with_loader_criteria
 from datetime import datetime, date
 
 db = SQLAlchemy()
@@ -26,12 +30,23 @@ class Workspace(db.Model):
     id   = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     slug = db.Column(db.String(100), unique=True, nullable=False)
+    # Random token replaced whenever a person in the workspace is added,
+    # renamed or removed; roster caches and the roster ETag are keyed on it.
+    roster_version = db.Column(db.String(32), nullable=False, default=lambda: uuid.uuid4().hex,
+                               server_default='0')
+    # Random token replaced by SQLite triggers whenever a task's dates or a
+    # dependency edge in the workspace change (dependency_graph.py).
+    schedule_version = db.Column(db.String(32), nullable=False, default=lambda: uuid.uuid4().hex,
+                                 server_default='0')
+    # Set when the workspace is being deleted in the background (deletion.py).
+    deleting_at = db.Column(db.DateTime, nullable=True)
 
 
 class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     workspace_id = db.Column(db.Integer, db.ForeignKey('workspace.id'), nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     members = db.relationship('Person', secondary='person_teams',
                               backref=db.backref('teams', lazy=True))
 
@@ -41,6 +56,7 @@ class Person(db.Model):
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120))
     workspace_id = db.Column(db.Integer, db.ForeignKey('workspace.id'), nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     assignments = db.relationship('TaskAssignment', backref='person', lazy=True)
 
 
@@ -52,6 +68,7 @@ class Project(db.Model):
     end_date = db.Column(db.Date)
     status = db.Column(db.String(20), default='active')  # active, completed, on_hold
     workspace_id = db.Column(db.Integer, db.ForeignKey('workspace.id'), nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     tasks = db.relationship('Task', backref='project', lazy=True, cascade='all, delete-orphan')
 
 
@@ -65,6 +82,7 @@ class Task(db.Model):
     end_date = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(20), default='todo')  # todo, in_progress, done
     priority = db.Column(db.String(20), default='medium')  # low, medium, high, critical
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
 
     assignments = db.relationship('TaskAssignment', backref='task', lazy=True,
                                    cascade='all, delete-orphan')
@@ -107,8 +125,8 @@ class Task(db.Model):
 class TaskDependency(db.Model):
     __tablename__ = 'task_dependency'
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False)
-    depends_on_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False, index=True)
+    depends_on_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False, index=True)
 
 
 class TaskAssignment(db.Model):
@@ -132,17 +150,14 @@ class Milestone(db.Model):
     name = db.Column(db.String(200), nullable=False)
     date = db.Column(db.Date, nullable=False)
     status_override = db.Column(db.String(20), nullable=True)  # on_track, delayed, on_hold
+    # Materialized from status_override, the task/project status and today's
+    # date by refresh_milestone_statuses(); kept current on flush and daily.
+    status = db.Column(db.String(20), nullable=False, default='on_track',
+                       server_default='on_track', index=True)
 
     @property
     def computed_status(self):
-        if self.status_override:
-            return self.status_override
-        today = date.today()
-        if self.task.project.status == 'on_hold':
-            return 'on_hold'
-        if self.date < today and self.task.status != 'done':
-            return 'delayed'
-        return 'on_track'
+        return self.status
 
 
 class StatusUpdate(db.Model):
@@ -151,5 +166,170 @@ class StatusUpdate(db.Model):
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
     external_id = db.Column(db.String(255), nullable=True, index=True)
+    # Fingerprint of (task, created_at, normalized content) used to dedupe
+    # imports from sources that do not supply external_id.
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
     mentions = db.relationship('Person', secondary=status_update_mentions,
                                backref=db.backref('mentioned_in', lazy=True))
+
+
+class ImportPreview(db.Model):
+    # A previewed status update import waiting to be committed, stored as JSON
+    # so any worker process can commit it (status_update_import.py).
+    token = db.Column(db.String(32), primary_key=True)
+    workspace_id = db.Column(db.Integer, db.ForeignKey('workspace.id'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    plan = db.Column(db.Text, nullable=False)
+
+
+def status_update_fingerprint(task_id, created_at, content):
+    """Stable hash of an update's task, timestamp and whitespace/case-normalized text."""
+    normalized = ' '.join((content or '').split()).casefold()
+    # SQLite stores naive datetimes, so drop tzinfo to match values read back.
+    stamp = created_at.replace(tzinfo=None).isoformat(sep=' ') if created_at else ''
+    return hashlib.sha256(f'{task_id}\x1f{stamp}\x1f{normalized}'.encode('utf-8')).hexdigest()
+
+
+@event.listens_for(StatusUpdate, 'before_insert')
+def _fill_status_update_content_hash(mapper, connection, target):
+    if target.created_at is None:
+        target.created_at = datetime.now()
+    if target.content_hash is None:
+        target.content_hash = status_update_fingerprint(target.task_id, target.created_at, target.content)
+
+
+def refresh_milestone_statuses(connection=None, milestone_ids=None, task_ids=None,
+                               project_ids=None, today=None) -> int:
+    """Recompute Milestone.status in one UPDATE; returns the number of rows changed.
+
+    With no ids every milestone is checked (the daily refresh); otherwise only
+    milestones matching any of the given milestone, task or project ids.
+    """
+    m, t, p = Milestone.__table__, Task.__table__, Project.__table__
+    today = today or date.today()
+    task_status = select(t.c.status).where(t.c.id == m.c.task_id).scalar_subquery()
+    project_status = (select(p.c.status).join(t, t.c.project_id == p.c.id)
+                      .where(t.c.id == m.c.task_id).scalar_subquery())
+    status = case(
+        (func.coalesce(m.c.status_override, '') != '', m.c.status_override),
+        (project_status == 'on_hold', 'on_hold'),
+        (and_(m.c.date < today, task_status != 'done'), 'delayed'),
+        else_='on_track',
+    )
+    stmt = m.update().values(status=status).where(m.c.status != status)
+
+    scopes = []
+    if milestone_ids:
+        scopes.append(m.c.id.in_(milestone_ids))
+    if task_ids:
+        scopes.append(m.c.task_id.in_(task_ids))
+    if project_ids:
+        scopes.append(m.c.task_id.in_(select(t.c.id).where(t.c.project_id.in_(project_ids))))
+    if milestone_ids is not None or task_ids is not None or project_ids is not None:
+        if not scopes:
+            return 0
+        stmt = stmt.where(or_(*scopes))
+
+    return (connection or db.session).execute(stmt).rowcount
+
+
+def _status_changed(obj) -> bool:
+    return sa_inspect(obj).attrs.status.history.has_changes()
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_flushed_milestones(session, flush_context):
+    """Recompute milestones touched by this flush, including via task/project status."""
+    milestone_ids, task_ids, project_ids = set(), set(), set()
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Milestone):
+            milestone_ids.add(obj.id)
+        elif isinstance(obj, Task) and obj not in session.new and _status_changed(obj):
+            task_ids.add(obj.id)
+        elif isinstance(obj, Project) and obj not in session.new and _status_changed(obj):
+            project_ids.add(obj.id)
+    if milestone_ids or task_ids or project_ids:
+        refresh_milestone_statuses(session.connection(), milestone_ids, task_ids, project_ids)
+        session.info['milestones_refreshed'] = True
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _expire_refreshed_milestones(session, flush_context):
+    if session.info.pop('milestones_refreshed', False):
+        for obj in list(session.identity_map.values()):
+            if isinstance(obj, Milestone):
+                session.expire(obj, ['status'])
+
+
+def bump_roster_version(connection=None, workspace_ids=None) -> None:
+    """Give the workspaces a new roster_version after people change."""
+    if not workspace_ids:
+        return
+    w = Workspace.__table__
+    (connection or db.session).execute(
+        w.update().values(roster_version=uuid.uuid4().hex).where(w.c.id.in_(workspace_ids))
+    )
+
+
+def _roster_changed(person) -> bool:
+    attrs = sa_inspect(person).attrs
+    return any(getattr(attrs, name).history.has_changes() for name in ('name', 'workspace_id', 'deleted_at'))
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_rosters(session, flush_context):
+    workspace_ids = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Person) and (obj in session.new or obj in session.deleted or _roster_changed(obj)):
+            workspace_ids.add(obj.workspace_id)
+            for old in sa_inspect(obj).attrs.workspace_id.history.deleted or ():
+                workspace_ids.add(old)
+    workspace_ids.discard(None)
+    if workspace_ids:
+        bump_roster_version(session.connection(), workspace_ids)
+        session.info['rosters_bumped'] = workspace_ids
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _expire_bumped_rosters(session, flush_context):
+    for workspace_id in session.info.pop('rosters_bumped', ()):
+        workspace = session.identity_map.get(sa_inspect(Workspace).identity_key_from_primary_key((workspace_id,)))
+        if workspace is not None:
+            session.expire(workspace, ['roster_version'])
+
+
+# Soft delete: Team, Person, Project and Task rows with deleted_at set are
+# left out of every ORM query, relationship loads included, together with
+# the assignments, dependencies, milestones and status updates that point at
+# a deleted task or person. Pass execution_options(include_deleted=True) to
+# see them; Core statements on the tables are not filtered. The rows are
+# removed for good by deletion.purge_deleted() once the undo window is over.
+SOFT_DELETE_MODELS = (Team, Person, Project, Task)
+# Aliased so the subqueries never correlate with a task or person in the outer query.
+_task_table, _person_table = Task.__table__.alias('deleted_task'), Person.__table__.alias('deleted_person')
+
+
+def _live(table, id_column):
+    return ~exists().where(table.c.id == id_column, table.c.deleted_at.isnot(None)).correlate_except(table)
+
+
+# Applied afresh to every SELECT, relationship loads included, so the options
+# need not ride along on the loaded objects.
+_CRITERIA_OPTIONS = {'include_aliases': True, 'propagate_to_loaders': False}
+_HIDE_DELETED = [
+    *(with_loader_criteria(model, lambda cls: cls.deleted_at.is_(None), **_CRITERIA_OPTIONS)
+      for model in SOFT_DELETE_MODELS),
+    with_loader_criteria(Milestone, lambda cls: _live(_task_table, cls.task_id), **_CRITERIA_OPTIONS),
+    with_loader_criteria(StatusUpdate, lambda cls: _live(_task_table, cls.task_id), **_CRITERIA_OPTIONS),
+    with_loader_criteria(TaskAssignment, lambda cls: and_(
+        _live(_task_table, cls.task_id), _live(_person_table, cls.person_id)), **_CRITERIA_OPTIONS),
+    with_loader_criteria(TaskDependency, lambda cls: and_(
+        _live(_task_table, cls.task_id), _live(_task_table, cls.depends_on_id)), **_CRITERIA_OPTIONS),
+]
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _hide_soft_deleted(state):
+    # Column loads refresh objects already in the session, deleted or not.
+    if state.is_select and not state.is_column_load and not state.execution_options.get('include_deleted'):
+        state.statement = state.statement.options(*_HIDE_DELETED)
@@ -0,0 +1,184 @@
+"""Per-request SQL, template and JSON timings.
+
+RequestTiming hooks SQLAlchemy's cursor events, Flask's request and template
+signals and the app's JSON provider, and adds up for each request:
+
+- the number of SQL statements and the time spent executing them,
+- the time spent rendering templates,
+- the time spent serialising JSON responses.
+
+The totals go out as a ``Server-Timing`` header (shown in the browser
+devtools' network panel) and as one JSON log line on the
+``taskmaster.request_timing`` logger. With ``REQUEST_TIMING_PANEL`` set, HTML
+pages also get a small panel listing the statements that ran most often, so
+a lazy load per row stands out at a glance.
+
+Config: ``SERVER_TIMING`` (default on), ``REQUEST_TIMING_LOG`` (default on)
+and ``REQUEST_TIMING_PANEL`` (default off). Statements run outside a request,
+e.g. by the background purger, are not counted.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from flask import (before_render_template, current_app, g, has_request_context, render_template, request,
+                   request_started, template_rendered)
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('taskmaster.request_timing')
+
+PANEL_STATEMENTS = 10
+
+
+@dataclass
+class RequestTimings:
+    started: float = field(default_factory=perf_counter)
+    queries: int = 0
+    db_seconds: float = 0.0
+    template_seconds: float = 0.0
+    json_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    statement_seconds: Counter = field(default_factory=Counter)
+    _template_started: list[float] = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        return perf_counter() - self.started
+
+    def to_json(self) -> dict:
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_seconds * 1000, 2),
+            'template_ms': round(self.template_seconds * 1000, 2),
+            'json_ms': round(self.json_seconds * 1000, 2),
+            'total_ms': round(self.total_seconds * 1000, 2),
+        }
+
+    def server_timing(self) -> str:
+        return ', '.join([
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_seconds * 1000:.2f};desc="Templates"',
+            f'json;dur={self.json_seconds * 1000:.2f};desc="JSON"',
+            f'app;dur={self.total_seconds * 1000:.2f};desc="Total"',
+        ])
+
+    def repeated_statements(self, limit: int = PANEL_STATEMENTS) -> list[tuple[str, int, float]]:
+        """The most frequent statements as (sql, count, seconds), most frequent first."""
+        return [(sql, count, self.statement_seconds[sql]) for sql, count in self.statements.most_common(limit)]
+
+
+def current_timings() -> RequestTimings | None:
+    """The running totals for the current request, if it is being timed."""
+    return g.get('request_timings') if has_request_context() else None
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        timings = current_timings()
+        if timings is None:
+            return super().dumps(obj, **kwargs)
+        start = perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            timings.json_seconds += perf_counter() - start
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_timings() is not None:
+        conn.info.setdefault('request_timing_started', []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = current_timings()
+    starts = conn.info.get('request_timing_started')
+    if timings is None or not starts:
+        return
+    elapsed = perf_counter() - starts.pop()
+    timings.queries += 1
+    timings.db_seconds += elapsed
+    timings.statements[statement] += 1
+    timings.statement_seconds[statement] += elapsed
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    starts = connection.info.get('request_timing_started') if connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _request_started(sender, **extra):
+    g.request_timings = RequestTimings()
+
+
+def _before_render_template(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None:
+        timings._template_started.append(perf_counter())
+
+
+def _template_rendered(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None and timings._template_started:
+        timings.template_seconds += perf_counter() - timings._template_started.pop()
+
+
+class RequestTiming:
+    """Flask extension recording per-request timings; see the module docstring."""
+
+    _engine_hooked = False
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SERVER_TIMING', True)
+        app.config.setdefault('REQUEST_TIMING_LOG', True)
+        app.config.setdefault('REQUEST_TIMING_PANEL', False)
+        app.json = TimedJSONProvider(app)
+        if not RequestTiming._engine_hooked:
+            # Every engine, so each app and bind is covered; statements are
+            # only counted while a timed request is active on this thread.
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+            RequestTiming._engine_hooked = True
+        request_started.connect(_request_started, app)
+        before_render_template.connect(_before_render_template, app)
+        template_rendered.connect(_template_rendered, app)
+        # Registered before the app's other after_request functions so it runs
+        # after them and sees their queries too.
+        app.after_request(self._finish)
+
+    def _finish(self, response):
+        timings = current_timings()
+        if timings is None:
+            return response
+        config = current_app.config
+        if config['SERVER_TIMING']:
+            response.headers['Server-Timing'] = timings.server_timing()
+        if config['REQUEST_TIMING_LOG']:
+            logger.info(json.dumps({'method': request.method, 'path': request.path, 'endpoint': request.endpoint,
+                                    'status': response.status_code, **timings.to_json()}))
+        if config['REQUEST_TIMING_PANEL'] and response.mimetype == 'text/html' and not response.is_streamed:
+            _inject_panel(response, timings)
+        return response
+
+
+def _inject_panel(response, timings: RequestTimings) -> None:
+    body = response.get_data(as_text=True)
+    end = body.rfind('</body>')
+    if end == -1:
+        return
+    panel = render_template('request_timing.html', summary=timings.to_json(),
+                            statements=timings.repeated_statements())
+    response.set_data(body[:end] + panel + body[end:])
@@ -0,0 +1,118 @@
+"""Workspace people roster for @mention autocomplete.
+
+The roster is the compact (id, name) list of a workspace's people. It is
+cached in process per workspace together with a sorted token index, so a
+prefix lookup is a binary search rather than a LIKE scan of the person
+table. Workspace.roster_version changes whenever a person is added, renamed
+or removed; it validates the cache (the workspace row is already loaded by
+every request, so a cache hit costs no query) and doubles as the ETag of
+the roster endpoint, which lets browsers keep the list and filter locally.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+
+from models import db, Person
+
+CACHE_MAX_ENTRIES = 64
+DEFAULT_LIMIT = 10
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token.casefold() for token in _TOKEN_RE.findall(text or '')]
+
+
+@dataclass
+class Roster:
+    version: str
+    people: list[tuple[int, str]]  # ordered by name
+    # (token, position in people) for every word of every name, sorted
+    tokens: list[tuple[str, int]] = field(default_factory=list)
+    # casefolded name -> id, built on first use
+    by_name: dict[str, int] | None = None
+
+    @classmethod
+    def build(cls, version: str, people: list[tuple[int, str]]) -> 'Roster':
+        tokens = sorted({(token, i) for i, (_, name) in enumerate(people) for token in tokenize(name)})
+        return cls(version=version, people=people, tokens=tokens)
+
+    def _positions(self, prefix: str) -> set[int]:
+        tokens = self.tokens
+        i = bisect_left(tokens, (prefix, -1))
+        positions = set()
+        while i < len(tokens) and tokens[i][0].startswith(prefix):
+            positions.add(tokens[i][1])
+            i += 1
+        return positions
+
+    def search(self, q: str, limit: int = DEFAULT_LIMIT) -> list[tuple[int, str]]:
+        """People with a name word starting with each word of q, by name.
+
+        "ja sm" finds "Jane Smith"; an empty query returns the first people.
+        """
+        words = tokenize(q)
+        if not words:
+            return [] if q.strip() else self.people[:limit]
+        # Narrowest prefix first keeps the intersections small.
+        matches = None
+        for word in sorted(set(words), key=len, reverse=True):
+            positions = self._positions(word)
+            matches = positions if matches is None else matches & positions
+            if not matches:
+                return []
+        return [self.people[i] for i in sorted(matches)[:limit]]
+
+    def find(self, name: str) -> int | None:
+        """Id of the person called ``name`` (ignoring case), as @mentions are resolved."""
+        if self.by_name is None:
+            by_name = {}
+            for person_id, person_name in self.people:
+                by_name.setdefault(person_name.casefold(), person_id)
+            self.by_name = by_name
+        return self.by_name.get(name.casefold())
+
+    def to_json(self) -> list[dict]:
+        return [{'id': person_id, 'name': name} for person_id, name in self.people]
+
+
+def roster_etag(workspace) -> str:
+    return f'roster-{workspace.id}-{workspace.roster_version}'
+
+
+_cache: OrderedDict[int, Roster] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_roster(workspace) -> Roster:
+    """The workspace's roster, rebuilt only when its roster_version changed."""
+    with _cache_lock:
+        cached = _cache.get(workspace.id)
+        if cached and cached.version == workspace.roster_version:
+            _cache.move_to_end(workspace.id)
+            return cached
+
+    people = [(row.id, row.name) for row in db.session.execute(
+        select(Person.id, Person.name).where(Person.workspace_id == workspace.id).order_by(Person.name, Person.id)
+    )]
+    roster = Roster.build(workspace.roster_version, people)
+
+    with _cache_lock:
+        _cache[workspace.id] = roster
+        _cache.move_to_end(workspace.id)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return roster
+
+
+def clear_roster_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
@@ -1,4 +1,5 @@
 from .projects import bp as projects_bp
+from .search import bp as search_bp
 from .people import bp as people_bp
 from .tasks import bp as tasks_bp
 from .teams import bp as teams_bp
@@ -11,3 +12,4 @@ def register_blueprints(app):
     app.register_blueprint(people_bp, url_prefix='/w/<workspace_slug>')
     app.register_blueprint(tasks_bp, url_prefix='/w/<workspace_slug>')
     app.register_blueprint(teams_bp, url_prefix='/w/<workspace_slug>')
+    app.register_blueprint(search_bp, url_prefix='/w/<workspace_slug>')
@@ -1,13 +1,16 @@
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify, g
-from models import db, Person, Team, StatusUpdate, Milestone, TaskAssignment, Workspace
+from flask import Blueprint, abort, current_app, flash, render_template, request, redirect, url_for, jsonify, g
+from models import db, Person, Task, Team, StatusUpdate, Milestone, TaskAssignment, Workspace
 from datetime import date
+from sqlalchemy.orm import selectinload
+from deletion import can_restore, restore, soft_delete
+from memberships import set_person_teams
+from roster import load_roster, roster_etag
+from workload import compute_workload, default_window
 
 
 def _apply_teams(person):
-    """Sync person.teams based on submitted team_ids checkboxes."""
-    checked_ids = set(int(x) for x in request.form.getlist('team_ids'))
-    all_teams = Team.query.filter_by(workspace_id=person.workspace_id).all()
-    person.teams = [t for t in all_teams if t.id in checked_ids]
+    """Sync the person's teams with the submitted team_ids checkboxes."""
+    set_person_teams(person, (int(x) for x in request.form.getlist('team_ids')))
 
 bp = Blueprint('people', __name__)
 
@@ -15,7 +18,7 @@ bp = Blueprint('people', __name__)
 @bp.url_value_preprocessor
 def pull_workspace(endpoint, values):
     g.workspace_slug = values.pop('workspace_slug', None)
-    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug).first_or_404()
+    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug, deleting_at=None).first_or_404()
 
 
 @bp.url_defaults
@@ -26,10 +29,31 @@ def inject_workspace(endpoint, values):
 
 @bp.route('/people')
 def list_people():
-    people = Person.query.filter_by(workspace_id=g.workspace.id).order_by(Person.name).all()
+    people = Person.query.filter_by(workspace_id=g.workspace.id).options(
+        selectinload(Person.teams), selectinload(Person.assignments).selectinload(TaskAssignment.task),
+    ).order_by(Person.name).all()
     return render_template('people/list.html', people=people)
 
 
+@bp.route('/people/workload')
+def workload():
+    start, end = default_window()
+    return render_template('people/workload.html', start=start, end=end)
+
+
+@bp.route('/people/workload-data')
+def workload_data():
+    default_start, default_end = default_window()
+    try:
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else default_start
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else default_end
+        statuses = tuple(request.args.getlist('status')) or None
+        result = compute_workload(g.workspace.id, start, end, statuses=statuses)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(result.to_json())
+
+
 @bp.route('/people/new', methods=['GET', 'POST'])
 def new_person():
     if request.method == 'POST':
@@ -49,7 +73,11 @@ def new_person():
 
 @bp.route('/people/<int:id>')
 def detail(id):
-    person = Person.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    person = Person.query.filter_by(id=id, workspace_id=g.workspace.id).options(
+        selectinload(Person.teams),
+        selectinload(Person.assignments).selectinload(TaskAssignment.task).options(
+            selectinload(Task.project), selectinload(Task.assignments).selectinload(TaskAssignment.person)),
+    ).first_or_404()
     # Get all tasks this person is assigned to
     person_tasks = [a.task for a in person.assignments]
     # Group tasks by project
@@ -62,14 +90,14 @@ def detail(id):
     # Get all status updates that mention this person, newest first
     mentioned_updates = StatusUpdate.query.filter(
         StatusUpdate.mentions.any(id=person.id)
-    ).order_by(StatusUpdate.created_at.desc()).all()
+    ).options(selectinload(StatusUpdate.task).selectinload(Task.project)).order_by(StatusUpdate.created_at.desc()).all()
 
     # Get upcoming milestones for tasks this person is assigned to
     task_ids = [t.id for t in person_tasks]
     upcoming_milestones = Milestone.query.filter(
         Milestone.task_id.in_(task_ids),
         Milestone.date >= date.today()
-    ).order_by(Milestone.date).all() if task_ids else []
+    ).options(selectinload(Milestone.task).selectinload(Task.project)).order_by(Milestone.date).all() if task_ids else []
 
     return render_template('people/detail.html', person=person,
                            person_tasks=person_tasks,
@@ -91,24 +119,46 @@ def edit_person(id):
     return render_template('people/form.html', person=person, teams=teams)
 
 
+@bp.route('/people/roster.json')
+def roster_json():
+    """Every person in the workspace as [{id, name}], revalidated by ETag."""
+    etag = roster_etag(g.workspace)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(load_roster(g.workspace).to_json())
+    response.set_etag(etag)
+    return response
+
+
 @bp.route('/people/search.json')
 def search_json():
     q = request.args.get('q', '').strip()
-    query = Person.query.filter_by(workspace_id=g.workspace.id).order_by(Person.name)
-    if q:
-        query = query.filter(Person.name.ilike(f'%{q}%'))
-    people = query.limit(10).all()
-    return jsonify([{'id': p.id, 'name': p.name} for p in people])
+    people = load_roster(g.workspace).search(q)
+    return jsonify([{'id': person_id, 'name': name} for person_id, name in people])
 
 
 @bp.route('/people/<int:id>/delete', methods=['GET', 'POST'])
 def delete_person(id):
     person = Person.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
     if request.method == 'POST':
-        db.session.delete(person)
+        soft_delete(person)
         db.session.commit()
+        flash({'text': f'Deleted "{person.name}".',
+               'undo_url': url_for('people.restore_person', id=person.id)}, 'undo')
         return redirect(url_for('people.list_people'))
     return render_template('confirm_delete.html',
                            title='Delete Person',
-                           message=f'Are you sure you want to delete "{person.name}"? This cannot be undone.',
+                           message=f'Are you sure you want to delete "{person.name}"?',
                            cancel_url=url_for('people.detail', id=person.id))
+
+
+@bp.route('/people/<int:id>/restore', methods=['POST'])
+def restore_person(id):
+    person = Person.query.execution_options(include_deleted=True).filter_by(
+        id=id, workspace_id=g.workspace.id).first_or_404()
+    if not can_restore(person):
+        abort(404)
+    restore(person)
+    db.session.commit()
+    return redirect(url_for('people.detail', id=person.id))
@@ -1,7 +1,13 @@
 from io import BytesIO
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify, send_file, g
-from models import db, Project, Task, StatusUpdate, Milestone, Workspace
+from flask import Blueprint, abort, flash, render_template, request, redirect, url_for, jsonify, send_file, g
+from models import db, Project, Task, TaskAssignment, StatusUpdate, Milestone, Workspace
 from datetime import date
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+import cloning
+from deletion import can_restore, restore, soft_delete
+from dependency_graph import DependencyCycleError, load_schedule_analysis
+from schedule_shift import MAX_SHIFT_DAYS, shift_project
 
 bp = Blueprint('projects', __name__)
 
@@ -14,7 +20,7 @@ PROJECT_COLORS = [
 @bp.url_value_preprocessor
 def pull_workspace(endpoint, values):
     g.workspace_slug = values.pop('workspace_slug', None)
-    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug).first_or_404()
+    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug, deleting_at=None).first_or_404()
 
 
 @bp.url_defaults
@@ -30,7 +36,10 @@ def list_projects():
     if status_filter:
         q = q.filter_by(status=status_filter)
     projects = q.order_by(Project.start_date.desc()).all()
-    return render_template('projects/list.html', projects=projects, status_filter=status_filter)
+    task_counts = dict(db.session.query(Task.project_id, func.count(Task.id))
+                       .filter(Task.workspace_id == g.workspace.id).group_by(Task.project_id))
+    return render_template('projects/list.html', projects=projects, task_counts=task_counts,
+                           status_filter=status_filter)
 
 
 @bp.route('/projects/new', methods=['GET', 'POST'])
@@ -53,7 +62,10 @@ def new_project():
 
 @bp.route('/projects/<int:id>')
 def detail(id):
-    project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).options(
+        selectinload(Project.tasks).options(
+            selectinload(Task.assignments).selectinload(TaskAssignment.person), selectinload(Task.tags)),
+    ).first_or_404()
     # Collect all status updates across this project's tasks, newest first
     task_ids = [t.id for t in project.tasks]
     all_updates = StatusUpdate.query.filter(
@@ -83,25 +95,52 @@ def edit_project(id):
     return render_template('projects/form.html', project=project)
 
 
+@bp.route('/projects/<int:id>/clone', methods=['GET', 'POST'])
+def clone_project(id):
+    project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    if request.method == 'POST':
+        try:
+            days = int(request.form.get('days') or 0)
+        except ValueError:
+            abort(400)
+        copy, _ = cloning.clone_project(project, request.form.get('name', '').strip() or None, days=days)
+        db.session.commit()
+        return redirect(url_for('projects.detail', id=copy.id))
+    return render_template('projects/clone.html', project=project)
+
+
 @bp.route('/projects/<int:id>/delete', methods=['GET', 'POST'])
 def delete_project(id):
     project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
     if request.method == 'POST':
-        db.session.delete(project)
+        soft_delete(project)
         db.session.commit()
+        flash({'text': f'Deleted project "{project.name}".',
+               'undo_url': url_for('projects.restore_project', id=project.id)}, 'undo')
         return redirect(url_for('projects.list_projects'))
     return render_template('confirm_delete.html',
                            title='Delete Project',
-                           message=f'Are you sure you want to delete project "{project.name}" and all its tasks? This cannot be undone.',
+                           message=f'Are you sure you want to delete project "{project.name}" and all its tasks?',
                            cancel_url=url_for('projects.detail', id=project.id))
 
 
+@bp.route('/projects/<int:id>/restore', methods=['POST'])
+def restore_project(id):
+    project = Project.query.execution_options(include_deleted=True).filter_by(
+        id=id, workspace_id=g.workspace.id).first_or_404()
+    if not can_restore(project):
+        abort(404)
+    restore(project)
+    db.session.commit()
+    return redirect(url_for('projects.detail', id=project.id))
+
+
 @bp.route('/projects/dashboard-gantt-data')
 def dashboard_gantt_data():
     active_projects = Project.query.filter(
         Project.workspace_id == g.workspace.id,
         Project.status.in_(['active', 'completed', 'on_hold'])
-    ).order_by(Project.name).all()
+    ).options(selectinload(Project.tasks).selectinload(Task.dependencies)).order_by(Project.name).all()
     tasks = []
     legend = []
     for idx, project in enumerate(active_projects):
@@ -129,7 +168,11 @@ def export_excel(id):
     from openpyxl.styles.fills import FILL_SOLID
     from openpyxl.utils import get_column_letter
 
-    project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).options(
+        selectinload(Project.tasks).options(
+            selectinload(Task.milestones), selectinload(Task.tags),
+            selectinload(Task.assignments).selectinload(TaskAssignment.person)),
+    ).first_or_404()
 
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -236,8 +279,25 @@ def export_excel(id):
 @bp.route('/projects/<int:id>/gantt-data')
 def gantt_data(id):
     project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    return jsonify(_gantt_tasks(project, critical=request.args.get('critical') == '1'))
+
+
+def _gantt_tasks(project, critical=False):
+    critical_ids = None
+    if critical:
+        try:
+            critical_ids = load_schedule_analysis(project_id=project.id).critical_ids
+        except DependencyCycleError:
+            critical_ids = set()
+    milestones_by_task = {}
+    for ms in Milestone.query.join(Task, Milestone.task_id == Task.id).filter(
+            Task.project_id == project.id).order_by(Milestone.date):
+        milestones_by_task.setdefault(ms.task_id, []).append(
+            {'name': ms.name, 'date': ms.date.isoformat(), 'status': ms.status})
     tasks = []
-    for task in project.tasks:
+    for task in Task.query.filter_by(project_id=project.id).options(
+            selectinload(Task.dependencies),
+            selectinload(Task.assignments).selectinload(TaskAssignment.person)).order_by(Task.id):
         dep_ids = ','.join(f'task-{d.id}' for d in task.dependencies)
         lead = task.lead
         assignee_names = []
@@ -248,8 +308,6 @@ def gantt_data(id):
             if a.is_lead:
                 name += ' (lead)'
             assignee_names.append(name)
-        milestones = [{'name': ms.name, 'date': ms.date.isoformat(),
-                       'status': ms.computed_status} for ms in task.milestones]
         tasks.append({
             'id': f'task-{task.id}',
             'name': task.title,
@@ -259,6 +317,58 @@ def gantt_data(id):
             'dependencies': dep_ids,
             'custom_class': f'status-{task.status} priority-{task.priority}',
             'assignees': ', '.join(assignee_names) if assignee_names else 'Unassigned',
-            'milestones': milestones,
+            'milestones': milestones_by_task.get(task.id, []),
         })
-    return jsonify(tasks)
+        if critical_ids is not None:
+            tasks[-1]['critical'] = task.id in critical_ids
+            if tasks[-1]['critical']:
+                tasks[-1]['custom_class'] += ' critical'
+    return tasks
+
+
+@bp.route('/projects/<int:id>/shift-schedule', methods=['POST'])
+def shift_schedule(id):
+    """AJAX endpoint moving the whole schedule by ``days`` (calendar or working days).
+
+    Expects ``{"days": int, "working_days": bool, "pivot": "YYYY-MM-DD"?}``;
+    with a pivot only tasks starting on or after it move. Returns the moved
+    counts, the new project dates and the project's Gantt data.
+    """
+    project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    data = request.get_json(silent=True) or {}
+    try:
+        days = int(data.get('days'))
+        pivot = date.fromisoformat(data['pivot']) if data.get('pivot') else None
+    except (TypeError, ValueError):
+        return jsonify({'ok': False, 'error': 'Invalid shift.'}), 400
+    if abs(days) > MAX_SHIFT_DAYS:
+        return jsonify({'ok': False, 'error': f'Shift by at most {MAX_SHIFT_DAYS} days.'}), 400
+    moved = shift_project(project, days, working_days=bool(data.get('working_days')), pivot=pivot)
+    db.session.commit()
+    return jsonify({
+        'ok': True,
+        'moved': moved,
+        'start_date': project.start_date.isoformat() if project.start_date else None,
+        'end_date': project.end_date.isoformat() if project.end_date else None,
+        'tasks': _gantt_tasks(project, critical=bool(data.get('critical'))),
+    })
+
+
+def _schedule_response(**scope):
+    try:
+        analysis = load_schedule_analysis(**scope)
+    except DependencyCycleError as exc:
+        return jsonify({'error': 'Task dependencies contain a cycle.',
+                        'task_ids': [f'task-{task_id}' for task_id in exc.task_ids]}), 409
+    return jsonify(analysis.to_json())
+
+
+@bp.route('/projects/<int:id>/critical-path')
+def critical_path(id):
+    project = Project.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    return _schedule_response(project_id=project.id)
+
+
+@bp.route('/projects/critical-path')
+def workspace_critical_path():
+    return _schedule_response(workspace_id=g.workspace.id)
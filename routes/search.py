@@ -0,0 +1,41 @@
+from flask import Blueprint, render_template, request, jsonify, g
+from models import Workspace
+from search import DEFAULT_LIMIT, KIND_CODES, search
+
+bp = Blueprint('search', __name__)
+
+
+@bp.url_value_preprocessor
+def pull_workspace(endpoint, values):
+    g.workspace_slug = values.pop('workspace_slug', None)
+    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug, deleting_at=None).first_or_404()
+
+
+@bp.url_defaults
+def inject_workspace(endpoint, values):
+    if 'workspace_slug' not in values and hasattr(g, 'workspace_slug'):
+        values['workspace_slug'] = g.workspace_slug
+
+
+def _search_args():
+    return {
+        'q': request.args.get('q', '').strip(),
+        'prefix': request.args.get('prefix') == '1',
+        'kinds': [k for k in request.args.getlist('kind') if k in KIND_CODES],
+        'limit': request.args.get('limit', DEFAULT_LIMIT, type=int),
+        'offset': request.args.get('offset', 0, type=int),
+    }
+
+
+@bp.route('/search')
+def search_page():
+    args = _search_args()
+    hits = search(g.workspace.id, **args) if args['q'] else []
+    return render_template('search.html', hits=hits, **args)
+
+
+@bp.route('/search.json')
+def search_json():
+    args = _search_args()
+    hits = search(g.workspace.id, **args)
+    return jsonify({'q': args['q'], 'results': [hit.to_json() for hit in hits]})
@@ -1,18 +1,26 @@
-import base64
 import re
 from pathlib import Path
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify, g, Response
-from models import db, Task, TaskAssignment, Project, Person, Tag, StatusUpdate, TaskDependency, Milestone, Workspace
+from flask import Blueprint, abort, flash, render_template, request, redirect, url_for, jsonify, g, Response
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import selectinload
+from models import (db, Task, TaskAssignment, Project, Person, StatusUpdate, TaskDependency, Milestone, Workspace,
+                    refresh_milestone_statuses)
 from datetime import date, datetime
-from status_update_import import import_status_updates_from_text
+from deletion import can_restore, restore, soft_delete
+from dependency_graph import DependencyCycleError, find_dependency_cycle, push_dependents
+from status_update_import import apply_import_plan, build_import_plan, pop_import_plan, store_import_plan
+from tags import parse_tag_names, set_task_tags
+from task_bulk import STATUSES, apply_bulk_operation, select_task_ids
 
 bp = Blueprint('tasks', __name__)
 
+MAX_BATCH_CHANGES = 1000
+
 
 @bp.url_value_preprocessor
 def pull_workspace(endpoint, values):
     g.workspace_slug = values.pop('workspace_slug', None)
-    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug).first_or_404()
+    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug, deleting_at=None).first_or_404()
 
 
 @bp.url_defaults
@@ -30,8 +38,11 @@ def list_tasks():
         q = q.filter(Task.end_date < date.today(), Task.status != 'done')
     elif status_filter:
         q = q.filter_by(status=status_filter)
-    tasks = q.order_by(Task.end_date).all()
-    return render_template('tasks/list.html', tasks=tasks,
+    tasks = q.options(
+        selectinload(Task.project), selectinload(Task.assignments).selectinload(TaskAssignment.person),
+    ).order_by(Task.end_date).all()
+    people = Person.query.filter_by(workspace_id=g.workspace.id).order_by(Person.name).all()
+    return render_template('tasks/list.html', tasks=tasks, people=people,
                            status_filter=status_filter, overdue=overdue,
                            today=date.today())
 
@@ -40,18 +51,17 @@ def list_tasks():
 def import_status_updates():
     summary = None
     error = None
-    preview_csv_payload = None
+    preview_token = None
     pasted_csv_text = ''
 
     if request.method == 'POST':
         csv_text = None
         if request.form.get('commit_preview') == '1':
-            payload = request.form.get('preview_csv_payload', '')
-            try:
-                csv_text = base64.b64decode(payload.encode('ascii')).decode('utf-8')
-            except (ValueError, UnicodeDecodeError):
-                error = 'The preview payload was invalid. Please run preview again.'
-            dry_run = False
+            plan = pop_import_plan(request.form.get('preview_token', ''), g.workspace.id)
+            if plan is None:
+                error = 'The preview has expired. Please run preview again.'
+            else:
+                summary = apply_import_plan(plan)
         else:
             dry_run = request.form.get('dry_run') == '1'
             pasted_csv_text = request.form.get('csv_text', '')
@@ -68,19 +78,21 @@ def import_status_updates():
 
         if csv_text is not None and not error:
             try:
-                summary = import_status_updates_from_text(
-                    csv_text,
-                    workspace_slug=g.workspace.slug,
-                    dry_run=dry_run,
-                )
+                plan = build_import_plan(csv_text, workspace_slug=g.workspace.slug, dry_run=dry_run,
+                                         dedupe_content=request.form.get('dedupe_content') == '1')
+                summary = plan.summary
                 if dry_run:
-                    preview_csv_payload = base64.b64encode(csv_text.encode('utf-8')).decode('ascii')
+                    db.session.rollback()
+                    if summary.errors == 0:
+                        preview_token = store_import_plan(plan)
+                else:
+                    summary = apply_import_plan(plan)
             except ValueError as exc:
                 error = str(exc)
 
     return render_template('tasks/import_status_updates.html',
                            summary=summary, error=error,
-                           preview_csv_payload=preview_csv_payload,
+                           preview_token=preview_token,
                            pasted_csv_text=pasted_csv_text)
 
 
@@ -154,13 +166,7 @@ def new_task():
                 db.session.add(TaskAssignment(task_id=task.id, person_id=int(mid), is_lead=False))
 
         # Handle tags
-        tag_names = [t.strip() for t in request.form.get('tags', '').split(',') if t.strip()]
-        for name in tag_names:
-            tag = Tag.query.filter_by(workspace_id=g.workspace.id, name=name).first()
-            if not tag:
-                tag = Tag(name=name, workspace_id=g.workspace.id)
-                db.session.add(tag)
-            task.tags.append(tag)
+        set_task_tags(task, parse_tag_names(request.form.get('tags')))
 
         # Handle dependencies
         dep_ids = request.form.getlist('dependencies')
@@ -181,7 +187,8 @@ def new_task():
 
     project_id = request.args.get('project_id', type=int)
     projects = Project.query.filter_by(workspace_id=g.workspace.id).order_by(Project.name).all()
-    people = Person.query.filter_by(workspace_id=g.workspace.id).order_by(Person.name).all()
+    people = Person.query.filter_by(workspace_id=g.workspace.id).options(
+        selectinload(Person.teams)).order_by(Person.name).all()
     # Available tasks for dependencies (from the same project)
     available_deps = []
     if project_id:
@@ -197,10 +204,70 @@ def detail(id):
     return render_template('tasks/detail.html', task=task)
 
 
+def _sync_assignments(task, wanted: dict[int, bool]) -> None:
+    """Make task.assignments match {person_id: is_lead}, touching only changed rows."""
+    kept = set()
+    for assignment in list(task.assignments):
+        if assignment.person_id in wanted and assignment.person_id not in kept:
+            kept.add(assignment.person_id)
+            assignment.is_lead = wanted[assignment.person_id]  # no UPDATE if unchanged
+        else:
+            task.assignments.remove(assignment)
+    for person_id, is_lead in wanted.items():
+        if person_id not in kept:
+            task.assignments.append(TaskAssignment(person_id=person_id, is_lead=is_lead))
+
+
+def _sync_dependencies(task, dep_ids: list[int]) -> None:
+    wanted = set(dep_ids)
+    current = TaskDependency.query.filter_by(task_id=task.id).all()
+    for dep in current:
+        if dep.depends_on_id in wanted:
+            wanted.discard(dep.depends_on_id)
+        else:
+            db.session.delete(dep)
+    for dep_id in sorted(wanted):
+        db.session.add(TaskDependency(task_id=task.id, depends_on_id=dep_id))
+
+
+def _sync_milestones(task, rows: list[tuple[int | None, str, date]]) -> None:
+    """Update, add and remove milestones from submitted (id, name, date) rows.
+
+    Rows without an id are matched to an unclaimed milestone with the same
+    name and date, so existing milestones (and their status overrides) keep
+    their ids when the form is re-submitted.
+    """
+    existing = {ms.id: ms for ms in task.milestones}
+    unclaimed = dict(existing)
+    pending = []
+    for ms_id, name, ms_date in rows:
+        ms = unclaimed.pop(ms_id, None) if ms_id is not None else None
+        if ms is None:
+            pending.append((name, ms_date))
+        else:
+            ms.name, ms.date = name, ms_date
+    for name, ms_date in pending:
+        match = next((ms for ms in unclaimed.values() if (ms.name, ms.date) == (name, ms_date)), None)
+        if match is None:
+            task.milestones.append(Milestone(name=name, date=ms_date))
+        else:
+            del unclaimed[match.id]
+    for ms in unclaimed.values():
+        task.milestones.remove(ms)
+
+
 @bp.route('/tasks/<int:id>/edit', methods=['GET', 'POST'])
 def edit_task(id):
     task = Task.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
+    error = None
     if request.method == 'POST':
+        dep_ids = [int(dep_id) for dep_id in request.form.getlist('dependencies') if dep_id]
+        cycle = find_dependency_cycle(task.id, dep_ids)
+        if cycle:
+            titles = dict(db.session.query(Task.id, Task.title).filter(Task.id.in_(cycle)))
+            error = ('These dependencies would create a cycle: '
+                     + ' → '.join(titles.get(task_id, f'#{task_id}') for task_id in cycle))
+    if request.method == 'POST' and not error:
         task.title = request.form['title']
         task.description = request.form.get('description', '')
         task.start_date = date.fromisoformat(request.form['start_date'])
@@ -209,53 +276,44 @@ def edit_task(id):
         task.priority = request.form.get('priority', 'medium')
 
         # Update assignees
-        TaskAssignment.query.filter_by(task_id=task.id).delete()
         lead_id = request.form.get('lead_id')
-        member_ids = request.form.getlist('member_ids')
-        if lead_id:
-            db.session.add(TaskAssignment(task_id=task.id, person_id=int(lead_id), is_lead=True))
-        for mid in member_ids:
+        wanted = {int(lead_id): True} if lead_id else {}
+        for mid in request.form.getlist('member_ids'):
             if mid and mid != lead_id:
-                db.session.add(TaskAssignment(task_id=task.id, person_id=int(mid), is_lead=False))
+                wanted.setdefault(int(mid), False)
+        _sync_assignments(task, wanted)
 
         # Update tags
-        task.tags.clear()
-        tag_names = [t.strip() for t in request.form.get('tags', '').split(',') if t.strip()]
-        for name in tag_names:
-            tag = Tag.query.filter_by(workspace_id=g.workspace.id, name=name).first()
-            if not tag:
-                tag = Tag(name=name, workspace_id=g.workspace.id)
-                db.session.add(tag)
-            task.tags.append(tag)
+        set_task_tags(task, parse_tag_names(request.form.get('tags')))
 
         # Update dependencies
-        TaskDependency.query.filter_by(task_id=task.id).delete()
-        dep_ids = request.form.getlist('dependencies')
-        for dep_id in dep_ids:
-            dep = TaskDependency(task_id=task.id, depends_on_id=int(dep_id))
-            db.session.add(dep)
+        _sync_dependencies(task, dep_ids)
 
         # Update milestones
-        Milestone.query.filter_by(task_id=task.id).delete()
         ms_names = request.form.getlist('milestone_names')
         ms_dates = request.form.getlist('milestone_dates')
-        for name, ms_date in zip(ms_names, ms_dates):
-            if name.strip() and ms_date:
-                db.session.add(Milestone(task_id=task.id, name=name.strip(),
-                                         date=date.fromisoformat(ms_date)))
+        ms_ids = request.form.getlist('milestone_ids')
+        if len(ms_ids) != len(ms_names):
+            ms_ids = [''] * len(ms_names)
+        _sync_milestones(task, [
+            (int(ms_id) if ms_id else None, name.strip(), date.fromisoformat(ms_date))
+            for ms_id, name, ms_date in zip(ms_ids, ms_names, ms_dates)
+            if name.strip() and ms_date
+        ])
 
         db.session.commit()
         return redirect(url_for('tasks.detail', id=task.id))
 
     projects = Project.query.filter_by(workspace_id=g.workspace.id).order_by(Project.name).all()
-    people = Person.query.filter_by(workspace_id=g.workspace.id).order_by(Person.name).all()
+    people = Person.query.filter_by(workspace_id=g.workspace.id).options(
+        selectinload(Person.teams)).order_by(Person.name).all()
     available_deps = Task.query.filter(
         Task.project_id == task.project_id, Task.id != task.id,
         Task.workspace_id == g.workspace.id
     ).all()
     return render_template('tasks/form.html', task=task, projects=projects,
                            people=people, project_id=task.project_id,
-                           available_deps=available_deps)
+                           available_deps=available_deps, error=error), 400 if error else 200
 
 
 @bp.route('/tasks/<int:id>/status', methods=['POST'])
@@ -283,17 +341,141 @@ def add_status_update(id):
 
 @bp.route('/tasks/<int:id>/quick-update', methods=['POST'])
 def quick_update(id):
-    """AJAX endpoint for inline Gantt edits (start, end, status)."""
+    """AJAX endpoint for inline Gantt edits (start, end, status).
+
+    With ``push_dependents`` set, downstream tasks that would now start before
+    a predecessor ends are moved later in the same commit and returned as
+    ``shifted`` bars so the chart can redraw without reloading.
+    """
     task = Task.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
     data = request.get_json()
     if 'start_date' in data:
         task.start_date = date.fromisoformat(data['start_date'])
     if 'end_date' in data:
         task.end_date = date.fromisoformat(data['end_date'])
-    if 'status' in data and data['status'] in ('todo', 'in_progress', 'on_hold', 'done'):
+    if 'status' in data and data['status'] in STATUSES:
         task.status = data['status']
+    shifted = []
+    if data.get('push_dependents'):
+        try:
+            shifted = push_dependents(task.id, g.workspace.id)
+        except DependencyCycleError as exc:
+            db.session.rollback()
+            return jsonify({'ok': False, 'error': 'Task dependencies contain a cycle.',
+                            'task_ids': [f'task-{t}' for t in exc.task_ids]}), 409
+    progress = task.progress
     db.session.commit()
-    return jsonify({'ok': True, 'progress': task.progress})
+    return jsonify({
+        'ok': True,
+        'progress': progress,
+        'shifted': [{'id': f'task-{t}', 'start': start.isoformat(), 'end': end.isoformat()}
+                    for t, start, end in shifted],
+    })
+
+
+@bp.route('/tasks/batch-update', methods=['POST'])
+def batch_update():
+    """AJAX endpoint applying many inline Gantt edits in one transaction.
+
+    Expects ``{"changes": [{"id", "start_date"?, "end_date"?, "status"?}, ...],
+    "push_dependents": bool}``; ids may be numeric or Gantt ``task-N`` ids and
+    later changes to the same task win. All tasks are written with one
+    executemany UPDATE. With ``push_dependents`` set, tasks whose dates
+    changed push their dependents as in quick_update.
+    """
+    data = request.get_json(silent=True) or {}
+    changes: dict[int, dict] = {}
+    try:
+        for change in data.get('changes') or []:
+            entry = changes.setdefault(int(str(change['id']).removeprefix('task-')), {})
+            for key in ('start_date', 'end_date'):
+                if change.get(key):
+                    entry[key] = date.fromisoformat(change[key])
+            if change.get('status') in STATUSES:
+                entry['status'] = change['status']
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return jsonify({'ok': False, 'error': 'Invalid change.'}), 400
+    if len(changes) > MAX_BATCH_CHANGES:
+        return jsonify({'ok': False, 'error': f'At most {MAX_BATCH_CHANGES} tasks per batch.'}), 400
+    if not changes:
+        return jsonify({'ok': True, 'updated': 0, 'shifted': []})
+
+    table = Task.__table__
+    current = {row.id: row.status for row in db.session.execute(
+        select(table.c.id, table.c.status)
+        .where(table.c.workspace_id == g.workspace.id, table.c.deleted_at.is_(None), table.c.id.in_(changes))
+    )}
+    missing = sorted(set(changes) - set(current))
+    if missing:
+        return jsonify({'ok': False, 'error': 'Unknown task.',
+                        'task_ids': [f'task-{t}' for t in missing]}), 404
+
+    db.session.execute(
+        table.update().where(table.c.id == bindparam('_id')).values(
+            start_date=func.coalesce(bindparam('_start', type_=db.Date), table.c.start_date),
+            end_date=func.coalesce(bindparam('_end', type_=db.Date), table.c.end_date),
+            status=func.coalesce(bindparam('_status', type_=db.String), table.c.status),
+        ),
+        [{'_id': t, '_start': c.get('start_date'), '_end': c.get('end_date'), '_status': c.get('status')}
+         for t, c in changes.items()],
+    )
+    # The Core UPDATE bypasses the flush hook that keeps milestone status current.
+    status_changed = [t for t, c in changes.items() if c.get('status', current[t]) != current[t]]
+    if status_changed:
+        refresh_milestone_statuses(task_ids=status_changed)
+
+    shifted = []
+    moved = [t for t, c in changes.items() if 'start_date' in c or 'end_date' in c]
+    if data.get('push_dependents') and moved:
+        try:
+            shifted = push_dependents(moved, g.workspace.id)
+        except DependencyCycleError as exc:
+            db.session.rollback()
+            return jsonify({'ok': False, 'error': 'Task dependencies contain a cycle.',
+                            'task_ids': [f'task-{t}' for t in exc.task_ids]}), 409
+    db.session.commit()
+    return jsonify({
+        'ok': True,
+        'updated': len(changes),
+        'shifted': [{'id': f'task-{t}', 'start': start.isoformat(), 'end': end.isoformat()}
+                    for t, start, end in shifted],
+    })
+
+
+def _tag_names(value) -> list[str]:
+    """Tag names from a comma-separated string or a list."""
+    return parse_tag_names(value if isinstance(value, str) else ','.join(value or []))
+
+
+@bp.route('/tasks/bulk', methods=['POST'])
+def bulk_update():
+    """Apply one status/priority/assignee/tag change to many tasks at once.
+
+    Targets ``task_ids`` or, without them, every task matching ``filter``
+    (``status``, ``overdue``, ``project_id``); a request with neither is
+    rejected rather than applied to the whole workspace. Changes are ``status``,
+    ``priority``, ``assignees`` ({lead_id, member_ids}, replacing the current
+    ones), ``add_tags`` and ``remove_tags``. Everything is applied in one
+    transaction and the affected row counts are returned.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'ok': False, 'error': 'Expected a JSON object.'}), 400
+    try:
+        task_ids = select_task_ids(g.workspace.id, data.get('task_ids'), data.get('filter'))
+        counts = apply_bulk_operation(
+            g.workspace.id, task_ids,
+            status=data.get('status') or None,
+            priority=data.get('priority') or None,
+            assignees=data.get('assignees'),
+            add_tags=_tag_names(data.get('add_tags')),
+            remove_tags=_tag_names(data.get('remove_tags')),
+        )
+    except (TypeError, ValueError) as exc:  # BulkOperationError is a ValueError
+        db.session.rollback()
+        return jsonify({'ok': False, 'error': str(exc)}), 400
+    db.session.commit()
+    return jsonify({'ok': True, **counts})
 
 
 @bp.route('/tasks/<int:id>/milestones', methods=['POST'])
@@ -314,7 +496,6 @@ def update_milestone(id):
     milestone = Milestone.query.get_or_404(id)
     # Verify the milestone belongs to this workspace via its task
     if milestone.task.workspace_id != g.workspace.id:
-        from flask import abort
         abort(404)
     name = request.form.get('name', '').strip()
     ms_date = request.form.get('date', '')
@@ -332,7 +513,6 @@ def update_milestone(id):
 def delete_milestone(id):
     milestone = Milestone.query.get_or_404(id)
     if milestone.task.workspace_id != g.workspace.id:
-        from flask import abort
         abort(404)
     task_id = milestone.task_id
     if request.method == 'POST':
@@ -350,10 +530,25 @@ def delete_task(id):
     task = Task.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
     project_id = task.project_id
     if request.method == 'POST':
-        db.session.delete(task)
+        soft_delete(task)
         db.session.commit()
+        flash({'text': f'Deleted task "{task.title}".',
+               'undo_url': url_for('tasks.restore_task', id=task.id)}, 'undo')
         return redirect(url_for('projects.detail', id=project_id))
     return render_template('confirm_delete.html',
                            title='Delete Task',
-                           message=f'Are you sure you want to delete task "{task.title}"? This cannot be undone.',
+                           message=f'Are you sure you want to delete task "{task.title}"?',
                            cancel_url=url_for('tasks.detail', id=task.id))
+
+
+@bp.route('/tasks/<int:id>/restore', methods=['POST'])
+def restore_task(id):
+    task = Task.query.execution_options(include_deleted=True).filter_by(
+        id=id, workspace_id=g.workspace.id).first_or_404()
+    # A task deleted along with its project comes back with the project; one
+    # whose project is gone for good cannot come back.
+    if not can_restore(task) or task.project is None or task.project.deleted_at is not None:
+        abort(404)
+    restore(task)
+    db.session.commit()
+    return redirect(url_for('tasks.detail', id=task.id))
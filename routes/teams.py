@@ -1,5 +1,7 @@
-from flask import Blueprint, render_template, request, redirect, url_for, g
+from flask import Blueprint, abort, flash, render_template, request, redirect, url_for, g
 from models import db, Team, Person, Workspace
+from deletion import can_restore, restore, soft_delete
+from memberships import member_counts, member_previews, set_team_members, team_ids_by_person
 
 bp = Blueprint('teams', __name__)
 
@@ -7,7 +9,7 @@ bp = Blueprint('teams', __name__)
 @bp.url_value_preprocessor
 def pull_workspace(endpoint, values):
     g.workspace_slug = values.pop('workspace_slug', None)
-    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug).first_or_404()
+    g.workspace = Workspace.query.filter_by(slug=g.workspace_slug, deleting_at=None).first_or_404()
 
 
 @bp.url_defaults
@@ -19,7 +21,9 @@ def inject_workspace(endpoint, values):
 @bp.route('/teams')
 def list_teams():
     teams = Team.query.filter_by(workspace_id=g.workspace.id).order_by(Team.name).all()
-    return render_template('teams/list.html', teams=teams)
+    return render_template('teams/list.html', teams=teams,
+                           member_counts=member_counts(g.workspace.id),
+                           member_previews=member_previews(g.workspace.id))
 
 
 @bp.route('/teams/new', methods=['GET', 'POST'])
@@ -31,8 +35,7 @@ def new_team():
         _apply_members(team)
         db.session.commit()
         return redirect(url_for('teams.list_teams'))
-    people = Person.query.filter_by(workspace_id=g.workspace.id).order_by(Person.name).all()
-    return render_template('teams/form.html', team=None, people=people)
+    return _render_form(None)
 
 
 @bp.route('/teams/<int:id>/edit', methods=['GET', 'POST'])
@@ -43,25 +46,43 @@ def edit_team(id):
         _apply_members(team)
         db.session.commit()
         return redirect(url_for('teams.list_teams'))
+    return _render_form(team)
+
+
+def _render_form(team):
     people = Person.query.filter_by(workspace_id=g.workspace.id).order_by(Person.name).all()
-    return render_template('teams/form.html', team=team, people=people)
+    team_names = dict(db.session.execute(
+        db.select(Team.id, Team.name).filter_by(workspace_id=g.workspace.id)).all())
+    return render_template('teams/form.html', team=team, people=people, team_names=team_names,
+                           team_ids_by_person=team_ids_by_person(g.workspace.id))
 
 
 def _apply_members(team):
-    """Sync team.members based on submitted member_ids checkboxes."""
-    checked_ids = set(int(x) for x in request.form.getlist('member_ids'))
-    all_people = Person.query.filter_by(workspace_id=team.workspace_id).all()
-    team.members = [p for p in all_people if p.id in checked_ids]
+    """Sync team membership with the submitted member_ids checkboxes."""
+    set_team_members(team, (int(x) for x in request.form.getlist('member_ids')))
 
 
 @bp.route('/teams/<int:id>/delete', methods=['GET', 'POST'])
 def delete_team(id):
     team = Team.query.filter_by(id=id, workspace_id=g.workspace.id).first_or_404()
     if request.method == 'POST':
-        db.session.delete(team)
+        soft_delete(team)
         db.session.commit()
+        flash({'text': f'Deleted team "{team.name}".',
+               'undo_url': url_for('teams.restore_team', id=team.id)}, 'undo')
         return redirect(url_for('teams.list_teams'))
     return render_template('confirm_delete.html',
                            title='Delete Team',
                            message=f'Are you sure you want to delete team "{team.name}"?',
                            cancel_url=url_for('teams.list_teams'))
+
+
+@bp.route('/teams/<int:id>/restore', methods=['POST'])
+def restore_team(id):
+    team = Team.query.execution_options(include_deleted=True).filter_by(
+        id=id, workspace_id=g.workspace.id).first_or_404()
+    if not can_restore(team):
+        abort(404)
+    restore(team)
+    db.session.commit()
+    return redirect(url_for('teams.list_teams'))
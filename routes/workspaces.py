@@ -1,5 +1,7 @@
-from flask import Blueprint, render_template, request, redirect, url_for
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify
 from models import db, Workspace
+import cloning
+from deletion import deletion_progress, start_workspace_deletion
 
 bp = Blueprint('workspaces', __name__)
 
@@ -18,7 +20,7 @@ def new_workspace():
 
 @bp.route('/workspaces/<slug>/edit', methods=['GET', 'POST'])
 def edit_workspace(slug):
-    workspace = Workspace.query.filter_by(slug=slug).first_or_404()
+    workspace = Workspace.query.filter_by(slug=slug, deleting_at=None).first_or_404()
     if request.method == 'POST':
         workspace.name = request.form['name'].strip()
         workspace.slug = request.form['slug'].strip()
@@ -27,14 +29,59 @@ def edit_workspace(slug):
     return render_template('workspaces/form.html', workspace=workspace)
 
 
+@bp.route('/workspaces/<slug>/clone', methods=['GET', 'POST'])
+def clone_workspace(slug):
+    workspace = Workspace.query.filter_by(slug=slug, deleting_at=None).first_or_404()
+    error = None
+    if request.method == 'POST':
+        name = request.form['name'].strip()
+        new_slug = request.form['slug'].strip()
+        try:
+            days = int(request.form.get('days') or 0)
+        except ValueError:
+            days = None
+        if not name or not new_slug:
+            error = 'The new workspace needs a name and a slug.'
+        elif days is None:
+            error = 'Shift dates by a whole number of days.'
+        elif Workspace.query.filter_by(slug=new_slug).first():
+            error = f'The slug "{new_slug}" is already taken.'
+        else:
+            clone, _ = cloning.clone_workspace(workspace, name, new_slug, days=days)
+            db.session.commit()
+            return redirect(url_for('workspace_dashboard', workspace_slug=clone.slug))
+    return render_template('workspaces/clone.html', workspace=workspace, error=error), 400 if error else 200
+
+
 @bp.route('/workspaces/<slug>/delete', methods=['GET', 'POST'])
 def delete_workspace(slug):
-    workspace = Workspace.query.filter_by(slug=slug).first_or_404()
+    workspace = Workspace.query.filter_by(slug=slug, deleting_at=None).first_or_404()
     if request.method == 'POST':
-        db.session.delete(workspace)
-        db.session.commit()
+        start_workspace_deletion(workspace)
         return redirect(url_for('index'))
     return render_template('confirm_delete.html',
                            title='Delete Workspace',
                            message=f'Are you sure you want to delete workspace "{workspace.name}" and all its data? This cannot be undone.',
                            cancel_url=url_for('index'))
+
+
+@bp.route('/workspaces/<int:id>/deletion')
+def deletion_status(id):
+    """Progress of a background workspace deletion."""
+    workspace = db.session.get(Workspace, id)
+    progress = deletion_progress(id)
+    if workspace is None:
+        return jsonify(progress.to_json() if progress else {'workspace_id': id, 'state': 'done', 'percent': 100})
+    if workspace.deleting_at is None:
+        return jsonify({'error': 'Workspace is not being deleted.'}), 404
+    if progress is not None and progress.state != 'done':
+        return jsonify(progress.to_json())
+    # Marked as deleting, but no job in this process (e.g. after a restart).
+    return jsonify({'workspace_id': id, 'name': workspace.name, 'state': 'stalled', 'percent': 0})
+
+
+@bp.route('/workspaces/<int:id>/deletion/resume', methods=['POST'])
+def resume_deletion(id):
+    workspace = Workspace.query.filter(Workspace.id == id, Workspace.deleting_at.isnot(None)).first_or_404()
+    start_workspace_deletion(workspace)
+    return redirect(url_for('index'))
@@ -0,0 +1,90 @@
+"""Moving a whole project's schedule by a number of days.
+
+A shift moves the project's start and end, its tasks' dates and their
+milestones with three UPDATE statements (milestones, tasks, project), in
+whatever transaction the caller commits. With ``pivot`` only tasks starting
+on or after that date move, together with their milestones and the project
+dates on or after it.
+
+Calendar days are added with SQLite's date() function. For working days
+(Monday to Friday) the number of calendar days to add depends only on the
+weekday a date falls on, so the seven offsets are worked out in Python and
+applied with a CASE on strftime('%w'); the statements stay set-based.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from sqlalchemy import case, func, select
+
+from models import db, Milestone, Project, Task, refresh_milestone_statuses
+
+MAX_SHIFT_DAYS = 3650
+
+
+def add_working_days(day: date, days: int) -> date:
+    """The date ``days`` working days after (or before, when negative) ``day``."""
+    if days == 0:
+        return day
+    step = 1 if days > 0 else -1
+    # Counting from a weekend day is the same as counting from the Friday
+    # before it (going forward) or the Monday after it (going back), and the
+    # whole-week shortcut below only holds from a weekday.
+    if day.weekday() >= 5:
+        day += timedelta(days=4 - day.weekday() if step > 0 else 7 - day.weekday())
+    weeks, remainder = divmod(abs(days), 5)
+    day += timedelta(weeks=weeks * step)
+    while remainder:
+        day += timedelta(days=step)
+        if day.weekday() < 5:
+            remainder -= 1
+    return day
+
+
+def _shifted(column, days: int, working_days: bool):
+    if not working_days:
+        return func.date(column, f'{days:+d} days')
+    # 2024-01-07 was a Sunday, strftime('%w') == '0'.
+    offsets = {str(weekday): (add_working_days(date(2024, 1, 7 + weekday), days) - date(2024, 1, 7 + weekday)).days
+               for weekday in range(7)}
+    return func.date(column, case(
+        *((func.strftime('%w', column) == weekday, f'{offset:+d} days') for weekday, offset in offsets.items())
+    ))
+
+
+def shift_project(project: Project, days: int, working_days: bool = False,
+                  pivot: date | None = None) -> dict[str, int]:
+    """Move the project's dates by ``days``; returns the number of tasks and milestones moved (not committed)."""
+    if abs(days) > MAX_SHIFT_DAYS:
+        raise ValueError(f'Shift by at most {MAX_SHIFT_DAYS} days.')
+    counts = {'tasks': 0, 'milestones': 0}
+    if not days:
+        return counts
+    t, m, p = Task.__table__, Milestone.__table__, Project.__table__
+    moving = [t.c.project_id == project.id, t.c.deleted_at.is_(None)]
+    if pivot is not None:
+        moving.append(t.c.start_date >= pivot)
+
+    # Milestones first: which tasks move is decided by their dates before the shift.
+    counts['milestones'] = db.session.execute(m.update().where(
+        m.c.task_id.in_(select(t.c.id).where(*moving))
+    ).values(date=_shifted(m.c.date, days, working_days))).rowcount
+    counts['tasks'] = db.session.execute(t.update().where(*moving).values(
+        start_date=_shifted(t.c.start_date, days, working_days),
+        end_date=_shifted(t.c.end_date, days, working_days),
+    )).rowcount
+
+    def project_date(column):
+        if pivot is None:
+            return _shifted(column, days, working_days)
+        return case((column >= pivot, _shifted(column, days, working_days)), else_=column)
+
+    db.session.execute(p.update().where(p.c.id == project.id).values(
+        start_date=project_date(p.c.start_date), end_date=project_date(p.c.end_date),
+    ))
+    # The UPDATEs bypass the flush hook that keeps milestone status current,
+    # and the session's copies of the rows are now stale.
+    refresh_milestone_statuses(project_ids=[project.id])
+    db.session.expire_all()
+    return counts
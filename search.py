@@ -0,0 +1,206 @@
+"""Full-text search over tasks, projects and status updates (SQLite FTS5).
+
+One FTS5 table, ``search_index``, holds a row per task, project and status
+update. SQL triggers on the source tables keep it in sync, so ORM writes,
+bulk Core inserts and raw SQL all update it without application hooks.
+
+Each row's rowid encodes the source row (``id * 4 + kind code``), which lets
+the triggers update and delete index rows by rowid instead of scanning the
+index. The workspace is stored as an indexed ``ws`` token so that scoping
+to a workspace is part of the MATCH itself rather than a filter applied
+afterwards. Prefix indexes make prefix queries (``term*``) cheap.
+
+Soft-deleted tasks and projects, and updates on deleted tasks, stay in the
+index until they are purged and are filtered out of the results, so undoing
+a delete does not have to re-index anything.
+
+The index is created alongside the model tables (db.create_all) and dropped
+with them (db.drop_all); app.ensure_compatible_schema adds it to existing
+databases.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, text
+
+from models import db
+
+KIND_CODES = {'task': 1, 'project': 2, 'update': 3}
+KIND_BY_CODE = {code: kind for kind, code in KIND_CODES.items()}
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Control characters never appear in indexed text, so they are safe snippet
+# markers; the snippet is escaped and then they become <mark> tags.
+_MARK_START, _MARK_END = '\x02', '\x03'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_CREATE_INDEX = """
+CREATE VIRTUAL TABLE search_index USING fts5(
+    ws, kind UNINDEXED, title, body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3 4'
+)
+"""
+
+# (table, kind, workspace expression, title expression, body expression,
+# columns whose update re-indexes the row); {row} is the trigger's new/old
+# alias or the backfill's table alias.
+_SOURCES = [
+    ('task', 'task', "'w' || {row}.workspace_id", "{row}.title", "COALESCE({row}.description, '')",
+     'title, description, workspace_id'),
+    ('project', 'project', "'w' || {row}.workspace_id", "{row}.name", "COALESCE({row}.description, '')",
+     'name, description, workspace_id'),
+    ('status_update', 'update',
+     "(SELECT 'w' || task.workspace_id FROM task WHERE task.id = {row}.task_id)",
+     "''", "{row}.content", 'content, task_id'),
+]
+
+
+def _trigger_sql() -> list[str]:
+    statements = []
+    for table, kind, ws, title, body, watched in _SOURCES:
+        code = KIND_CODES[kind]
+        delete = f"DELETE FROM search_index WHERE rowid = old.id * 4 + {code}"
+        insert = (
+            f"INSERT INTO search_index(rowid, ws, kind, title, body) VALUES ("
+            f"new.id * 4 + {code}, {ws.format(row='new')}, '{kind}', "
+            f"{title.format(row='new')}, {body.format(row='new')})"
+        )
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} BEGIN {insert}; END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} BEGIN {delete}; END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE OF {watched} ON {table} BEGIN "
+            f"{delete}; {insert}; END",
+        ]
+    return statements
+
+
+def fts5_available(connection) -> bool:
+    if connection.dialect.name != 'sqlite':
+        return False
+    options = {row[0] for row in connection.execute(text('PRAGMA compile_options'))}
+    return 'ENABLE_FTS5' in options
+
+
+def ensure_search_index(connection) -> bool:
+    """Create the FTS table and triggers if missing; returns False without FTS5.
+
+    A newly created index is filled from the existing rows.
+    """
+    if not fts5_available(connection):
+        return False
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    )).first()
+    if not exists:
+        connection.execute(text(_CREATE_INDEX))
+        # Persist the ranking so ORDER BY rank can use FTS5's fast path:
+        # title matches weigh eight times body matches.
+        connection.execute(text(
+            "INSERT INTO search_index(search_index, rank) VALUES ('rank', 'bm25(0.0, 0.0, 8.0, 1.0)')"
+        ))
+    for statement in _trigger_sql():
+        connection.execute(text(statement))
+    if not exists:
+        rebuild_search_index(connection)
+    return True
+
+
+def rebuild_search_index(connection) -> None:
+    """Repopulate search_index from the source tables."""
+    connection.execute(text('DELETE FROM search_index'))
+    for table, kind, ws, title, body, _ in _SOURCES:
+        code = KIND_CODES[kind]
+        connection.execute(text(
+            f"INSERT INTO search_index(rowid, ws, kind, title, body) "
+            f"SELECT src.id * 4 + {code}, {ws.format(row='src')}, '{kind}', "
+            f"{title.format(row='src')}, {body.format(row='src')} FROM {table} AS src"
+        ))
+
+
+def build_match_query(q: str, prefix: bool = False) -> str | None:
+    """Turn free text into a safe FTS5 query: every word must match.
+
+    Words are quoted so FTS5 syntax in the input is treated literally. In
+    prefix mode each word matches as a prefix (``"desi"*`` finds "design").
+    """
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' if prefix else f'"{token}"' for token in tokens)
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    id: int
+    title: str
+    snippet: Markup
+    task_id: int | None = None
+
+    def to_json(self) -> dict:
+        return {'kind': self.kind, 'id': self.id, 'title': self.title,
+                'snippet': str(self.snippet), 'task_id': self.task_id}
+
+
+def _highlight(snippet: str) -> Markup:
+    return Markup(str(escape(snippet)).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>'))
+
+
+def search(workspace_id: int, q: str, prefix: bool = False, kinds: list[str] | None = None,
+           limit: int = DEFAULT_LIMIT, offset: int = 0) -> list[SearchHit]:
+    """Ranked matches in one workspace; titles weigh more than bodies."""
+    match = build_match_query(q, prefix)
+    if match is None:
+        return []
+    codes = sorted({KIND_CODES[k] for k in (kinds or []) if k in KIND_CODES})
+    kind_filter = f"AND search_index.rowid % 4 IN ({', '.join(map(str, codes))})" if codes else ''
+    params = {
+        'match': f'ws : "w{workspace_id}" AND {{title body}} : ({match})',
+        'limit': max(1, min(limit, MAX_LIMIT)),
+        'offset': max(0, offset),
+        'mark_start': _MARK_START,
+        'mark_end': _MARK_END,
+    }
+
+    rows = db.session.execute(text(f"""
+        SELECT search_index.rowid / 4 AS id, search_index.rowid % 4 AS code,
+               search_index.title AS title,
+               snippet(search_index, 3, :mark_start, :mark_end, '…', 16) AS snippet,
+               su.task_id AS task_id, t.title AS task_title
+        FROM search_index
+        LEFT JOIN status_update AS su ON search_index.rowid % 4 = 3 AND su.id = search_index.rowid / 4
+        LEFT JOIN task AS t ON t.id = su.task_id
+        WHERE search_index MATCH :match {kind_filter}
+          AND NOT EXISTS (SELECT 1 FROM task AS deleted WHERE deleted.deleted_at IS NOT NULL
+                          AND deleted.id = CASE search_index.rowid % 4 WHEN 1 THEN search_index.rowid / 4
+                                                                        WHEN 3 THEN su.task_id END)
+          AND NOT EXISTS (SELECT 1 FROM project AS deleted WHERE deleted.deleted_at IS NOT NULL
+                          AND search_index.rowid % 4 = 2 AND deleted.id = search_index.rowid / 4)
+        ORDER BY search_index.rank
+        LIMIT :limit OFFSET :offset
+    """), params)
+
+    hits = []
+    for row in rows:
+        kind = KIND_BY_CODE[row.code]
+        title = row.task_title if kind == 'update' else row.title
+        hits.append(SearchHit(kind=kind, id=row.id, title=title or '', snippet=_highlight(row.snippet or ''),
+                              task_id=row.task_id))
+    return hits
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_with_tables(target, connection, **kw):
+    ensure_search_index(connection)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_with_tables(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text('DROP TABLE IF EXISTS search_index'))
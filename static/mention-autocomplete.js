@@ -75,13 +75,60 @@
         return div.innerHTML;
     }
 
-    function fetchPeople(query, workspaceSlug) {
-        var url = '/w/' + workspaceSlug + '/people/search.json?q=' + encodeURIComponent(query);
-        fetch(url)
-            .then(function(r) { return r.json(); })
-            .then(function(results) {
-                showDropdown(results, activeTextarea);
+    // The workspace roster is fetched once per page and filtered locally on
+    // every keystroke; the browser revalidates it with its ETag.
+    var rosters = {};
+    var MAX_RESULTS = 10;
+
+    function tokenize(text) {
+        return (text.toLowerCase().match(/[\p{L}\p{N}_]+/gu) || []);
+    }
+
+    function loadRoster(workspaceSlug) {
+        if (!rosters[workspaceSlug]) {
+            rosters[workspaceSlug] = fetch('/w/' + workspaceSlug + '/people/roster.json')
+                .then(function(r) {
+                    if (!r.ok) throw new Error('roster ' + r.status);
+                    return r.json();
+                })
+                .then(function(people) {
+                    return people.map(function(p) {
+                        return {id: p.id, name: p.name, tokens: tokenize(p.name)};
+                    });
+                })
+                .catch(function(err) {
+                    delete rosters[workspaceSlug];
+                    throw err;
+                });
+        }
+        return rosters[workspaceSlug];
+    }
+
+    // Same rule as the server: every query word must start a word of the name.
+    function filterRoster(roster, query) {
+        var words = tokenize(query);
+        if (words.length === 0) {
+            return query.trim() ? [] : roster.slice(0, MAX_RESULTS);
+        }
+        var results = [];
+        for (var i = 0; i < roster.length && results.length < MAX_RESULTS; i++) {
+            var tokens = roster[i].tokens;
+            var ok = words.every(function(word) {
+                return tokens.some(function(token) { return token.indexOf(word) === 0; });
             });
+            if (ok) results.push(roster[i]);
+        }
+        return results;
+    }
+
+    function fetchPeople(query, workspaceSlug) {
+        var textarea = activeTextarea;
+        loadRoster(workspaceSlug).then(function(roster) {
+            if (textarea !== activeTextarea || mentionStart === -1) return;
+            showDropdown(filterRoster(roster, query), textarea);
+        }, function() {
+            hideDropdown();
+        });
     }
 
     document.addEventListener('input', function(e) {
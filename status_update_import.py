@@ -10,23 +10,33 @@ Optional:
     created_at  ISO datetime, defaults to current UTC time
     mentions    comma-separated person names
     external_id stable source identifier used to deduplicate imports
+
+With ``dedupe_content`` enabled, rows are also skipped when an update with the
+same task, created_at and normalized content already exists. This makes reruns
+of feeds without external_id idempotent as long as they supply created_at.
 """
 
 from __future__ import annotations
 
 import csv
 import io
-from dataclasses import dataclass, field
-from datetime import datetime
+import json
+import secrets
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
 
-from sqlalchemy import func
+from sqlalchemy import func, select
 
-from models import db, Person, Project, StatusUpdate, Task, Workspace
+from models import (db, ImportPreview, Person, Project, StatusUpdate, Task, Workspace,
+                    status_update_fingerprint, status_update_mentions)
 
 REQUIRED_COLUMNS = {'project_name', 'task_title', 'content'}
 OPTIONAL_COLUMNS = {'created_at', 'mentions', 'external_id'}
 ALL_COLUMNS = REQUIRED_COLUMNS | OPTIONAL_COLUMNS
 
+# Keep IN lists well under SQLite's bound-parameter limit.
+LOOKUP_CHUNK_SIZE = 500
+
 
 @dataclass
 class ImportRowResult:
@@ -45,6 +55,26 @@ class ImportSummary:
     results: list[ImportRowResult] = field(default_factory=list)
 
 
+@dataclass
+class PlannedUpdate:
+    result: ImportRowResult
+    task_id: int
+    content: str
+    created_at: datetime
+    external_id: str | None
+    content_hash: str
+    mention_ids: list[int]
+
+
+@dataclass
+class ImportPlan:
+    """Resolved rows ready to be written, plus the summary shown to the user."""
+    workspace_id: int
+    summary: ImportSummary
+    dedupe_content: bool = False
+    updates: list[PlannedUpdate] = field(default_factory=list)
+
+
 def parse_created_at(raw: str, row_num: int) -> datetime:
     value = raw.strip()
     if not value:
@@ -94,7 +124,24 @@ def _resolve_task(workspace_id: int, project_name: str, task_title: str) -> Task
     ).first()
 
 
-def import_status_updates_from_text(csv_text: str, workspace_slug: str, dry_run: bool = False) -> ImportSummary:
+def _existing_content_hashes(hashes: set[str]) -> set[str]:
+    found: set[str] = set()
+    pending = sorted(hashes)
+    for start in range(0, len(pending), LOOKUP_CHUNK_SIZE):
+        chunk = pending[start:start + LOOKUP_CHUNK_SIZE]
+        found.update(row[0] for row in db.session.query(StatusUpdate.content_hash).filter(
+            StatusUpdate.content_hash.in_(chunk)
+        ))
+    return found
+
+
+def build_import_plan(csv_text: str, workspace_slug: str, dry_run: bool = False,
+                      dedupe_content: bool = False) -> ImportPlan:
+    """Parse, validate and resolve every row without writing anything.
+
+    The returned plan holds the task ids, mention ids and dedupe decisions for
+    each row so it can be applied later without re-reading the CSV.
+    """
     workspace = Workspace.query.filter_by(slug=workspace_slug).first()
     if not workspace:
         raise ValueError(f'workspace {workspace_slug!r} not found')
@@ -103,6 +150,9 @@ def import_status_updates_from_text(csv_text: str, workspace_slug: str, dry_run:
     _validate_columns(reader.fieldnames)
 
     summary = ImportSummary(workspace_slug=workspace_slug, dry_run=dry_run)
+    plan = ImportPlan(workspace_id=workspace.id, summary=summary, dedupe_content=dedupe_content)
+    seen_external_ids: set[str] = set()
+    seen_content_hashes: set[str] = set()
 
     for row_num, row in enumerate(reader, start=2):
         extra_values = row.get(None) or []
@@ -136,7 +186,9 @@ def import_status_updates_from_text(csv_text: str, workspace_slug: str, dry_run:
             continue
 
         if external_id:
-            existing = StatusUpdate.query.join(Task, StatusUpdate.task_id == Task.id).filter(
+            existing = external_id in seen_external_ids or StatusUpdate.query.join(
+                Task, StatusUpdate.task_id == Task.id
+            ).filter(
                 StatusUpdate.external_id == external_id,
                 Task.workspace_id == workspace.id,
             ).first()
@@ -175,31 +227,211 @@ def import_status_updates_from_text(csv_text: str, workspace_slug: str, dry_run:
             person.name.lower() != part.strip().lower() for person in mentions
         )]
 
-        update = StatusUpdate(
-            task_id=task.id,
-            content=content,
-            created_at=created_at,
-            external_id=external_id,
-        )
-        for person in mentions:
-            update.mentions.append(person)
+        content_hash = status_update_fingerprint(task.id, created_at, content)
+        if dedupe_content and content_hash in seen_content_hashes:
+            summary.skipped += 1
+            summary.results.append(ImportRowResult(
+                row_num=row_num,
+                status='skipped',
+                message='Duplicate content earlier in this file',
+            ))
+            continue
+
+        if external_id:
+            seen_external_ids.add(external_id)
+        seen_content_hashes.add(content_hash)
 
-        summary.imported += 1
         msg = f'Prepared update for {project_name} / {task_title}'
         if missing_mentions:
             msg += f'; unmatched mentions: {", ".join(missing_mentions)}'
-        summary.results.append(ImportRowResult(
+        result = ImportRowResult(
             row_num=row_num,
             status='imported' if not dry_run else 'preview',
             message=msg,
+        )
+        summary.imported += 1
+        summary.results.append(result)
+        plan.updates.append(PlannedUpdate(
+            result=result,
+            task_id=task.id,
+            content=content,
+            created_at=created_at,
+            external_id=external_id,
+            content_hash=content_hash,
+            mention_ids=[person.id for person in mentions],
         ))
 
-        if not dry_run:
-            db.session.add(update)
+    if dedupe_content and plan.updates:
+        # One set-based lookup for the whole file instead of a query per row.
+        existing = _existing_content_hashes({u.content_hash for u in plan.updates})
+        if existing:
+            remaining = []
+            for planned in plan.updates:
+                if planned.content_hash in existing:
+                    planned.result.status = 'skipped'
+                    planned.result.message = 'Duplicate content already imported for this task'
+                    summary.imported -= 1
+                    summary.skipped += 1
+                else:
+                    remaining.append(planned)
+            plan.updates = remaining
+
+    return plan
+
+
+def apply_import_plan(plan: ImportPlan) -> ImportSummary:
+    """Write a previously built plan and commit.
+
+    External ids (and content hashes, in content-dedupe mode) are re-checked in
+    bulk so rows imported by someone else since the plan was built are skipped
+    rather than duplicated. So are the planned tasks: rows whose task was
+    deleted since the preview are skipped too.
+    """
+    t = Task.__table__
+    live_tasks: set[int] = set()
+    planned_tasks = sorted({u.task_id for u in plan.updates})
+    for start in range(0, len(planned_tasks), LOOKUP_CHUNK_SIZE):
+        live_tasks.update(db.session.execute(select(t.c.id).where(
+            t.c.id.in_(planned_tasks[start:start + LOOKUP_CHUNK_SIZE]),
+            t.c.workspace_id == plan.workspace_id, t.c.deleted_at.is_(None),
+        )).scalars())
+    planned_ids = {u.external_id for u in plan.updates if u.external_id}
+    taken_ids: set[str] = set()
+    if planned_ids:
+        taken_ids = {row[0] for row in db.session.query(StatusUpdate.external_id).join(
+            Task, StatusUpdate.task_id == Task.id
+        ).filter(
+            Task.workspace_id == plan.workspace_id,
+            StatusUpdate.external_id.in_(planned_ids),
+        )}
+    taken_hashes: set[str] = set()
+    if plan.dedupe_content and plan.updates:
+        taken_hashes = _existing_content_hashes({u.content_hash for u in plan.updates})
+
+    summary = ImportSummary(workspace_slug=plan.summary.workspace_slug, dry_run=False,
+                            skipped=plan.summary.skipped, errors=plan.summary.errors)
+    planned_by_row = {u.result.row_num: u for u in plan.updates}
+    to_write: list[PlannedUpdate] = []
+    for result in plan.summary.results:
+        planned = planned_by_row.get(result.row_num)
+        if planned is None:
+            summary.results.append(result)
+        elif planned.task_id not in live_tasks:
+            summary.skipped += 1
+            summary.results.append(ImportRowResult(
+                row_num=result.row_num,
+                status='skipped',
+                message='Task was deleted after the preview',
+            ))
+        elif planned.external_id in taken_ids:
+            summary.skipped += 1
+            summary.results.append(ImportRowResult(
+                row_num=result.row_num,
+                status='skipped',
+                message=f'Duplicate external_id {planned.external_id!r}',
+            ))
+        elif planned.content_hash in taken_hashes:
+            summary.skipped += 1
+            summary.results.append(ImportRowResult(
+                row_num=result.row_num,
+                status='skipped',
+                message='Duplicate content already imported for this task',
+            ))
+        else:
+            summary.imported += 1
+            summary.results.append(ImportRowResult(
+                row_num=result.row_num, status='imported', message=result.message,
+            ))
+            to_write.append(planned)
+
+    updates = [StatusUpdate(task_id=u.task_id, content=u.content,
+                            created_at=u.created_at, external_id=u.external_id,
+                            content_hash=u.content_hash)
+               for u in to_write]
+    db.session.add_all(updates)
+    db.session.flush()
+
+    mention_rows = [{'status_update_id': update.id, 'person_id': person_id}
+                    for update, planned in zip(updates, to_write)
+                    for person_id in planned.mention_ids]
+    if mention_rows:
+        db.session.execute(status_update_mentions.insert(), mention_rows)
+
+    db.session.commit()
+    return summary
+
 
+def import_status_updates_from_text(csv_text: str, workspace_slug: str, dry_run: bool = False,
+                                    dedupe_content: bool = False) -> ImportSummary:
+    plan = build_import_plan(csv_text, workspace_slug, dry_run=dry_run, dedupe_content=dedupe_content)
     if dry_run:
         db.session.rollback()
-    else:
-        db.session.commit()
-
-    return summary
+        return plan.summary
+    return apply_import_plan(plan)
+
+
+# ── Preview plan store ───────────────────────────────────────────────────────
+# Previews are saved in the import_preview table under a random token so the
+# web UI can commit exactly what was previewed without round-tripping the CSV,
+# whichever worker process handles the commit.
+
+PREVIEW_PLAN_TTL = timedelta(minutes=15)
+
+
+def _plan_to_json(plan: ImportPlan) -> str:
+    return json.dumps({
+        'workspace_id': plan.workspace_id,
+        'dedupe_content': plan.dedupe_content,
+        'summary': asdict(plan.summary),
+        'updates': [{
+            'row_num': u.result.row_num, 'task_id': u.task_id, 'content': u.content,
+            'created_at': u.created_at.isoformat(), 'external_id': u.external_id,
+            'content_hash': u.content_hash, 'mention_ids': u.mention_ids,
+        } for u in plan.updates],
+    })
+
+
+def _plan_from_json(payload: str) -> ImportPlan:
+    data = json.loads(payload)
+    summary = ImportSummary(**{**data['summary'], 'results': [
+        ImportRowResult(**result) for result in data['summary']['results']
+    ]})
+    result_by_row = {result.row_num: result for result in summary.results}
+    return ImportPlan(
+        workspace_id=data['workspace_id'],
+        summary=summary,
+        dedupe_content=data['dedupe_content'],
+        updates=[PlannedUpdate(
+            result=result_by_row[u['row_num']], task_id=u['task_id'], content=u['content'],
+            created_at=datetime.fromisoformat(u['created_at']), external_id=u['external_id'],
+            content_hash=u['content_hash'], mention_ids=u['mention_ids'],
+        ) for u in data['updates']],
+    )
+
+
+def store_import_plan(plan: ImportPlan) -> str:
+    """Save the plan, dropping expired ones, and commit; returns its token."""
+    token = secrets.token_urlsafe(16)
+    now = datetime.now()
+    previews = ImportPreview.__table__
+    db.session.execute(previews.delete().where(previews.c.expires_at <= now))
+    db.session.execute(previews.insert().values(
+        token=token, workspace_id=plan.workspace_id, expires_at=now + PREVIEW_PLAN_TTL,
+        plan=_plan_to_json(plan),
+    ))
+    db.session.commit()
+    return token
+
+
+def pop_import_plan(token: str, workspace_id: int) -> ImportPlan | None:
+    """Return and delete (not committed) the plan for ``token``; None if expired or unknown.
+
+    Only one of two concurrent commits of the same preview gets the plan.
+    """
+    previews = ImportPreview.__table__
+    mine = (previews.c.token == token, previews.c.workspace_id == workspace_id,
+            previews.c.expires_at > datetime.now())
+    payload = db.session.execute(select(previews.c.plan).where(*mine)).scalar()
+    if payload is None or not db.session.execute(previews.delete().where(*mine)).rowcount:
+        return None
+    return _plan_from_json(payload)
@@ -0,0 +1,63 @@
+"""Set-based tag handling for task forms.
+
+Submitted names are resolved with one IN query, missing tags are created
+with a single INSERT ... ON CONFLICT DO NOTHING against
+uq_tag_workspace_name (so a concurrent request creating the same tag is not
+an error), and only the task_tags rows that actually change are written.
+Saving a task costs the same handful of statements however many tags it
+carries.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Tag, task_tags
+
+
+def parse_tag_names(raw: str | None) -> list[str]:
+    """Comma-separated names, stripped, without blanks or repeats."""
+    return list(dict.fromkeys(name.strip() for name in (raw or '').split(',') if name.strip()))
+
+
+def find_tags(workspace_id: int, names) -> dict[str, int]:
+    """Ids of the existing tags among ``names``, by name."""
+    return {row.name: row.id for row in db.session.execute(
+        select(Tag.id, Tag.name).where(Tag.workspace_id == workspace_id, Tag.name.in_(names))
+    )}
+
+
+def resolve_tags(workspace_id: int, names: list[str]) -> dict[str, int]:
+    """Map each name to its tag id, creating the tags that do not exist yet."""
+    if not names:
+        return {}
+    tag_ids = find_tags(workspace_id, names)
+    missing = [name for name in names if name not in tag_ids]
+    if missing:
+        db.session.execute(
+            sqlite_insert(Tag.__table__).on_conflict_do_nothing(index_elements=['workspace_id', 'name']),
+            [{'workspace_id': workspace_id, 'name': name} for name in missing],
+        )
+        tag_ids.update(find_tags(workspace_id, missing))
+    return tag_ids
+
+
+def set_task_tags(task, names: list[str]) -> tuple[int, int]:
+    """Make the task's tags exactly ``names``; returns (added, removed) link counts."""
+    db.session.flush()
+    wanted = set(resolve_tags(task.workspace_id, names).values())
+    current = set(db.session.execute(
+        select(task_tags.c.tag_id).where(task_tags.c.task_id == task.id)
+    ).scalars())
+
+    stale, added = current - wanted, wanted - current
+    if stale:
+        db.session.execute(task_tags.delete().where(
+            task_tags.c.task_id == task.id, task_tags.c.tag_id.in_(stale)
+        ))
+    if added:
+        db.session.execute(task_tags.insert(), [{'task_id': task.id, 'tag_id': tag_id} for tag_id in sorted(added)])
+    # The links were written behind the ORM's back.
+    db.session.expire(task, ['tags'])
+    return len(added), len(stale)
@@ -0,0 +1,182 @@
+"""Bulk task operations: status, priority, assignees and tags for many tasks.
+
+An operation targets explicit task ids or a filter (the task list's status
+and overdue filters, optionally one project) and is applied with set-based
+UPDATE/INSERT/DELETE statements over chunks of ids, so its cost grows with
+the number of chunks rather than the number of tasks. Nothing is committed
+here; the caller commits once.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import and_, false, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Person, Task, TaskAssignment, refresh_milestone_statuses, task_tags
+from tags import find_tags, resolve_tags
+
+CHUNK_SIZE = 500
+STATUSES = ('todo', 'in_progress', 'on_hold', 'done')
+PRIORITIES = ('low', 'medium', 'high', 'critical')
+
+
+class BulkOperationError(ValueError):
+    pass
+
+
+def _chunks(ids, size: int = CHUNK_SIZE):
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def select_task_ids(workspace_id: int, task_ids=None, filters: dict | None = None) -> list[int]:
+    """Ids of the targeted tasks in the workspace.
+
+    ``task_ids`` picks tasks explicitly (ids from other workspaces and of
+    deleted tasks are dropped); otherwise ``filters`` may hold ``status``, ``overdue`` and
+    ``project_id`` with the same meaning as on the task list. At least one of
+    them must be set, so a request missing both cannot touch every task.
+    """
+    t = Task.__table__
+    if task_ids is not None:
+        found = []
+        for chunk in _chunks({int(task_id) for task_id in task_ids}):
+            found += db.session.execute(
+                select(t.c.id).where(t.c.workspace_id == workspace_id, t.c.deleted_at.is_(None), t.c.id.in_(chunk))
+            ).scalars()
+        return sorted(found)
+
+    filters = filters or {}
+    if not any(filters.get(key) for key in ('status', 'overdue', 'project_id')):
+        raise BulkOperationError('Select tasks or give a status, overdue or project_id filter.')
+    query = select(t.c.id).where(t.c.workspace_id == workspace_id, t.c.deleted_at.is_(None))
+    if filters.get('overdue'):
+        query = query.where(t.c.end_date < date.today(), t.c.status != 'done')
+    elif filters.get('status'):
+        query = query.where(t.c.status == filters['status'])
+    if filters.get('project_id'):
+        query = query.where(t.c.project_id == int(filters['project_id']))
+    return list(db.session.execute(query.order_by(t.c.id)).scalars())
+
+
+def _set_fields(task_ids: list[int], values: dict) -> int:
+    t = Task.__table__
+    changed = or_(*(t.c[name] != value for name, value in values.items()))
+    updated = 0
+    for chunk in _chunks(task_ids):
+        updated += db.session.execute(t.update().where(t.c.id.in_(chunk), changed).values(**values)).rowcount
+    if 'status' in values:
+        # The Core UPDATE bypasses the flush hook that keeps milestones current.
+        for chunk in _chunks(task_ids):
+            refresh_milestone_statuses(task_ids=chunk)
+    return updated
+
+
+def _replace_assignees(task_ids: list[int], workspace_id: int, lead_id: int | None,
+                       member_ids: list[int]) -> tuple[int, int]:
+    """Make every task's assignees exactly the lead plus members; returns (inserted, deleted).
+
+    Only assignments of live people are changed. Those of soft-deleted people
+    are left alone so restoring the person brings them back.
+    """
+    wanted = {lead_id: True} if lead_id else {}
+    for person_id in member_ids:
+        wanted.setdefault(person_id, False)
+    if wanted:
+        known = set(db.session.execute(
+            select(Person.id).where(Person.workspace_id == workspace_id, Person.id.in_(wanted))
+        ).scalars())
+        unknown = sorted(set(wanted) - known)
+        if unknown:
+            raise BulkOperationError(f'Unknown people: {", ".join(map(str, unknown))}')
+
+    a, p = TaskAssignment.__table__, Person.__table__
+    live = a.c.person_id.in_(select(p.c.id).where(p.c.workspace_id == workspace_id, p.c.deleted_at.is_(None)))
+    inserted = deleted = 0
+    for chunk in _chunks(task_ids):
+        in_chunk = a.c.task_id.in_(chunk)
+        deleted += db.session.execute(
+            a.delete().where(in_chunk, live, a.c.person_id.not_in(wanted)) if wanted
+            else a.delete().where(in_chunk, live)
+        ).rowcount
+        lead = a.c.person_id == lead_id if lead_id else false()
+        db.session.execute(a.update().where(in_chunk, live, a.c.is_lead != lead).values(is_lead=lead))
+        present = {(row.task_id, row.person_id) for row in db.session.execute(
+            select(a.c.task_id, a.c.person_id).where(in_chunk)
+        )}
+        rows = [{'task_id': task_id, 'person_id': person_id, 'is_lead': is_lead}
+                for task_id in chunk for person_id, is_lead in wanted.items()
+                if (task_id, person_id) not in present]
+        if rows:
+            db.session.execute(a.insert(), rows)
+            inserted += len(rows)
+    return inserted, deleted
+
+
+def _add_tags(task_ids: list[int], workspace_id: int, names: list[str]) -> int:
+    tag_ids = sorted(set(resolve_tags(workspace_id, names).values()))
+    added = 0
+    for chunk in _chunks(task_ids):
+        rows = [{'task_id': task_id, 'tag_id': tag_id} for task_id in chunk for tag_id in tag_ids]
+        if rows:
+            added += db.session.execute(sqlite_insert(task_tags).on_conflict_do_nothing(), rows).rowcount
+    return added
+
+
+def _remove_tags(task_ids: list[int], workspace_id: int, names: list[str]) -> int:
+    tag_ids = sorted(set(find_tags(workspace_id, names).values()))
+    if not tag_ids:
+        return 0
+    removed = 0
+    for chunk in _chunks(task_ids):
+        removed += db.session.execute(task_tags.delete().where(
+            and_(task_tags.c.task_id.in_(chunk), task_tags.c.tag_id.in_(tag_ids))
+        )).rowcount
+    return removed
+
+
+def apply_bulk_operation(workspace_id: int, task_ids: list[int], *, status: str | None = None,
+                         priority: str | None = None, assignees: dict | None = None,
+                         add_tags: list[str] | None = None, remove_tags: list[str] | None = None) -> dict:
+    """Apply the requested changes to every task in ``task_ids``; returns affected row counts.
+
+    ``assignees`` is ``{"lead_id": id or None, "member_ids": [...]}`` and
+    replaces the current assignees. Raises BulkOperationError for invalid
+    values, before anything is written.
+    """
+    values = {}
+    if status is not None:
+        if status not in STATUSES:
+            raise BulkOperationError(f'Unknown status: {status}')
+        values['status'] = status
+    if priority is not None:
+        if priority not in PRIORITIES:
+            raise BulkOperationError(f'Unknown priority: {priority}')
+        values['priority'] = priority
+    lead_id = member_ids = None
+    if assignees is not None:
+        try:
+            lead_id = int(assignees['lead_id']) if assignees.get('lead_id') else None
+            member_ids = [int(person_id) for person_id in assignees.get('member_ids') or [] if person_id]
+        except (AttributeError, TypeError, ValueError):
+            raise BulkOperationError('Invalid assignees.') from None
+    if not (values or assignees is not None or add_tags or remove_tags):
+        raise BulkOperationError('Nothing to change.')
+
+    counts = {'tasks': len(task_ids), 'updated': 0, 'assignments_inserted': 0,
+              'assignments_deleted': 0, 'tags_added': 0, 'tags_removed': 0}
+    if not task_ids:
+        return counts
+    if assignees is not None:
+        counts['assignments_inserted'], counts['assignments_deleted'] = _replace_assignees(
+            task_ids, workspace_id, lead_id, member_ids)
+    if values:
+        counts['updated'] = _set_fields(task_ids, values)
+    if add_tags:
+        counts['tags_added'] = _add_tags(task_ids, workspace_id, add_tags)
+    if remove_tags:
+        counts['tags_removed'] = _remove_tags(task_ids, workspace_id, remove_tags)
+    return counts
@@ -1,10 +1,13 @@
 import pytest
-from datetime import date
+from contextlib import contextmanager
+from datetime import date, timedelta
+from sqlalchemy import event
 from sqlalchemy.pool import StaticPool
 
 from app import create_app
-from models import (db as _db, Team, Person, Project, Task,
-                    TaskAssignment, Milestone, StatusUpdate, Tag, Workspace)
+from models import (db as _db, Team, Person, Project, Task, TaskAssignment,
+                    Milestone, StatusUpdate, Tag, Workspace)
+from roster import clear_roster_cache
 
 WS_SLUG = 'test'
 W = f'/w/{WS_SLUG}'
@@ -14,6 +17,7 @@ W = f'/w/{WS_SLUG}'
 def app():
     return create_app({
         'TESTING': True,
+        'PURGE_DELETED_IN_BACKGROUND': False,
         'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
         'SQLALCHEMY_ENGINE_OPTIONS': {
             'connect_args': {'check_same_thread': False},
@@ -32,6 +36,8 @@ def db(app):
         yield _db
         _db.session.remove()
         _db.drop_all()
+        # Each test gets a fresh database that reuses the same workspace ids.
+        clear_roster_cache()
 
 
 @pytest.fixture()
@@ -89,3 +95,53 @@ def make_milestone(task, name='Beta Release', ms_date=date(2025, 6, 1),
     _db.session.add(m)
     _db.session.commit()
     return m
+
+
+def seed_workspace(scale):
+    """Fill the test workspace with data whose row counts grow with ``scale``.
+
+    2 teams, 3 people, 2 projects of 3 tasks and so on per unit of scale;
+    every task has a lead and a second assignee, a tag, a milestone and a
+    status update mentioning someone, and depends on the task before it.
+    Dates straddle today so overdue and upcoming lists are populated.
+    """
+    ws_id, today = _ws_id(), date.today()
+    teams = [Team(name=f'Team {n}', workspace_id=ws_id) for n in range(2 * scale)]
+    people = [Person(name=f'Person {n}', email=f'person{n}@example.com', workspace_id=ws_id, teams=[teams[n % len(teams)]])
+              for n in range(3 * scale)]
+    tags = [Tag(name=f'tag-{n}', workspace_id=ws_id) for n in range(scale)]
+    _db.session.add_all(teams + people + tags)
+    for p in range(2 * scale):
+        project = Project(name=f'Project {p}', status='active', start_date=today - timedelta(days=30),
+                          end_date=today + timedelta(days=60), workspace_id=ws_id)
+        _db.session.add(project)
+        previous = None
+        for n in range(3 * scale):
+            start = today + timedelta(days=7 * n - 20)
+            task = Task(title=f'Task {p}.{n}', project=project, workspace_id=ws_id, start_date=start,
+                        end_date=start + timedelta(days=10), status=('todo', 'in_progress', 'done')[n % 3],
+                        priority=('low', 'medium', 'high', 'critical')[n % 4], tags=[tags[n % len(tags)]],
+                        dependencies=[previous] if previous else [])
+            lead, other = people[n % len(people)], people[(n + 1) % len(people)]
+            task.assignments = [TaskAssignment(person=lead, is_lead=True), TaskAssignment(person=other)]
+            task.milestones = [Milestone(name=f'Milestone {p}.{n}', date=start + timedelta(days=5))]
+            task.status_updates = [StatusUpdate(content=f'Progress on @"{other.name}"', mentions=[other])]
+            _db.session.add(task)
+            previous = task
+    _db.session.commit()
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements run inside the block into the yielded list."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = _db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
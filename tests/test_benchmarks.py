@@ -0,0 +1,27 @@
+"""Smoke tests for the benchmark dataset and route list."""
+from benchmarks.dataset import build_workspace
+from benchmarks.run import ROUTES, SLUG, _percentile, _targets
+from models import Task
+
+
+class TestBenchmarkSuite:
+    def test_dataset_is_deterministic_and_every_route_answers(self, client, db):
+        workspace, rows = build_workspace(SLUG, 300, seed=1)
+        db.session.commit()
+        assert rows['tasks'] == Task.query.filter_by(workspace_id=workspace.id).count() == 300
+        assert rows['assignments'] >= 300 and rows['dependencies'] and rows['milestones']
+        assert rows['status_updates'] and rows['mentions']
+
+        targets = _targets(workspace.id)
+        for name, path in ROUTES.items():
+            r = client.get(f'/w/{SLUG}' + path.format(**targets))
+            assert r.status_code == 200, name
+
+        other, again = build_workspace('bench-again', 300, seed=1)
+        assert again == rows
+
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        assert _percentile(values, 50) == 50
+        assert _percentile(values, 95) == 95
+        assert _percentile([7.0], 95) == 7.0
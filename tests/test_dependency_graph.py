@@ -0,0 +1,135 @@
+from datetime import date
+
+import pytest
+
+from dependency_graph import (DependencyCycleError, analyze_schedule, find_cycle, find_dependency_cycle,
+                              load_schedule_analysis)
+from models import Task, TaskDependency
+from tests.conftest import W, make_project, make_task
+
+
+def _depend(db, task, depends_on):
+    db.session.add(TaskDependency(task_id=task.id, depends_on_id=depends_on.id))
+    db.session.commit()
+
+
+class TestAnalyzeSchedule:
+    def test_slack_and_critical_path(self):
+        spans = {
+            1: (date(2025, 1, 1), date(2025, 1, 10)),
+            2: (date(2025, 1, 10), date(2025, 1, 20)),
+            3: (date(2025, 1, 10), date(2025, 1, 12)),
+            4: (date(2025, 1, 20), date(2025, 1, 25)),
+        }
+        edges = [(2, 1), (3, 1), (4, 2), (4, 3)]
+        analysis = analyze_schedule(spans, edges)
+
+        assert analysis.order[0] == 1 and analysis.order[-1] == 4
+        assert analysis.finish == date(2025, 1, 25)
+        assert analysis.critical_path == [1, 2, 4]
+        assert analysis.tasks[3].slack == 8
+        assert analysis.tasks[3].latest_finish == date(2025, 1, 20)
+        assert analysis.critical_ids == {1, 2, 4}
+
+    def test_predecessor_pushes_earliest_start(self):
+        spans = {1: (date(2025, 1, 1), date(2025, 1, 15)), 2: (date(2025, 1, 5), date(2025, 1, 8))}
+        analysis = analyze_schedule(spans, [(2, 1)])
+        assert analysis.tasks[2].earliest_start == date(2025, 1, 15)
+        assert analysis.finish == date(2025, 1, 18)
+
+    def test_cycle_raises(self):
+        spans = {i: (date(2025, 1, 1), date(2025, 1, 2)) for i in (1, 2, 3)}
+        with pytest.raises(DependencyCycleError) as exc:
+            analyze_schedule(spans, [(1, 2), (2, 1), (3, 1)])
+        assert exc.value.task_ids == [1, 2, 3]
+
+
+class TestScheduleEndpoints:
+    def test_critical_path_json_and_gantt_flag(self, client, db):
+        p = make_project()
+        a = make_task(p, 'Design', start=date(2025, 1, 1), end=date(2025, 1, 10))
+        b = make_task(p, 'Build', start=date(2025, 1, 10), end=date(2025, 2, 1))
+        c = make_task(p, 'Docs', start=date(2025, 1, 10), end=date(2025, 1, 12))
+        _depend(db, b, a)
+        _depend(db, c, a)
+
+        data = client.get(f'{W}/projects/{p.id}/critical-path').get_json()
+        assert data['critical_path'] == [f'task-{a.id}', f'task-{b.id}']
+        slack = {t['id']: t['slack'] for t in data['tasks']}
+        assert slack[f'task-{c.id}'] == 20
+
+        bars = {t['id']: t for t in client.get(f'{W}/projects/{p.id}/gantt-data?critical=1').get_json()}
+        assert bars[f'task-{b.id}']['critical'] is True
+        assert 'critical' in bars[f'task-{b.id}']['custom_class']
+        assert bars[f'task-{c.id}']['critical'] is False
+        assert 'critical' not in client.get(f'{W}/projects/{p.id}/gantt-data').get_json()[0]
+
+    def test_cycle_returns_conflict(self, client, db):
+        p = make_project()
+        a = make_task(p, 'A')
+        b = make_task(p, 'B')
+        _depend(db, a, b)
+        _depend(db, b, a)
+        r = client.get(f'{W}/projects/{p.id}/critical-path')
+        assert r.status_code == 409
+        assert r.get_json()['task_ids'] == [f'task-{a.id}', f'task-{b.id}']
+
+    def test_cache_refreshes_when_dates_change(self, app, db):
+        p = make_project()
+        a = make_task(p, 'A', start=date(2025, 1, 1), end=date(2025, 1, 10))
+        first = load_schedule_analysis(project_id=p.id)
+        assert load_schedule_analysis(project_id=p.id) is first
+
+        a.end_date = date(2025, 1, 20)
+        db.session.commit()
+        assert load_schedule_analysis(project_id=p.id).finish == date(2025, 1, 20)
+
+    def test_cache_refreshes_after_offsetting_sql_writes(self, app, db):
+        p = make_project()
+        a = make_task(p, 'A', start=date(2025, 1, 1), end=date(2025, 1, 10))
+        b = make_task(p, 'B', start=date(2025, 1, 1), end=date(2025, 1, 3))
+        c = make_task(p, 'C', start=date(2025, 1, 1), end=date(2025, 1, 2))
+        d = make_task(p, 'D', start=date(2025, 1, 1), end=date(2025, 1, 2))
+        _depend(db, c, a)
+        _depend(db, d, b)
+        analysis = load_schedule_analysis(workspace_id=p.workspace_id)
+        assert analysis.tasks[c.id].earliest_start == date(2025, 1, 10)
+
+        tasks, edges = Task.__table__, TaskDependency.__table__
+        db.session.execute(tasks.update().where(tasks.c.id == a.id).values(start_date=date(2025, 1, 3)))
+        db.session.execute(tasks.update().where(tasks.c.id == b.id).values(start_date=date(2024, 12, 31)))
+        db.session.commit()
+        analysis = load_schedule_analysis(workspace_id=p.workspace_id)
+        assert analysis.tasks[a.id].earliest_start == date(2025, 1, 3)
+        assert analysis.tasks[b.id].earliest_start == date(2024, 12, 31)
+
+        # Swapped edges leave any sum over the edge rows unchanged.
+        db.session.execute(edges.update().where(edges.c.task_id == c.id).values(depends_on_id=b.id))
+        db.session.execute(edges.update().where(edges.c.task_id == d.id).values(depends_on_id=a.id))
+        db.session.commit()
+        analysis = load_schedule_analysis(project_id=p.id)
+        assert analysis.tasks[c.id].earliest_start == date(2025, 1, 3)
+        assert analysis.tasks[d.id].earliest_start == date(2025, 1, 10)
+
+
+class TestCycleChecks:
+    def test_new_edge_closing_a_chain_is_rejected(self, app, db):
+        p = make_project()
+        a, b, c = (make_task(p, name) for name in 'ABC')
+        _depend(db, b, a)
+        _depend(db, c, b)
+
+        assert find_dependency_cycle(a.id, [c.id]) == [a.id, c.id, b.id, a.id]
+        assert find_dependency_cycle(a.id, [a.id]) == [a.id, a.id]
+        assert find_dependency_cycle(c.id, [a.id]) is None
+
+    def test_replacing_own_edges_is_not_a_cycle(self, app, db):
+        p = make_project()
+        a, b = make_task(p, 'A'), make_task(p, 'B')
+        _depend(db, b, a)
+        # B already depends on A; re-saving the same list must pass.
+        assert find_dependency_cycle(b.id, [a.id]) is None
+
+    def test_find_cycle_in_memory(self):
+        assert find_cycle([(2, 1), (3, 2)]) is None
+        assert find_cycle([(2, 1), (3, 2), (1, 3), (4, 1)]) == [1, 2, 3, 4]
@@ -1,7 +1,7 @@
 """Unit tests for model properties and computed fields."""
 from datetime import date, timedelta
 import pytest
-from models import Task, TaskAssignment, Milestone, Project, Person
+from models import Task, TaskAssignment, Milestone, Project, Person, refresh_milestone_statuses
 from tests.conftest import make_project, make_task, make_milestone, make_person, make_team
 
 
@@ -98,3 +98,58 @@ class TestMilestoneComputedStatus:
         future = date.today() + timedelta(days=10)
         ms = make_milestone(t, ms_date=future)
         assert ms.computed_status == 'on_hold'
+
+
+class TestMilestoneStoredStatus:
+    def test_task_and_project_status_changes_refresh_milestones(self, db):
+        p = make_project()
+        t = make_task(p, status='in_progress')
+        ms = make_milestone(t, ms_date=date.today() - timedelta(days=1))
+        assert ms.status == 'delayed'
+
+        t.status = 'done'
+        db.session.commit()
+        assert ms.status == 'on_track'
+
+        p.status = 'on_hold'
+        db.session.commit()
+        assert ms.status == 'on_hold'
+
+    def test_daily_refresh_marks_newly_overdue_milestones(self, db):
+        p = make_project()
+        t = make_task(p, status='todo')
+        ms = make_milestone(t, ms_date=date.today() + timedelta(days=2))
+        assert ms.status == 'on_track'
+
+        assert refresh_milestone_statuses(today=date.today() + timedelta(days=3)) == 1
+        db.session.commit()
+        assert ms.status == 'delayed'
+        assert Milestone.query.filter_by(status='delayed').count() == 1
+        # Already current: nothing left to write.
+        assert refresh_milestone_statuses(today=date.today() + timedelta(days=3)) == 0
+
+
+class TestSoftDelete:
+    def test_deleted_rows_and_their_children_are_hidden(self, db):
+        from datetime import datetime
+        from models import TaskDependency
+        p = make_project()
+        kept, gone = make_task(p, 'Kept'), make_task(p, 'Gone')
+        ann, bob = make_person('Ann'), make_person('Bob')
+        make_milestone(gone)
+        db.session.add_all([TaskAssignment(task_id=kept.id, person_id=ann.id),
+                            TaskAssignment(task_id=kept.id, person_id=bob.id),
+                            TaskAssignment(task_id=gone.id, person_id=ann.id),
+                            TaskDependency(task_id=kept.id, depends_on_id=gone.id)])
+        gone.deleted_at = bob.deleted_at = datetime.now()
+        db.session.commit()
+        db.session.expunge_all()
+
+        project = Project.query.one()
+        assert [t.title for t in project.tasks] == ['Kept']
+        assert [person.name for person in project.tasks[0].assignees] == ['Ann']
+        assert project.tasks[0].dependencies == []
+        assert Milestone.query.count() == 0
+        assert [person.name for person in Person.query] == ['Ann']
+        assert len(Person.query.filter_by(name='Ann').one().assignments) == 1
+        assert Task.query.execution_options(include_deleted=True).count() == 2
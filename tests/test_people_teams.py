@@ -1,5 +1,7 @@
 """Tests for people and team routes."""
-from models import Person, Team
+from datetime import date
+
+from models import Person, Team, TaskAssignment
 from tests.conftest import make_team, make_person, make_project, make_task, W
 
 
@@ -67,6 +69,82 @@ class TestPersonDetail:
         assert b"Frank&#39;s Task" in r.data or b"Frank's Task" in r.data
 
 
+class TestWorkload:
+    def test_workload_data_counts_overlapping_tasks(self, client, db):
+        team = make_team('Design')
+        ann = make_person('Ann', team=team)
+        bob = make_person('Bob', team=team)
+        proj = make_project()
+        t1 = make_task(proj, 'One', start=date(2025, 1, 1), end=date(2025, 1, 3))
+        t2 = make_task(proj, 'Two', start=date(2025, 1, 2), end=date(2025, 1, 10))
+        t3 = make_task(proj, 'Three', status='done', start=date(2025, 1, 1), end=date(2025, 1, 2))
+        db.session.add_all([TaskAssignment(task_id=t1.id, person_id=ann.id),
+                            TaskAssignment(task_id=t2.id, person_id=ann.id),
+                            TaskAssignment(task_id=t2.id, person_id=bob.id),
+                            TaskAssignment(task_id=t3.id, person_id=bob.id)])
+        db.session.commit()
+
+        data = client.get(f'{W}/people/workload-data?start=2024-12-31&end=2025-01-04').get_json()
+        assert data['days'] == 5
+        load = {row['name']: row['load'] for row in data['people']}
+        assert load == {'Ann': [0, 1, 2, 2, 1], 'Bob': [0, 1, 2, 1, 1]}
+        assert data['teams'] == [{'id': team.id, 'name': 'Design', 'load': [0, 2, 4, 3, 2]}]
+
+        data = client.get(f'{W}/people/workload-data?start=2024-12-31&end=2025-01-04'
+                          '&status=todo&status=in_progress').get_json()
+        assert {row['name']: row['load'] for row in data['people']}['Bob'] == [0, 0, 1, 1, 1]
+
+    def test_workload_rejects_bad_window(self, client):
+        r = client.get(f'{W}/people/workload-data?start=2025-02-01&end=2025-01-01')
+        assert r.status_code == 400
+        assert client.get(f'{W}/people/workload').status_code == 200
+
+
+class TestRoster:
+    def test_roster_revalidates_with_etag(self, client, db):
+        make_person('Zoe Adams')
+        make_person('Adam Brown')
+        db.session.commit()
+
+        r = client.get(f'{W}/people/roster.json')
+        assert [p['name'] for p in r.get_json()] == ['Adam Brown', 'Zoe Adams']
+        assert r.headers['Cache-Control'] == 'private, no-cache'
+        etag = r.headers['ETag']
+
+        r = client.get(f'{W}/people/roster.json', headers={'If-None-Match': etag})
+        assert r.status_code == 304
+
+        make_person('Carl Diaz')
+        db.session.commit()
+        r = client.get(f'{W}/people/roster.json', headers={'If-None-Match': etag})
+        assert r.status_code == 200
+        assert len(r.get_json()) == 3
+        assert r.headers['ETag'] != etag
+
+    def test_rename_changes_etag(self, client, db):
+        p = make_person('Hank')
+        db.session.commit()
+        etag = client.get(f'{W}/people/roster.json').headers['ETag']
+        client.post(f'{W}/people/{p.id}/edit', data={'name': 'Henry', 'email': ''})
+        r = client.get(f'{W}/people/roster.json', headers={'If-None-Match': etag})
+        assert r.status_code == 200
+        assert r.get_json()[0]['name'] == 'Henry'
+
+    def test_search_matches_word_prefixes(self, client, db):
+        for name in ('Jane Smith', 'Janet Jones', 'Sam Jansen', 'Bob Smithers'):
+            make_person(name)
+        db.session.commit()
+
+        def names(q):
+            return [p['name'] for p in client.get(f'{W}/people/search.json?q={q}').get_json()]
+
+        assert names('jan') == ['Jane Smith', 'Janet Jones', 'Sam Jansen']
+        assert names('JANE') == ['Jane Smith', 'Janet Jones']
+        assert names('smi j') == ['Jane Smith']
+        assert names('ith') == []
+        assert len(names('')) == 4
+
+
 class TestEditPerson:
     def test_get_edit_form(self, client, db):
         p = make_person('Grace')
@@ -98,7 +176,7 @@ class TestDeletePerson:
         pid = p.id
         r = client.post(f'{W}/people/{pid}/delete', follow_redirects=True)
         assert r.status_code == 200
-        assert Person.query.get(pid) is None
+        assert Person.query.filter_by(id=pid).first() is None
 
 
 class TestTeamList:
@@ -147,6 +225,41 @@ class TestEditTeam:
         db.session.refresh(t)
         assert t.name == 'Renamed'
 
+    def test_update_members_writes_only_the_difference(self, client, db):
+        from sqlalchemy import select
+        from deletion import soft_delete
+        from models import person_teams
+        t, other = make_team('Core'), make_team('Other')
+        ann, bob, cat = make_person('Ann', t), make_person('Bob', t), make_person('Cat', other)
+        gone = make_person('Gone', t)
+        soft_delete(gone)
+        db.session.commit()
+
+        r = client.get(f'{W}/teams/{t.id}/edit')
+        assert b'also in Other' in r.data
+        client.post(f'{W}/teams/{t.id}/edit', data={'name': 'Core', 'member_ids': [bob.id, cat.id, 99999]})
+        links = set(db.session.execute(select(person_teams.c.person_id, person_teams.c.team_id)).all())
+        # The deleted member keeps its link so an undo restores it.
+        assert links == {(bob.id, t.id), (cat.id, t.id), (cat.id, other.id), (gone.id, t.id)}
+        assert ann.id not in {pid for pid, _ in links}
+
+    def test_person_form_syncs_teams(self, client, db):
+        a, b = make_team('A'), make_team('B')
+        p = make_person('Dee', a)
+        client.post(f'{W}/people/{p.id}/edit', data={'name': 'Dee', 'team_ids': [b.id]})
+        db.session.expire_all()
+        assert [team.name for team in Person.query.filter_by(id=p.id).one().teams] == ['B']
+
+    def test_list_shows_counts_and_a_preview(self, client, db):
+        from memberships import MEMBER_PREVIEW
+        t = make_team('Big')
+        for n in range(MEMBER_PREVIEW + 3):
+            make_person(f'Member {n:02d}', t)
+        r = client.get(W + '/teams')
+        assert f'{MEMBER_PREVIEW + 3} members'.encode() in r.data
+        assert b'Member 00' in r.data and f'Member {MEMBER_PREVIEW:02d}'.encode() not in r.data
+        assert b'and 3 more' in r.data
+
 
 class TestDeleteTeam:
     def test_get_shows_confirmation(self, client, db):
@@ -161,4 +274,4 @@ class TestDeleteTeam:
         tid = t.id
         r = client.post(f'{W}/teams/{tid}/delete', follow_redirects=True)
         assert r.status_code == 200
-        assert Team.query.get(tid) is None
+        assert Team.query.filter_by(id=tid).first() is None
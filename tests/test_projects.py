@@ -1,9 +1,9 @@
 """Tests for project CRUD routes."""
-from datetime import date
+from datetime import date, datetime, timedelta
 from io import BytesIO
 import openpyxl
 from models import Project
-from tests.conftest import make_project, make_task, make_milestone, W
+from tests.conftest import make_project, make_task, make_milestone, make_person, W
 
 
 class TestProjectList:
@@ -133,7 +133,92 @@ class TestDeleteProject:
         pid = p.id
         r = client.post(f'{W}/projects/{pid}/delete', follow_redirects=True)
         assert r.status_code == 200
-        assert Project.query.get(pid) is None
+        assert Project.query.filter_by(id=pid).first() is None
+
+    def test_set_based_delete_takes_soft_deleted_tasks(self, app, db):
+        from deletion import delete_project_data, soft_delete
+        from models import StatusUpdate, Task, TaskDependency
+        p, other = make_project('Gone'), make_project('Kept')
+        a, trashed = make_task(p, 'A'), make_task(p, 'Trashed')
+        kept = make_task(other, 'Kept task')
+        db.session.add_all([StatusUpdate(task_id=trashed.id, content='hi'),
+                            TaskDependency(task_id=kept.id, depends_on_id=a.id)])
+        soft_delete(trashed)
+        db.session.commit()
+
+        assert delete_project_data([p.id]) == 1
+        db.session.commit()
+        assert [t.title for t in Task.query.execution_options(include_deleted=True)] == ['Kept task']
+        # Core selects: ORM queries would hide rows left pointing at deleted tasks.
+        assert db.session.execute(StatusUpdate.__table__.select()).first() is None
+        assert db.session.execute(TaskDependency.__table__.select()).first() is None
+        assert [pr.name for pr in Project.query] == ['Kept']
+
+    def test_purge_deletes_every_child_row(self, client, db):
+        from deletion import purge_deleted
+        from models import (Milestone, StatusUpdate, Tag, Task, TaskAssignment, TaskDependency,
+                            status_update_mentions, task_tags)
+        p, other = make_project('Gone'), make_project('Kept')
+        ann = make_person('Ann')
+        a, b = make_task(p, 'A'), make_task(p, 'B')
+        kept = make_task(other, 'Kept task')
+        tag = Tag(name='x', workspace_id=p.workspace_id)
+        update = StatusUpdate(task_id=a.id, content='hi')
+        db.session.add(update)
+        update.mentions.append(ann)
+        db.session.add_all([tag,
+                            TaskAssignment(task_id=a.id, person_id=ann.id),
+                            TaskAssignment(task_id=kept.id, person_id=ann.id),
+                            TaskDependency(task_id=b.id, depends_on_id=a.id),
+                            TaskDependency(task_id=kept.id, depends_on_id=b.id)])
+        db.session.flush()
+        db.session.execute(task_tags.insert(), [{'task_id': a.id, 'tag_id': tag.id},
+                                                {'task_id': kept.id, 'tag_id': tag.id}])
+        make_milestone(a)
+
+        client.post(f'{W}/projects/{p.id}/delete')
+        assert purge_deleted(pause=0) == 0  # still within the undo window
+        assert purge_deleted(datetime.now() + timedelta(seconds=1), pause=0) == 3
+        db.session.expire_all()
+        assert [t.title for t in Task.query.execution_options(include_deleted=True)] == ['Kept task']
+        assert StatusUpdate.query.count() == Milestone.query.count() == TaskDependency.query.count() == 0
+        assert db.session.execute(status_update_mentions.select()).first() is None
+        assert [row.task_id for row in TaskAssignment.query] == [kept.id]
+        assert [row.task_id for row in db.session.execute(task_tags.select())] == [kept.id]
+        assert [pr.name for pr in Project.query.execution_options(include_deleted=True)] == ['Kept']
+
+    def test_undo_restores_project_with_its_tasks(self, client, db):
+        from models import Task
+        p = make_project('Undone')
+        make_task(p, 'Deleted with project')
+        earlier = make_task(p, 'Deleted before')
+        client.post(f'{W}/tasks/{earlier.id}/delete')
+        r = client.post(f'{W}/projects/{p.id}/delete', follow_redirects=True)
+        assert b'Deleted project &#34;Undone&#34;.' in r.data
+        assert f'/projects/{p.id}/restore'.encode() in r.data
+        assert client.get(f'{W}/projects/{p.id}').status_code == 404
+        assert client.post(f'{W}/tasks/{earlier.id}/restore').status_code == 404
+
+        r = client.post(f'{W}/projects/{p.id}/restore')
+        assert r.status_code == 302
+        assert [t.title for t in Task.query.filter_by(project_id=p.id)] == ['Deleted with project']
+
+    def test_task_of_a_removed_project_cannot_be_restored(self, client, db):
+        p = make_project()
+        t = make_task(p)
+        client.post(f'{W}/tasks/{t.id}/delete')
+        db.session.execute(Project.__table__.delete().where(Project.__table__.c.id == p.id))
+        db.session.commit()
+        assert client.post(f'{W}/tasks/{t.id}/restore').status_code == 404
+
+    def test_undo_window_expires(self, app, client, db):
+        p = make_project()
+        client.post(f'{W}/projects/{p.id}/delete')
+        app.config['UNDO_DELETE_SECONDS'] = 0
+        try:
+            assert client.post(f'{W}/projects/{p.id}/restore').status_code == 404
+        finally:
+            app.config.pop('UNDO_DELETE_SECONDS')
 
     def test_post_redirects_to_list(self, client, db):
         p = make_project()
@@ -141,6 +226,97 @@ class TestDeleteProject:
         assert r.status_code == 302
         assert '/projects' in r.headers['Location']
 
+
+class TestCloneProject:
+    def test_clone_copies_tasks_within_the_workspace(self, client, db):
+        from models import Task, TaskAssignment, TaskDependency
+        p, other = make_project('Source'), make_project('Other')
+        ann = make_person('Ann')
+        a, b = make_task(p, 'A'), make_task(p, 'B')
+        upstream = make_task(other, 'Upstream')
+        db.session.add_all([TaskAssignment(task_id=a.id, person_id=ann.id, is_lead=True),
+                            TaskDependency(task_id=b.id, depends_on_id=a.id),
+                            TaskDependency(task_id=a.id, depends_on_id=upstream.id)])
+        db.session.commit()
+        make_milestone(b, 'Ship', date(2025, 6, 1))
+
+        r = client.post(f'{W}/projects/{p.id}/clone', data={'name': 'Next', 'days': '-1'})
+        assert r.status_code == 302
+        db.session.expire_all()
+        copy = Project.query.filter_by(name='Next').one()
+        assert r.headers['Location'].endswith(f'/projects/{copy.id}')
+        assert copy.start_date == date(2024, 12, 31)
+        tasks = {t.title: t for t in copy.tasks}
+        assert sorted(tasks) == ['A', 'B'] and tasks['A'].id != a.id
+        assert tasks['A'].lead == ann
+        assert tasks['B'].dependencies == [tasks['A']]
+        assert tasks['A'].dependencies == [upstream]
+        assert [(m.name, m.date) for m in tasks['B'].milestones] == [('Ship', date(2025, 5, 31))]
+        assert Task.query.filter_by(project_id=p.id).count() == 2
+
+
+class TestShiftSchedule:
+    def test_shift_after_pivot_moves_later_tasks_and_milestones(self, client, db):
+        from models import Milestone, Task
+        p = make_project()
+        early = make_task(p, 'Early', start=date(2025, 1, 1), end=date(2025, 2, 28))
+        late = make_task(p, 'Late', start=date(2025, 3, 3), end=date(2025, 3, 7))
+        make_milestone(late, 'Review', date(2025, 3, 5))
+
+        r = client.post(f'{W}/projects/{p.id}/shift-schedule', json={'days': 7, 'pivot': '2025-03-01'})
+        assert r.status_code == 200
+        data = r.get_json()
+        assert data['moved'] == {'tasks': 1, 'milestones': 1}
+        assert (data['start_date'], data['end_date']) == ('2025-01-01', '2026-01-07')
+        bars = {bar['name']: bar for bar in data['tasks']}
+        assert (bars['Late']['start'], bars['Late']['end']) == ('2025-03-10', '2025-03-14')
+        assert bars['Late']['milestones'][0]['date'] == '2025-03-12'
+        db.session.expire_all()
+        assert Task.query.filter_by(id=early.id).one().start_date == date(2025, 1, 1)
+        assert Milestone.query.one().date == date(2025, 3, 12)
+
+    def test_working_days_skip_weekends(self, client, db):
+        from models import Task
+        from schedule_shift import add_working_days
+        p = make_project()
+        # Friday 2025-01-03 through Thursday 2025-01-09, each lasting three days.
+        for n in range(7):
+            day = date(2025, 1, 3) + timedelta(days=n)
+            make_task(p, day.isoformat(), start=day, end=day + timedelta(days=3))
+
+        r = client.post(f'{W}/projects/{p.id}/shift-schedule', json={'days': 5, 'working_days': True})
+        assert r.status_code == 200
+        db.session.expire_all()
+        moved = {t.title: (t.start_date.isoformat(), t.end_date.isoformat())
+                 for t in Task.query.filter_by(project_id=p.id)}
+        assert moved == {
+            '2025-01-03': ('2025-01-10', '2025-01-13'),
+            '2025-01-04': ('2025-01-10', '2025-01-14'),
+            '2025-01-05': ('2025-01-10', '2025-01-15'),
+            '2025-01-06': ('2025-01-13', '2025-01-16'),
+            '2025-01-07': ('2025-01-14', '2025-01-17'),
+            '2025-01-08': ('2025-01-15', '2025-01-17'),
+            '2025-01-09': ('2025-01-16', '2025-01-17'),
+        }
+        assert Project.query.one().start_date == date(2025, 1, 8)
+
+        assert add_working_days(date(2025, 1, 4), 1) == date(2025, 1, 6)
+        assert add_working_days(date(2025, 1, 4), 5) == date(2025, 1, 10)
+        assert add_working_days(date(2025, 1, 5), -1) == date(2025, 1, 3)
+        assert add_working_days(date(2025, 1, 4), -5) == date(2024, 12, 30)
+        assert add_working_days(date(2025, 1, 3), -6) == date(2024, 12, 26)
+        assert add_working_days(date(2025, 1, 4), 0) == date(2025, 1, 4)
+
+    def test_rejects_invalid_shift(self, client, db):
+        p = make_project()
+        make_task(p)
+        for payload in ({}, {'days': 'soon'}, {'days': 5, 'pivot': 'tomorrow'}, {'days': 100000}):
+            r = client.post(f'{W}/projects/{p.id}/shift-schedule', json=payload)
+            assert r.status_code == 400 and r.get_json()['ok'] is False
+        db.session.expire_all()
+        assert Project.query.one().start_date == date(2025, 1, 1)
+
+
 class TestExcelExport:
     def test_returns_xlsx(self, client, db):
         p = make_project('Export Me')
@@ -201,4 +377,4 @@ class TestExcelExport:
         t = make_task(p)
         tid = t.id
         client.post(f'{W}/projects/{p.id}/delete')
-        assert Task.query.get(tid) is None
+        assert Task.query.filter_by(id=tid).first() is None
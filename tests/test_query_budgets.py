@@ -0,0 +1,59 @@
+"""Query-count budgets for list, detail and JSON routes.
+
+Each route is requested against seeded workspaces of two sizes and must
+stay within the same fixed number of SQL statements at both. The larger
+workspace has enough rows that a query per task, person or project (a lazy
+load in a template loop, say) pushes any route over its budget.
+"""
+import pytest
+
+from models import Person, Project, Task, Team
+from tests.conftest import count_queries, seed_workspace, W
+
+BUDGETS = {
+    '/': 12,
+    '/tasks': 6,
+    '/tasks/{task}': 11,
+    '/tasks/{task}/edit': 10,
+    '/tasks/new': 4,
+    '/people': 5,
+    '/people/{person}': 14,
+    '/people/{person}/edit': 3,
+    '/people/workload': 1,
+    '/people/workload-data': 5,
+    '/people/roster.json': 2,
+    '/people/search.json?q=per': 2,
+    '/teams': 4,
+    '/teams/{team}/edit': 5,
+    '/projects': 3,
+    '/projects/{project}': 8,
+    '/projects/{project}/gantt-data?critical=1': 11,
+    '/projects/dashboard-gantt-data': 4,
+    '/projects/{project}/export/excel': 7,
+    '/projects/{project}/critical-path': 4,
+    '/projects/critical-path': 5,
+    '/search?q=task': 2,
+    '/search.json?q=task': 2,
+}
+
+
+class TestQueryBudgets:
+    @pytest.mark.parametrize('scale', [1, 4])
+    def test_routes_stay_within_budget(self, client, db, scale):
+        seed_workspace(scale)
+        ids = {'task': Task.query.order_by(Task.id).first().id,
+               'person': Person.query.order_by(Person.id).first().id,
+               'team': Team.query.order_by(Team.id).first().id,
+               'project': Project.query.order_by(Project.id).first().id}
+        db.session.remove()
+        # Once-a-day and once-per-process work is not part of any page's cost.
+        client.get(W + '/')
+
+        over = {}
+        for path, budget in BUDGETS.items():
+            with count_queries() as statements:
+                r = client.get(W + path.format(**ids))
+            assert r.status_code == 200, path
+            if len(statements) > budget:
+                over[path] = (len(statements), budget)
+        assert over == {}
@@ -0,0 +1,45 @@
+"""Tests for the per-request Server-Timing instrumentation."""
+import json
+import logging
+
+from tests.conftest import make_project, make_task, W
+
+
+def _timings(response):
+    entries = {}
+    for entry in response.headers['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        entries[name] = dict(param.split('=', 1) for param in params)
+    return entries
+
+
+class TestServerTiming:
+    def test_header_counts_queries_and_template_time(self, client, db):
+        make_task(make_project())
+        r = client.get(W + '/tasks')
+        timings = _timings(r)
+        assert set(timings) == {'db', 'tpl', 'json', 'app'}
+        queries = int(timings['db']['desc'].strip('"').split()[0])
+        assert queries > 0
+        assert float(timings['tpl']['dur']) > 0
+
+    def test_json_routes_report_serialization_and_log_a_line(self, client, db, caplog):
+        p = make_project()
+        make_task(p)
+        with caplog.at_level(logging.INFO, logger='taskmaster.request_timing'):
+            r = client.get(f'{W}/projects/{p.id}/gantt-data')
+        assert float(_timings(r)['json']['dur']) > 0
+        line = json.loads(caplog.records[-1].getMessage())
+        assert line['endpoint'] == 'projects.gantt_data' and line['status'] == 200
+        assert line['queries'] > 0 and line['json_ms'] > 0
+
+    def test_debug_panel_is_opt_in(self, app, client, db):
+        assert b'id="request-timing"' not in client.get(W + '/tasks').data
+        app.config['REQUEST_TIMING_PANEL'] = True
+        try:
+            html = client.get(W + '/tasks').data
+            json_body = client.get(W + '/people/roster.json').data
+        finally:
+            app.config['REQUEST_TIMING_PANEL'] = False
+        assert b'id="request-timing"' in html and html.rstrip().endswith(b'</html>')
+        assert b'request-timing' not in json_body
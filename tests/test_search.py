@@ -0,0 +1,61 @@
+from models import Project, StatusUpdate, Workspace
+from search import build_match_query, search
+from tests.conftest import W, make_project, make_task
+
+
+class TestSearchIndex:
+    def test_triggers_keep_index_in_sync(self, app, db):
+        project = make_project('Website Redesign')
+        task = make_task(project, 'Homepage wireframes')
+        db.session.add(StatusUpdate(task_id=task.id, content='Shared the <b>draft</b> wireframes'))
+        db.session.commit()
+
+        kinds = {hit.kind for hit in search(project.workspace_id, 'wireframes')}
+        assert kinds == {'task', 'update'}
+        assert search(project.workspace_id, 'redesign')[0].kind == 'project'
+
+        task.title = 'Homepage layout'
+        db.session.commit()
+        assert [h.kind for h in search(project.workspace_id, 'wireframes')] == ['update']
+        assert [h.id for h in search(project.workspace_id, 'layout')] == [task.id]
+
+        db.session.delete(task.status_updates[0])
+        db.session.commit()
+        assert search(project.workspace_id, 'wireframes') == []
+
+    def test_prefix_mode_and_workspace_scope(self, app, db):
+        project = make_project()
+        make_task(project, 'Design review')
+        other = Workspace(name='Other', slug='other')
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Project(name='Design system', workspace_id=other.id, status='active'))
+        db.session.commit()
+
+        assert search(project.workspace_id, 'desi') == []
+        hits = search(project.workspace_id, 'desi', prefix=True)
+        assert [(h.kind, h.title) for h in hits] == [('task', 'Design review')]
+
+    def test_query_syntax_is_literal(self):
+        assert build_match_query('NEAR(a b) OR "x"') == '"NEAR" "a" "b" "OR" "x"'
+        assert build_match_query('fo', prefix=True) == '"fo"*'
+        assert build_match_query('  --  ') is None
+
+
+class TestSearchRoutes:
+    def test_page_and_json(self, client, db):
+        project = make_project()
+        task = make_task(project, 'Budget approval')
+        db.session.add(StatusUpdate(task_id=task.id, content='Waiting on <script>finance</script>'))
+        db.session.commit()
+
+        data = client.get(f'{W}/search.json?q=finance').get_json()
+        assert data['results'][0]['kind'] == 'update'
+        assert data['results'][0]['title'] == 'Budget approval'
+        assert '<mark>finance</mark>' in data['results'][0]['snippet']
+        assert '&lt;script&gt;' in data['results'][0]['snippet']
+
+        r = client.get(f'{W}/search?q=budg&prefix=1')
+        assert r.status_code == 200
+        assert b'Budget approval' in r.data
+        assert f'/tasks/{task.id}'.encode() in r.data
@@ -2,8 +2,13 @@ import io
 import re
 from datetime import datetime
 
-from models import StatusUpdate
-from status_update_import import import_status_updates_from_text
+import pytest
+
+from import_status_updates import BatchJob, collect_batch_jobs
+from deletion import delete_tasks, soft_delete
+from models import ImportPreview, StatusUpdate
+from status_update_import import (apply_import_plan, build_import_plan, import_status_updates_from_text,
+                                  pop_import_plan, store_import_plan)
 from tests.conftest import W, make_person, make_project, make_task
 
 
@@ -87,6 +92,126 @@ class TestStatusUpdateImportService:
         assert 'quoted field' in summary.results[0].message
         assert StatusUpdate.query.count() == 0
 
+    def test_applied_plan_skips_rows_imported_since_preview(self, app, db):
+        person = make_person('Jane Smith')
+        project = make_project('Website Redesign')
+        task = make_task(project, 'Homepage QA')
+        csv_text = (
+            'project_name,task_title,content,mentions,external_id\n'
+            'Website Redesign,Homepage QA,"Blocked on legal copy",Jane Smith,weekly-1\n'
+            'Website Redesign,Homepage QA,"Legal copy approved",Jane Smith,weekly-2\n'
+        )
+
+        plan = build_import_plan(csv_text, workspace_slug='test', dry_run=True)
+        db.session.add(StatusUpdate(task_id=task.id, content='Imported elsewhere', external_id='weekly-1'))
+        db.session.commit()
+
+        summary = apply_import_plan(plan)
+
+        assert summary.imported == 1
+        assert summary.skipped == 1
+        assert [r.status for r in summary.results] == ['skipped', 'imported']
+        update = StatusUpdate.query.filter_by(external_id='weekly-2').one()
+        assert person in update.mentions
+
+    def test_applied_plan_skips_tasks_deleted_since_preview(self, app, db):
+        project = make_project('Website Redesign')
+        kept, trashed, gone = (make_task(project, title) for title in ('Kept', 'Trashed', 'Gone'))
+        plan = build_import_plan(
+            'project_name,task_title,content\n'
+            'Website Redesign,Kept,"Still here"\n'
+            'Website Redesign,Trashed,"In the trash"\n'
+            'Website Redesign,Gone,"Hard deleted"\n',
+            workspace_slug='test', dry_run=True,
+        )
+        soft_delete(trashed)
+        delete_tasks([gone.id])
+        db.session.commit()
+
+        summary = apply_import_plan(plan)
+
+        assert (summary.imported, summary.skipped) == (1, 2)
+        assert [r.status for r in summary.results] == ['imported', 'skipped', 'skipped']
+        assert 'deleted after the preview' in summary.results[1].message
+        assert [row.task_id for row in db.session.execute(StatusUpdate.__table__.select())] == [kept.id]
+
+    def test_stored_plan_round_trips_through_the_database(self, app, db):
+        person = make_person('Jane Smith')
+        task = make_task(make_project('Website Redesign'), 'Homepage QA')
+        plan = build_import_plan(
+            'project_name,task_title,created_at,content,mentions,external_id\n'
+            'Website Redesign,Homepage QA,2026-03-14T09:00:00Z,"Blocked",Jane Smith,weekly-1\n',
+            workspace_slug='test', dry_run=True,
+        )
+        workspace_id, person_id = task.workspace_id, person.id
+        db.session.rollback()
+        token = store_import_plan(plan)
+        db.session.remove()
+
+        assert pop_import_plan(token, workspace_id + 1) is None
+        restored = pop_import_plan(token, workspace_id)
+        assert pop_import_plan(token, workspace_id) is None
+        assert restored.updates[0].result is restored.summary.results[0]
+        assert (restored.updates[0].created_at, restored.updates[0].mention_ids) == (
+            plan.updates[0].created_at, [person_id])
+        assert apply_import_plan(restored).imported == 1
+        assert db.session.execute(ImportPreview.__table__.select()).first() is None
+
+    def test_content_dedupe_skips_rerun_without_external_id(self, app, db):
+        project = make_project('Website Redesign')
+        make_task(project, 'Homepage QA')
+        csv_text = (
+            'project_name,task_title,created_at,content\n'
+            'Website Redesign,Homepage QA,2026-03-14 09:00:00,"Blocked on legal copy"\n'
+        )
+
+        first = import_status_updates_from_text(csv_text, workspace_slug='test', dedupe_content=True)
+        rerun = import_status_updates_from_text(
+            csv_text.replace('"Blocked on legal copy"', '"  blocked on  Legal copy "'),
+            workspace_slug='test',
+            dedupe_content=True,
+        )
+
+        assert first.imported == 1
+        assert rerun.imported == 0
+        assert rerun.skipped == 1
+        assert 'Duplicate content' in rerun.results[0].message
+        assert StatusUpdate.query.count() == 1
+
+    def test_content_dedupe_is_opt_in(self, app, db):
+        project = make_project('Website Redesign')
+        make_task(project, 'Homepage QA')
+        csv_text = (
+            'project_name,task_title,created_at,content\n'
+            'Website Redesign,Homepage QA,2026-03-14 09:00:00,"Blocked on legal copy"\n'
+        )
+
+        import_status_updates_from_text(csv_text, workspace_slug='test')
+        import_status_updates_from_text(csv_text, workspace_slug='test')
+
+        assert StatusUpdate.query.count() == 2
+
+    def test_content_dedupe_matches_updates_added_outside_import(self, app, db):
+        project = make_project('Website Redesign')
+        task = make_task(project, 'Homepage QA')
+        db.session.add(StatusUpdate(task_id=task.id, content='Blocked on legal copy',
+                                    created_at=datetime(2026, 3, 14, 9, 0, 0)))
+        db.session.commit()
+
+        summary = import_status_updates_from_text(
+            'project_name,task_title,created_at,content\n'
+            'Website Redesign,Homepage QA,2026-03-14 09:00:00,"Blocked on legal copy"\n'
+            'Website Redesign,Homepage QA,2026-03-21 09:00:00,"Legal copy approved"\n'
+            'Website Redesign,Homepage QA,2026-03-21 09:00:00,"Legal copy approved"\n',
+            workspace_slug='test',
+            dedupe_content=True,
+        )
+
+        assert summary.imported == 1
+        assert summary.skipped == 2
+        assert [r.status for r in summary.results] == ['skipped', 'imported', 'skipped']
+        assert StatusUpdate.query.count() == 2
+
 
 class TestStatusUpdateImportRoute:
     def test_import_page_renders(self, client):
@@ -182,13 +307,91 @@ class TestStatusUpdateImportRoute:
         assert preview.status_code == 200
         assert b'Import Previewed File' in preview.data
         assert StatusUpdate.query.count() == 0
-        match = re.search(rb'name="preview_csv_payload" value="([^"]+)"', preview.data)
+        assert b'preview_csv_payload' not in preview.data
+        match = re.search(rb'name="preview_token" value="([^"]+)"', preview.data)
         assert match is not None
 
         commit = client.post(
             W + '/imports/status-updates',
-            data={'commit_preview': '1', 'preview_csv_payload': match.group(1).decode('ascii')},
+            data={'commit_preview': '1', 'preview_token': match.group(1).decode('ascii')},
         )
 
         assert commit.status_code == 200
         assert StatusUpdate.query.count() == 1
+
+        replay = client.post(
+            W + '/imports/status-updates',
+            data={'commit_preview': '1', 'preview_token': match.group(1).decode('ascii')},
+        )
+
+        assert b'The preview has expired' in replay.data
+        assert StatusUpdate.query.count() == 1
+
+    def test_unknown_preview_token_reports_error(self, client, db):
+        r = client.post(
+            W + '/imports/status-updates',
+            data={'commit_preview': '1', 'preview_token': 'not-a-token'},
+        )
+
+        assert r.status_code == 200
+        assert b'The preview has expired' in r.data
+
+
+class TestBatchJobCollection:
+    def test_directory_layout(self, tmp_path):
+        (tmp_path / 'engineering').mkdir()
+        (tmp_path / 'marketing').mkdir()
+        (tmp_path / 'engineering' / 'b.csv').write_text('', encoding='utf-8')
+        (tmp_path / 'engineering' / 'a.csv').write_text('', encoding='utf-8')
+        (tmp_path / 'marketing' / 'weekly.csv').write_text('', encoding='utf-8')
+        (tmp_path / 'stray.csv').write_text('', encoding='utf-8')
+
+        jobs = collect_batch_jobs(tmp_path)
+
+        assert [(j.workspace_slug, j.csv_path.name) for j in jobs] == [
+            ('engineering', 'a.csv'),
+            ('engineering', 'b.csv'),
+            ('marketing', 'weekly.csv'),
+        ]
+
+    def test_manifest_paths_are_relative_to_manifest(self, tmp_path):
+        manifest = tmp_path / 'manifest.csv'
+        manifest.write_text(
+            'workspace_slug,csv_path\n'
+            'engineering,feeds/eng.csv\n',
+            encoding='utf-8',
+        )
+
+        jobs = collect_batch_jobs(manifest)
+
+        assert len(jobs) == 1
+        assert jobs[0].workspace_slug == 'engineering'
+        assert jobs[0].csv_path == tmp_path / 'feeds' / 'eng.csv'
+
+    def test_manifest_missing_columns_fails(self, tmp_path):
+        manifest = tmp_path / 'manifest.csv'
+        manifest.write_text('workspace,path\nengineering,eng.csv\n', encoding='utf-8')
+
+        with pytest.raises(ValueError, match='missing required columns'):
+            collect_batch_jobs(manifest)
+
+
+class TestBatchJobErrors:
+    def test_unexpected_error_fails_only_that_file(self, app, db, tmp_path, monkeypatch):
+        import import_status_updates
+
+        def fake_import(text, workspace_slug, dry_run, dedupe_content):
+            if text == 'boom':
+                raise RuntimeError('disk I/O error')
+            return import_status_updates_from_text(text, workspace_slug=workspace_slug, dry_run=dry_run)
+
+        monkeypatch.setattr(import_status_updates, '_worker_app', app)
+        monkeypatch.setattr(import_status_updates, 'import_status_updates_from_text', fake_import)
+        (tmp_path / 'bad.csv').write_text('boom', encoding='utf-8')
+        (tmp_path / 'good.csv').write_text('project_name,task_title,content\n', encoding='utf-8')
+
+        bad, good = (import_status_updates._run_job(BatchJob('test', tmp_path / name), True, False)
+                     for name in ('bad.csv', 'good.csv'))
+
+        assert (bad.error, bad.exit_code) == ('RuntimeError: disk I/O error', 1)
+        assert good.error is None and good.exit_code == 0
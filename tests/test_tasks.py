@@ -1,7 +1,7 @@
 """Tests for task CRUD routes, filtering, milestones, and status updates."""
 import json
 from datetime import date, datetime, timedelta
-from models import Task, Milestone, StatusUpdate
+from models import Task, Milestone, StatusUpdate, Tag, TaskAssignment, TaskDependency
 from tests.conftest import make_project, make_task, make_milestone, make_person, W
 
 
@@ -142,6 +142,83 @@ class TestEditTask:
         assert t.status == 'in_progress'
         assert t.priority == 'critical'
 
+    def test_tags_are_upserted_and_diffed(self, client, db):
+        p = make_project()
+        db.session.add(Tag(name='backend', workspace_id=p.workspace_id))
+        db.session.commit()
+        form = {
+            'title': 'Tagged',
+            'project_id': str(p.id),
+            'start_date': '2025-01-01',
+            'end_date': '2025-01-31',
+        }
+        client.post(W + '/tasks/new', data={**form, 'tags': 'backend, api, api,'})
+        t = Task.query.filter_by(title='Tagged').one()
+        assert sorted(tag.name for tag in t.tags) == ['api', 'backend']
+        assert Tag.query.count() == 2
+
+        client.post(f'{W}/tasks/{t.id}/edit', data={**form, 'tags': 'api, urgent'})
+        db.session.expire_all()
+        assert sorted(tag.name for tag in t.tags) == ['api', 'urgent']
+        assert sorted(tag.name for tag in Tag.query) == ['api', 'backend', 'urgent']
+
+    def test_child_rows_are_synced_in_place(self, client, db):
+        p = make_project()
+        ann, bob, cal = make_person('Ann'), make_person('Bob'), make_person('Cal')
+        a, b = make_task(p, 'Design'), make_task(p, 'Review')
+        t = make_task(p, 'Build')
+        db.session.add_all([TaskAssignment(task_id=t.id, person_id=ann.id, is_lead=True),
+                            TaskAssignment(task_id=t.id, person_id=bob.id),
+                            TaskDependency(task_id=t.id, depends_on_id=a.id)])
+        kickoff = make_milestone(t, 'Kickoff', date(2025, 1, 10), status_override='on_hold')
+        beta = make_milestone(t, 'Beta', date(2025, 2, 10))
+        db.session.commit()
+        ann_row = TaskAssignment.query.filter_by(task_id=t.id, person_id=ann.id).one().id
+        dep_row = TaskDependency.query.filter_by(task_id=t.id).one().id
+        kickoff_id, beta_id = kickoff.id, beta.id
+
+        r = client.post(f'{W}/tasks/{t.id}/edit', data={
+            'title': 'Build', 'project_id': str(p.id),
+            'start_date': '2025-01-01', 'end_date': '2025-03-01',
+            'lead_id': str(bob.id), 'member_ids': [str(ann.id), str(cal.id)],
+            'dependencies': [str(a.id), str(b.id)],
+            'milestone_ids': [str(kickoff_id), ''],
+            'milestone_names': ['Kickoff', 'Launch'],
+            'milestone_dates': ['2025-01-12', '2025-03-01'],
+        })
+        assert r.status_code == 302
+        db.session.expire_all()
+
+        rows = {a.person_id: a for a in TaskAssignment.query.filter_by(task_id=t.id)}
+        assert {pid: row.is_lead for pid, row in rows.items()} == {ann.id: False, bob.id: True, cal.id: False}
+        assert rows[ann.id].id == ann_row
+        assert TaskDependency.query.filter_by(task_id=t.id, depends_on_id=a.id).one().id == dep_row
+        assert TaskDependency.query.filter_by(task_id=t.id).count() == 2
+
+        kept = db.session.get(Milestone, kickoff_id)
+        assert (kept.date, kept.status_override) == (date(2025, 1, 12), 'on_hold')
+        assert db.session.get(Milestone, beta_id) is None
+        assert [ms.name for ms in t.milestones] == ['Kickoff', 'Launch']
+
+    def test_dependency_cycle_is_rejected(self, client, db):
+        p = make_project()
+        a = make_task(p, 'Design')
+        b = make_task(p, 'Build')
+        db.session.add(TaskDependency(task_id=b.id, depends_on_id=a.id))
+        db.session.commit()
+        r = client.post(f'{W}/tasks/{a.id}/edit', data={
+            'title': 'Renamed',
+            'project_id': str(p.id),
+            'start_date': '2025-01-01',
+            'end_date': '2025-06-30',
+            'dependencies': [str(b.id)],
+        })
+        assert r.status_code == 400
+        assert 'Design → Build → Design' in r.get_data(as_text=True)
+        db.session.refresh(a)
+        assert a.title == 'Design'
+        assert TaskDependency.query.filter_by(task_id=a.id).count() == 0
+
 
 class TestDeleteTask:
     def test_get_shows_confirmation(self, client, db):
@@ -158,7 +235,7 @@ class TestDeleteTask:
         tid = t.id
         r = client.post(f'{W}/tasks/{tid}/delete', follow_redirects=True)
         assert r.status_code == 200
-        assert Task.query.get(tid) is None
+        assert Task.query.filter_by(id=tid).first() is None
 
     def test_post_redirects_to_project(self, client, db):
         p = make_project()
@@ -191,6 +268,162 @@ class TestQuickUpdate:
         assert t.start_date == date(2025, 3, 1)
         assert t.end_date == date(2025, 9, 1)
 
+    def test_push_dependents_shifts_downstream_chain(self, client, db):
+        p = make_project()
+        a = make_task(p, 'A', start=date(2025, 1, 1), end=date(2025, 1, 10))
+        b = make_task(p, 'B', start=date(2025, 1, 10), end=date(2025, 1, 15))
+        c = make_task(p, 'C', start=date(2025, 1, 20), end=date(2025, 1, 25))
+        d = make_task(p, 'D', start=date(2025, 1, 12), end=date(2025, 1, 14))
+        db.session.add_all([TaskDependency(task_id=b.id, depends_on_id=a.id),
+                            TaskDependency(task_id=c.id, depends_on_id=b.id),
+                            TaskDependency(task_id=c.id, depends_on_id=d.id)])
+        db.session.commit()
+
+        r = client.post(f'{W}/tasks/{a.id}/quick-update',
+                        data=json.dumps({'end_date': '2025-01-20', 'push_dependents': True}),
+                        content_type='application/json')
+        shifted = {bar['id']: (bar['start'], bar['end']) for bar in r.get_json()['shifted']}
+        assert shifted == {
+            f'task-{b.id}': ('2025-01-20', '2025-01-25'),
+            f'task-{c.id}': ('2025-01-25', '2025-01-30'),
+        }
+        db.session.refresh(c)
+        db.session.refresh(d)
+        assert c.start_date == date(2025, 1, 25)
+        assert d.start_date == date(2025, 1, 12)
+
+    def test_dependents_stay_put_without_push(self, client, db):
+        p = make_project()
+        a = make_task(p, 'A', start=date(2025, 1, 1), end=date(2025, 1, 10))
+        b = make_task(p, 'B', start=date(2025, 1, 10), end=date(2025, 1, 15))
+        db.session.add(TaskDependency(task_id=b.id, depends_on_id=a.id))
+        db.session.commit()
+        r = client.post(f'{W}/tasks/{a.id}/quick-update',
+                        data=json.dumps({'end_date': '2025-01-20'}),
+                        content_type='application/json')
+        assert r.get_json()['shifted'] == []
+        db.session.refresh(b)
+        assert b.start_date == date(2025, 1, 10)
+
+
+class TestBatchUpdate:
+    def post(self, client, payload):
+        return client.post(f'{W}/tasks/batch-update', data=json.dumps(payload),
+                           content_type='application/json')
+
+    def test_applies_changes_and_pushes_dependents(self, client, db):
+        p = make_project()
+        a = make_task(p, 'A', start=date(2025, 1, 1), end=date(2025, 1, 10))
+        b = make_task(p, 'B', start=date(2025, 1, 10), end=date(2025, 1, 15))
+        c = make_task(p, 'C', status='todo')
+        ms = make_milestone(c, 'Due', date(2020, 1, 1))
+        db.session.add(TaskDependency(task_id=b.id, depends_on_id=a.id))
+        db.session.commit()
+        assert ms.status == 'delayed'
+
+        r = self.post(client, {'push_dependents': True, 'changes': [
+            {'id': f'task-{a.id}', 'start_date': '2025-01-02', 'end_date': '2025-01-11'},
+            {'id': f'task-{a.id}', 'end_date': '2025-01-12'},
+            {'id': c.id, 'status': 'done'},
+        ]})
+        data = r.get_json()
+        assert data['updated'] == 2
+        assert data['shifted'] == [{'id': f'task-{b.id}', 'start': '2025-01-12', 'end': '2025-01-17'}]
+        db.session.expire_all()
+        assert (a.start_date, a.end_date) == (date(2025, 1, 2), date(2025, 1, 12))
+        assert c.status == 'done'
+        assert c.start_date == date(2025, 1, 1)
+        assert ms.status == 'on_track'
+
+    def test_unknown_task_rejects_whole_batch(self, client, db):
+        p = make_project()
+        t = make_task(p, status='todo')
+        r = self.post(client, {'changes': [{'id': t.id, 'status': 'done'}, {'id': 99999, 'status': 'done'}]})
+        assert r.status_code == 404
+        assert r.get_json()['task_ids'] == ['task-99999']
+        db.session.refresh(t)
+        assert t.status == 'todo'
+
+    def test_bad_date_is_rejected(self, client, db):
+        r = self.post(client, {'changes': [{'id': 1, 'start_date': 'soon'}]})
+        assert r.status_code == 400
+
+
+class TestBulkUpdate:
+    def post(self, client, payload):
+        return client.post(f'{W}/tasks/bulk', data=json.dumps(payload), content_type='application/json')
+
+    def test_status_priority_and_tags_for_explicit_ids(self, client, db):
+        p = make_project()
+        a, b, c = make_task(p, 'A'), make_task(p, 'B', status='done'), make_task(p, 'C')
+        db.session.add(Tag(name='old', workspace_id=p.workspace_id))
+        db.session.commit()
+        client.post(f'{W}/tasks/{a.id}/edit', data={
+            'title': 'A', 'project_id': str(p.id), 'start_date': '2025-01-01',
+            'end_date': '2025-06-01', 'tags': 'old, keep'})
+
+        r = self.post(client, {'task_ids': [a.id, b.id], 'status': 'done', 'priority': 'high',
+                               'add_tags': ['sprint-9', 'keep'], 'remove_tags': 'old'})
+        data = r.get_json()
+        assert data['ok'] is True
+        assert (data['tasks'], data['updated'], data['tags_added'], data['tags_removed']) == (2, 2, 3, 1)
+        db.session.expire_all()
+        assert (a.status, a.priority, b.priority, c.priority) == ('done', 'high', 'high', 'medium')
+        assert sorted(t.name for t in a.tags) == ['keep', 'sprint-9']
+        assert sorted(t.name for t in b.tags) == ['keep', 'sprint-9']
+        assert c.tags == []
+
+    def test_reassign_by_filter(self, client, db):
+        p = make_project()
+        ann, bob = make_person('Ann'), make_person('Bob')
+        todo, done = make_task(p, 'Todo', status='todo'), make_task(p, 'Done', status='done')
+        db.session.add_all([TaskAssignment(task_id=todo.id, person_id=ann.id, is_lead=True),
+                            TaskAssignment(task_id=todo.id, person_id=bob.id),
+                            TaskAssignment(task_id=done.id, person_id=ann.id, is_lead=True)])
+        db.session.commit()
+        bob_row = TaskAssignment.query.filter_by(task_id=todo.id, person_id=bob.id).one().id
+
+        r = self.post(client, {'filter': {'status': 'todo'}, 'assignees': {'lead_id': bob.id}})
+        data = r.get_json()
+        assert (data['tasks'], data['assignments_inserted'], data['assignments_deleted']) == (1, 0, 1)
+        rows = TaskAssignment.query.filter_by(task_id=todo.id).all()
+        assert [(row.id, row.person_id, row.is_lead) for row in rows] == [(bob_row, bob.id, True)]
+        assert TaskAssignment.query.filter_by(task_id=done.id, person_id=ann.id).count() == 1
+
+    def test_reassign_keeps_assignments_of_deleted_people(self, client, db):
+        from deletion import restore, soft_delete
+        p = make_project()
+        ann, bob = make_person('Ann'), make_person('Bob')
+        t = make_task(p)
+        db.session.add(TaskAssignment(task_id=t.id, person_id=ann.id, is_lead=True))
+        db.session.commit()
+        soft_delete(ann)
+        db.session.commit()
+
+        r = self.post(client, {'task_ids': [t.id], 'assignees': {'lead_id': bob.id}})
+        assert (r.get_json()['assignments_inserted'], r.get_json()['assignments_deleted']) == (1, 0)
+        restore(ann)
+        db.session.commit()
+        assert sorted(row.person_id for row in TaskAssignment.query.filter_by(task_id=t.id)) == [ann.id, bob.id]
+
+    def test_invalid_operation_writes_nothing(self, client, db):
+        p = make_project()
+        t = make_task(p, status='todo')
+        r = self.post(client, {'task_ids': [t.id], 'status': 'done', 'assignees': {'lead_id': 99999}})
+        assert r.status_code == 400
+        db.session.refresh(t)
+        assert t.status == 'todo'
+        assert self.post(client, {'task_ids': [t.id]}).status_code == 400
+
+    def test_missing_ids_and_filter_is_rejected(self, client, db):
+        p = make_project()
+        t = make_task(p, status='todo')
+        for payload in ({'status': 'done'}, {'filter': {}, 'status': 'done'},
+                        {'filter': {'status': '', 'overdue': False}, 'status': 'done'}):
+            assert self.post(client, payload).status_code == 400
+        db.session.refresh(t)
+        assert t.status == 'todo'
+
 
 class TestStatusUpdates:
     def test_add_status_update(self, client, db):
@@ -1,7 +1,12 @@
+from datetime import date
 from pathlib import Path
 
-from models import Person, Project, Task, Team, Workspace
-from workspace_import import load_people_csv, load_plan_csv
+from sqlalchemy import select
+
+from deletion import soft_delete
+from models import Milestone, Person, Project, StatusUpdate, Task, TaskDependency, Team, Workspace
+from workspace_import import (load_people_csv, load_plan_csv, new_sync_changes, sync_people_csv,
+                              sync_plan_csv)
 
 
 class TestWorkspaceImportValidation:
@@ -54,6 +59,32 @@ class TestWorkspaceImportValidation:
             assert Project.query.filter_by(workspace_id=ws.id).count() == 0
             assert Task.query.filter_by(workspace_id=ws.id).count() == 0
 
+    def test_dependency_cycle_fails(self, app, db, tmp_path):
+        csv_path = tmp_path / 'plan.csv'
+        csv_path.write_text(
+            'type,name,description,start_date,end_date,status,priority,assignees,tags,depends_on\n'
+            'project,Project One,,2025-01-01,2025-02-01,active,,,,\n'
+            'task,Design,,2025-01-01,2025-01-10,todo,medium,,,Review\n'
+            'task,Build,,2025-01-10,2025-01-20,todo,medium,,,Design\n'
+            'task,Review,,2025-01-20,2025-01-25,todo,medium,,,Build\n',
+            encoding='utf-8',
+        )
+
+        with app.app_context():
+            ws = Workspace(name='Import Test', slug='import-test')
+            db.session.add(ws)
+            db.session.flush()
+
+            try:
+                load_plan_csv(csv_path, ws.id, {})
+                assert False, 'expected SystemExit'
+            except SystemExit as exc:
+                assert 'form a cycle' in str(exc)
+                assert "'Build'" in str(exc)
+                db.session.rollback()
+
+            assert Task.query.filter_by(workspace_id=ws.id).count() == 0
+
     def test_duplicate_person_name_fails(self, app, db, tmp_path):
         csv_path = tmp_path / 'people.csv'
         csv_path.write_text(
@@ -76,3 +107,226 @@ class TestWorkspaceImportValidation:
                 db.session.rollback()
 
             assert Person.query.filter_by(workspace_id=ws.id).count() == 0
+
+
+class TestWorkspaceImportLoad:
+    def test_plan_creates_rows_and_warns_on_unknown_names(self, app, db, tmp_path, capsys):
+        people_path = tmp_path / 'people.csv'
+        people_path.write_text(
+            'type,name,email,teams\n'
+            'team,Design,,\n'
+            'person,Alice Smith,alice@example.com,"Design,Ghost Team"\n'
+            'person,Bob Jones,bob@example.com,\n',
+            encoding='utf-8',
+        )
+        plan_path = tmp_path / 'plan.csv'
+        plan_path.write_text(
+            'type,name,description,start_date,end_date,status,priority,assignees,tags,depends_on\n'
+            'project,Website,,2025-01-01,2025-03-01,active,,,,\n'
+            'task,Wireframes,,2025-01-01,2025-01-10,done,high,*Alice Smith,"design,ux",\n'
+            'task,Build,,2025-01-10,2025-02-10,todo,bogus,"*Bob Jones,Alice Smith,Carol",dev,"Wireframes,Missing"\n',
+            encoding='utf-8',
+        )
+
+        with app.app_context():
+            ws = Workspace(name='Import Test', slug='import-test')
+            db.session.add(ws)
+            db.session.flush()
+
+            team_by_name, person_by_name = load_people_csv(people_path, ws.id)
+            project_ids, tag_ids, task_ids = load_plan_csv(plan_path, ws.id, person_by_name)
+            db.session.commit()
+
+            assert [p.name for p in team_by_name['Design'].members] == ['Alice Smith']
+            assert set(tag_ids) == {'design', 'ux', 'dev'}
+            build = db.session.get(Task, task_ids['Build'])
+            assert build.project_id == project_ids['Website']
+            assert build.priority == 'medium'
+            assert build.lead.name == 'Bob Jones'
+            assert sorted(p.name for p in build.assignees) == ['Alice Smith', 'Bob Jones']
+            assert [t.name for t in build.tags] == ['dev']
+            assert [d.title for d in build.dependencies] == ['Wireframes']
+
+        out = capsys.readouterr().out
+        assert "unknown team 'Ghost Team' for person 'Alice Smith' (people.csv row 3)" in out
+        assert "unknown person 'Carol' in assignees (plan.csv row 4)" in out
+        assert "unknown task 'Missing' in depends_on (plan.csv row 4)" in out
+
+
+class TestWorkspaceSync:
+    PLAN_HEADER = 'type,name,description,start_date,end_date,status,priority,assignees,tags,depends_on\n'
+
+    def _load(self, db, tmp_path, people, plan):
+        (tmp_path / 'people.csv').write_text(people, encoding='utf-8')
+        (tmp_path / 'plan.csv').write_text(self.PLAN_HEADER + plan, encoding='utf-8')
+        ws = Workspace(name='Sync Test', slug='sync-test')
+        db.session.add(ws)
+        db.session.flush()
+        _, person_by_name = load_people_csv(tmp_path / 'people.csv', ws.id)
+        load_plan_csv(tmp_path / 'plan.csv', ws.id, person_by_name)
+        db.session.commit()
+        return ws
+
+    def _sync(self, db, tmp_path, ws, people, plan):
+        (tmp_path / 'people.csv').write_text(people, encoding='utf-8')
+        (tmp_path / 'plan.csv').write_text(self.PLAN_HEADER + plan, encoding='utf-8')
+        changes = new_sync_changes()
+        _, person_by_name = sync_people_csv(tmp_path / 'people.csv', ws.id, changes)
+        sync_plan_csv(tmp_path / 'plan.csv', ws.id, person_by_name, changes)
+        db.session.commit()
+        db.session.expire_all()
+        return changes
+
+    def test_sync_applies_only_differences(self, app, db, tmp_path):
+        people = (
+            'type,name,email,teams\n'
+            'team,Design,,\n'
+            'person,Alice Smith,alice@example.com,Design\n'
+            'person,Bob Jones,bob@example.com,\n'
+        )
+        plan = (
+            'project,Website,,2025-01-01,2025-03-01,active,,,,\n'
+            'task,Wireframes,,2025-01-01,2025-01-10,done,high,*Alice Smith,design,\n'
+            'task,Build,,2025-01-10,2025-02-10,todo,medium,*Bob Jones,dev,Wireframes\n'
+            'task,Retired,,2025-01-10,2025-02-10,todo,medium,,,\n'
+        )
+        with app.app_context():
+            ws = self._load(db, tmp_path, people, plan)
+            wireframes = Task.query.filter_by(workspace_id=ws.id, title='Wireframes').one()
+            wireframes_id = wireframes.id
+            db.session.add(StatusUpdate(task_id=wireframes_id, content='Signed off'))
+            db.session.commit()
+
+            assert not any(any(c.values()) for c in self._sync(db, tmp_path, ws, people, plan).values())
+
+            changes = self._sync(
+                db, tmp_path, ws,
+                people.replace('bob@example.com', 'bob@new.example.com') + 'person,Cara Diaz,,Design\n',
+                'project,Website,,2025-01-01,2025-04-01,active,,,,\n'
+                'task,Wireframes,,2025-01-01,2025-01-10,done,high,*Alice Smith,design,\n'
+                'task,Build,,2025-01-10,2025-03-10,in_progress,medium,"Bob Jones,*Cara Diaz",dev,Wireframes\n',
+            )
+
+            assert changes['projects'] == {'inserted': 0, 'updated': 1, 'deleted': 0}
+            assert changes['tasks'] == {'inserted': 0, 'updated': 1, 'deleted': 1}
+            assert changes['people'] == {'inserted': 1, 'updated': 1, 'deleted': 0}
+            assert changes['assignments'] == {'inserted': 1, 'updated': 1, 'deleted': 0}
+            assert changes['dependencies'] == {'inserted': 0, 'updated': 0, 'deleted': 0}
+
+            wireframes = db.session.get(Task, wireframes_id)
+            assert [u.content for u in wireframes.status_updates] == ['Signed off']
+            build = Task.query.filter_by(workspace_id=ws.id, title='Build').one()
+            assert build.status == 'in_progress'
+            assert build.lead.name == 'Cara Diaz'
+            assert Task.query.filter_by(workspace_id=ws.id, title='Retired').first() is None
+            assert TaskDependency.query.count() == 1
+            assert sorted(p.name for p in Team.query.filter_by(workspace_id=ws.id).one().members) == [
+                'Alice Smith', 'Cara Diaz',
+            ]
+
+    def test_sync_removes_people_projects_and_their_links(self, app, db, tmp_path):
+        people = (
+            'type,name,email,teams\n'
+            'team,Design,,\n'
+            'person,Alice Smith,,Design\n'
+            'person,Bob Jones,,Design\n'
+        )
+        plan = (
+            'project,Website,,,,active,,,,\n'
+            'task,Wireframes,,2025-01-01,2025-01-10,todo,high,"*Alice Smith,Bob Jones",,\n'
+            'project,Legacy,,,,active,,,,\n'
+            'task,Old Work,,2025-01-01,2025-01-10,todo,high,,,Wireframes\n'
+        )
+        with app.app_context():
+            ws = self._load(db, tmp_path, people, plan)
+
+            changes = self._sync(
+                db, tmp_path, ws,
+                'type,name,email,teams\nperson,Alice Smith,,\n',
+                'project,Website,,,,active,,,,\n'
+                'task,Wireframes,,2025-01-01,2025-01-10,todo,high,*Alice Smith,,\n',
+            )
+
+            assert changes['projects']['deleted'] == 1
+            assert changes['people']['deleted'] == 1
+            assert changes['teams']['deleted'] == 1
+            assert [p.name for p in Project.query.filter_by(workspace_id=ws.id)] == ['Website']
+            assert [p.name for p in Person.query.filter_by(workspace_id=ws.id)] == ['Alice Smith']
+            wireframes = Task.query.filter_by(workspace_id=ws.id).one()
+            assert [p.name for p in wireframes.assignees] == ['Alice Smith']
+            assert TaskDependency.query.count() == 0
+
+    def test_sync_refreshes_milestones_of_updated_rows(self, app, db, tmp_path):
+        people = 'type,name,email,teams\n'
+        plan = (
+            'project,Website,,,,active,,,,\n'
+            'task,Wireframes,,2025-01-01,2025-01-10,todo,high,,,\n'
+            'project,Mobile,,,,active,,,,\n'
+            'task,Prototype,,2025-01-01,2025-01-10,todo,high,,,\n'
+        )
+        with app.app_context():
+            ws = self._load(db, tmp_path, people, plan)
+            for title in ('Wireframes', 'Prototype'):
+                task = Task.query.filter_by(workspace_id=ws.id, title=title).one()
+                db.session.add(Milestone(task_id=task.id, name=f'{title} review', date=date(2025, 1, 5)))
+            db.session.commit()
+            assert {m.status for m in Milestone.query} == {'delayed'}
+
+            self._sync(db, tmp_path, ws, people, plan.replace(
+                'Wireframes,,2025-01-01,2025-01-10,todo', 'Wireframes,,2025-01-01,2025-01-10,done'
+            ).replace('Mobile,,,,active', 'Mobile,,,,on_hold'))
+
+            assert {m.name: m.status for m in Milestone.query} == {
+                'Wireframes review': 'on_track', 'Prototype review': 'on_hold',
+            }
+
+    def test_sync_treats_soft_deleted_rows_as_absent(self, app, db, tmp_path):
+        people = 'type,name,email,teams\n'
+        plan = (
+            'project,Website,,,,active,,,,\n'
+            'task,Wireframes,,2025-01-01,2025-01-10,todo,high,,,\n'
+            'task,Build,,2025-01-10,2025-02-10,todo,medium,,,Wireframes\n'
+        )
+        with app.app_context():
+            ws = self._load(db, tmp_path, people, plan)
+            build = Task.query.filter_by(workspace_id=ws.id, title='Build').one()
+            build_id = build.id
+            soft_delete(build)
+            db.session.commit()
+
+            changes = self._sync(db, tmp_path, ws, people, plan)
+
+            assert changes['tasks'] == {'inserted': 1, 'updated': 0, 'deleted': 0}
+            live = Task.query.filter_by(workspace_id=ws.id, title='Build').one()
+            assert live.id != build_id
+            assert db.session.get(Task, build_id).deleted_at is not None
+            # The trashed task keeps its edge for an undo; the new one gets its own.
+            dep = TaskDependency.__table__
+            assert sorted(db.session.execute(select(dep.c.task_id)).scalars()) == [build_id, live.id]
+
+            # A second sync matches the live row only.
+            assert not any(any(c.values()) for c in self._sync(db, tmp_path, ws, people, plan).values())
+
+    def test_sync_removes_soft_deleted_tasks_of_stale_projects(self, app, db, tmp_path):
+        people = 'type,name,email,teams\n'
+        plan = (
+            'project,Website,,,,active,,,,\n'
+            'task,Wireframes,,2025-01-01,2025-01-10,todo,high,,,\n'
+            'project,Legacy,,,,active,,,,\n'
+            'task,Old Work,,2025-01-01,2025-01-10,todo,high,,,\n'
+        )
+        with app.app_context():
+            ws = self._load(db, tmp_path, people, plan)
+            old_work = Task.query.filter_by(workspace_id=ws.id, title='Old Work').one()
+            old_work_id = old_work.id
+            soft_delete(old_work)
+            db.session.commit()
+
+            changes = self._sync(db, tmp_path, ws, people, plan.split('project,Legacy')[0])
+
+            assert changes['projects']['deleted'] == 1
+            tt = Task.__table__
+            assert list(db.session.execute(select(tt.c.title).where(tt.c.workspace_id == ws.id)).scalars()) == [
+                'Wireframes',
+            ]
+            assert app.test_client().post(f'/w/{ws.slug}/tasks/{old_work_id}/restore').status_code == 404
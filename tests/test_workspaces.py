@@ -0,0 +1,117 @@
+"""Tests for workspace routes and background workspace deletion."""
+from datetime import date, datetime
+
+from models import (Milestone, Person, Project, StatusUpdate, Tag, Task, TaskAssignment, TaskDependency,
+                    Team, Workspace, person_teams, task_tags)
+from deletion import delete_workspace_data
+from tests.conftest import make_milestone, make_person, make_project, make_task, make_team
+
+
+def _populate(db):
+    team = make_team('Core')
+    ann = make_person('Ann', team=team)
+    proj = make_project()
+    a, b = make_task(proj, 'A'), make_task(proj, 'B')
+    tag = Tag(name='x', workspace_id=proj.workspace_id)
+    db.session.add(tag)
+    db.session.flush()
+    db.session.execute(task_tags.insert(), [{'task_id': a.id, 'tag_id': tag.id}])
+    db.session.add_all([TaskAssignment(task_id=a.id, person_id=ann.id, is_lead=True),
+                        TaskDependency(task_id=b.id, depends_on_id=a.id)])
+    update = StatusUpdate(task_id=a.id, content='@"Ann" done')
+    update.mentions.append(ann)
+    db.session.add(update)
+    make_milestone(a)
+
+
+def _other_workspace(db):
+    other = Workspace(name='Other', slug='other')
+    db.session.add(other)
+    db.session.flush()
+    proj = Project(name='Kept', workspace_id=other.id)
+    db.session.add(proj)
+    db.session.flush()
+    db.session.add(Task(title='Kept', project_id=proj.id, workspace_id=other.id,
+                        start_date=date(2025, 1, 1), end_date=date(2025, 1, 2)))
+    db.session.commit()
+    return other
+
+
+class TestDeleteWorkspace:
+    def test_delete_removes_every_row_in_batches(self, app, client, db):
+        _populate(db)
+        other = _other_workspace(db)
+        app.config['DELETE_WORKSPACES_IN_BACKGROUND'] = False
+        try:
+            r = client.post('/workspaces/test/delete')
+        finally:
+            app.config.pop('DELETE_WORKSPACES_IN_BACKGROUND')
+        assert r.status_code == 302
+
+        for model in (Task, Project, Person, Team, Tag, StatusUpdate, Milestone, TaskAssignment, TaskDependency):
+            assert model.query.filter(model.id.isnot(None)).count() == (1 if model in (Task, Project) else 0)
+        assert db.session.execute(person_teams.select()).first() is None
+        assert db.session.execute(task_tags.select()).first() is None
+        assert [w.slug for w in Workspace.query] == ['other']
+        assert Task.query.one().workspace_id == other.id
+
+        data = client.get('/workspaces/1/deletion').get_json()
+        assert (data['state'], data['percent']) == ('done', 100)
+
+    def test_deleting_workspace_is_hidden_and_frees_slug(self, client, db):
+        ws = Workspace.query.filter_by(slug='test').one()
+        ws.deleting_at = datetime(2025, 1, 1)
+        ws.slug = f'~deleting-{ws.id}'
+        db.session.commit()
+
+        assert client.get(f'/w/~deleting-{ws.id}/projects').status_code == 404
+        assert client.get(f'/workspaces/{ws.id}/deletion').get_json()['state'] == 'stalled'
+        assert b'Being deleted' in client.get('/').data
+
+    def test_small_batches_and_progress(self, db):
+        _populate(db)
+        ws_id = Workspace.query.filter_by(slug='test').one().id
+        deleted = delete_workspace_data(ws_id, batch_size=1, pause=0)
+        # 2 tasks, 1 project, 1 person, 1 team, 1 tag, 1 update, 1 milestone,
+        # 1 task tag, 1 assignment, 1 dependency and the workspace itself
+        assert deleted == 12
+        assert Workspace.query.count() == 0
+
+
+class TestCloneWorkspace:
+    def test_clone_copies_rows_with_new_ids_and_shifted_dates(self, client, db):
+        _populate(db)
+        gone = make_person('Gone')
+        gone.deleted_at = datetime(2025, 1, 1)
+        db.session.commit()
+
+        r = client.post('/workspaces/test/clone', data={'name': 'Copy', 'slug': 'copy', 'days': '7'})
+        assert r.status_code == 302
+        assert r.headers['Location'].endswith('/w/copy/')
+
+        db.session.expire_all()
+        copy = Workspace.query.filter_by(slug='copy').one()
+        source_id = Workspace.query.filter_by(slug='test').one().id
+        a = Task.query.filter_by(workspace_id=copy.id, title='A').one()
+        b = Task.query.filter_by(workspace_id=copy.id, title='B').one()
+        assert (a.start_date, a.project.workspace_id) == (date(2025, 1, 8), copy.id)
+        assert [(p.name, p.workspace_id, [t.name for t in p.teams]) for p in a.assignees] == [('Ann', copy.id, ['Core'])]
+        assert [(t.name, t.workspace_id) for t in a.tags] == [('x', copy.id)]
+        assert b.dependencies == [a]
+        assert [(m.name, m.date) for m in a.milestones] == [('Beta Release', date(2025, 6, 8))]
+        assert a.status_updates == []
+        assert [p.name for p in Person.query.filter_by(workspace_id=copy.id)] == ['Ann']
+        assert Task.query.filter_by(workspace_id=source_id).count() == 2
+
+    def test_taken_slug_is_rejected(self, client, db):
+        r = client.post('/workspaces/test/clone', data={'name': 'Copy', 'slug': 'test', 'days': '0'})
+        assert r.status_code == 400
+        assert b'already taken' in r.data
+        assert Workspace.query.count() == 1
+
+    def test_blank_name_or_slug_is_rejected(self, client, db):
+        for data in ({'name': '  ', 'slug': 'copy'}, {'name': 'Copy', 'slug': ' '}):
+            r = client.post('/workspaces/test/clone', data={**data, 'days': '0'})
+            assert r.status_code == 400
+            assert b'needs a name and a slug' in r.data
+        assert Workspace.query.count() == 1
@@ -0,0 +1,138 @@
+"""Daily workload per person and per team.
+
+Every assignment interval in a workspace is loaded with one query and turned
+into a day-by-day count of concurrent tasks with a difference array: +1 on
+the first day of each task, -1 on the day after it ends, then a running sum.
+That is O(assignments + people x days).
+
+Team load is the sum of its members' loads, so two members working on the
+same task count twice.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, select
+
+from models import db, Person, Task, TaskAssignment, Team, person_teams
+
+MAX_WORKLOAD_DAYS = 731
+
+
+@dataclass
+class WorkloadRow:
+    id: int
+    name: str
+    load: list[int]  # one count per day
+
+    def to_json(self) -> dict:
+        return {'id': self.id, 'name': self.name, 'load': self.load}
+
+
+@dataclass
+class Workload:
+    start: date
+    end: date
+    people: list[WorkloadRow] = field(default_factory=list)
+    teams: list[WorkloadRow] = field(default_factory=list)
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def to_json(self) -> dict:
+        return {
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'days': self.days,
+            'people': [row.to_json() for row in self.people],
+            'teams': [row.to_json() for row in self.teams],
+        }
+
+
+def _sweep(index_by_person: dict[int, int], intervals, days: int) -> list[list[int]]:
+    """Running sum of per-person difference arrays; returns people x days loads.
+
+    ``intervals`` are (person_id, first_day, day_after_last) offsets already
+    clipped to the window.
+    """
+    rows = len(index_by_person)
+    diff = [[0] * (days + 1) for _ in range(rows)]
+    for person_id, first, stop in intervals:
+        row = index_by_person.get(person_id)
+        if row is not None and first < stop:
+            diff[row][first] += 1
+            diff[row][stop] -= 1
+    return [list(accumulate(d[:days])) for d in diff]
+
+
+def _sum_rows(loads: list[list[int]], rows: list[int], days: int) -> list[int]:
+    if not rows:
+        return [0] * days
+    return [sum(day) for day in zip(*(loads[i] for i in rows))]
+
+
+def compute_workload(workspace_id: int, start: date, end: date,
+                     statuses: tuple[str, ...] | None = None) -> Workload:
+    """Daily concurrent-task counts between start and end (inclusive).
+
+    ``statuses`` limits which tasks count; None counts every assigned task.
+    Raises ValueError when the window is empty or longer than
+    MAX_WORKLOAD_DAYS.
+    """
+    days = (end - start).days + 1
+    if days < 1:
+        raise ValueError('end must not be before start')
+    if days > MAX_WORKLOAD_DAYS:
+        raise ValueError(f'window is limited to {MAX_WORKLOAD_DAYS} days')
+
+    people = db.session.execute(
+        select(Person.id, Person.name).where(Person.workspace_id == workspace_id).order_by(Person.name)
+    ).all()
+    index_by_person = {row.id: i for i, row in enumerate(people)}
+
+    # Day offsets are computed and clipped to the window in SQL, and the Core
+    # tables are queried directly, so no dates or ORM rows are built per
+    # assignment in Python.
+    at, tt = TaskAssignment.__table__, Task.__table__
+    origin = func.julianday(start.isoformat())
+    first_day = func.cast(func.max(func.julianday(tt.c.start_date) - origin, 0), db.Integer)
+    stop_day = func.cast(func.min(func.julianday(tt.c.end_date) - origin + 1, days), db.Integer)
+    query = (
+        select(at.c.person_id, first_day, stop_day)
+        .join(tt, at.c.task_id == tt.c.id)
+        .where(tt.c.workspace_id == workspace_id, tt.c.deleted_at.is_(None),
+               tt.c.start_date <= end, tt.c.end_date >= start)
+    )
+    if statuses is not None:
+        query = query.where(tt.c.status.in_(statuses))
+    loads = _sweep(index_by_person, db.session.execute(query), days)
+    workload = Workload(start=start, end=end, people=[
+        WorkloadRow(row.id, row.name, load) for row, load in zip(people, loads)
+    ])
+
+    teams = db.session.execute(
+        select(Team.id, Team.name).where(Team.workspace_id == workspace_id).order_by(Team.name)
+    ).all()
+    members: dict[int, list[int]] = {}
+    for team_id, person_id in db.session.execute(
+        select(person_teams.c.team_id, person_teams.c.person_id)
+        .join(Team, person_teams.c.team_id == Team.id)
+        .where(Team.workspace_id == workspace_id)
+    ):
+        if person_id in index_by_person:
+            members.setdefault(team_id, []).append(index_by_person[person_id])
+
+    workload.teams = [WorkloadRow(team.id, team.name, _sum_rows(loads, members.get(team.id, []), days))
+                      for team in teams]
+    return workload
+
+
+def default_window(today: date | None = None) -> tuple[date, date]:
+    """Monday of the current week through roughly six months ahead."""
+    today = today or date.today()
+    start = today - timedelta(days=today.weekday())
+    return start, start + timedelta(days=26 * 7 - 1)
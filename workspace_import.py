@@ -1,11 +1,15 @@
 """Bulk workspace import from CSV files.
 
 Usage:
-    python workspace_import.py <workspace_name> [input_dir]
+    python workspace_import.py <workspace_name> [input_dir] [--sync]
 
     input_dir defaults to ./import
     Reads: <input_dir>/plan.csv (required), <input_dir>/people.csv (optional)
     Slug auto-derived: lowercase, spaces/punctuation → hyphens (e.g. "Eng Team" → "eng-team")
+
+    --sync updates an existing workspace in place: rows are matched by name and
+    only the inserts, updates and deletes needed to match the CSVs are applied.
+    Status updates and milestones on tasks that remain in the plan are kept.
 """
 
 import sys
@@ -14,8 +18,17 @@ import re
 from pathlib import Path
 from datetime import date
 
+from sqlalchemy import bindparam, func, select
+
 from app import create_app
-from models import db, Workspace, Team, Person, Tag, Project, Task, TaskAssignment, TaskDependency
+from deletion import delete_project_data, delete_tasks
+from dependency_graph import find_cycle
+from models import (db, Workspace, Team, Person, Tag, Project, Task, TaskAssignment, TaskDependency,
+                    person_teams, status_update_mentions, task_tags,
+                    bump_roster_version, refresh_milestone_statuses)
+
+# Keep IN lists well under SQLite's bound-parameter limit.
+CHUNK_SIZE = 500
 
 
 def fail(message: str):
@@ -40,16 +53,24 @@ def parse_date(s: str, field: str, row_num: int) -> date:
         fail(f"Error: invalid date {s!r} in {field} (row {row_num})")
 
 
-def load_people_csv(path: Path, workspace_id: int) -> tuple[dict, dict]:
-    """Returns (team_by_name, person_by_name) dicts with created DB objects."""
-    team_by_name: dict[str, Team] = {}
-    person_by_name: dict[str, Person] = {}
+def _split_names(raw: str) -> list[str]:
+    return [part.strip() for part in raw.split(',') if part.strip()] if raw else []
+
 
+def _chunks(ids, size: int = CHUNK_SIZE):
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _read_people_rows(path: Path) -> tuple[list[dict], list[dict]]:
+    """Validate people.csv and return (team_rows, person_rows)."""
     with path.open(newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         rows = list(reader)
 
-    # First pass: teams
+    team_rows: list[dict] = []
+    team_names: set[str] = set()
     for i, row in enumerate(rows, start=2):
         rtype = row.get('type', '').strip().lower()
         if rtype != 'team':
@@ -57,15 +78,13 @@ def load_people_csv(path: Path, workspace_id: int) -> tuple[dict, dict]:
         name = row['name'].strip()
         if not name:
             fail(f"Error: empty team name at people.csv row {i}")
-        if name in team_by_name:
+        if name in team_names:
             fail(f"Error: duplicate team name {name!r} at people.csv row {i}")
-        team = Team(name=name, workspace_id=workspace_id)
-        db.session.add(team)
-        team_by_name[name] = team
+        team_names.add(name)
+        team_rows.append({'row': i, 'name': name})
 
-    db.session.flush()
-
-    # Second pass: people
+    person_rows: list[dict] = []
+    person_names: set[str] = set()
     for i, row in enumerate(rows, start=2):
         rtype = row.get('type', '').strip().lower()
         if rtype != 'person':
@@ -73,45 +92,72 @@ def load_people_csv(path: Path, workspace_id: int) -> tuple[dict, dict]:
         name = row['name'].strip()
         if not name:
             fail(f"Error: empty person name at people.csv row {i}")
-        if name in person_by_name:
+        if name in person_names:
             fail(f"Error: duplicate person name {name!r} at people.csv row {i}")
-        email = row.get('email', '').strip() or None
-        person = Person(name=name, email=email, workspace_id=workspace_id)
-        db.session.add(person)
-        person_by_name[name] = person
+        person_names.add(name)
+        person_rows.append({'row': i, 'name': name,
+                            'email': row.get('email', '').strip() or None,
+                            'teams': _split_names(row.get('teams', '').strip())})
 
-    db.session.flush()
+    return team_rows, person_rows
 
-    # Third pass: assign people to teams
-    for i, row in enumerate(rows, start=2):
-        rtype = row.get('type', '').strip().lower()
-        if rtype != 'person':
-            continue
-        name = row['name'].strip()
-        teams_str = row.get('teams', '').strip()
-        if not teams_str:
-            continue
-        for tname in [t.strip() for t in teams_str.split(',') if t.strip()]:
+
+def _desired_memberships(person_rows: list[dict], team_by_name: dict,
+                         person_by_name: dict) -> set[tuple[int, int]]:
+    memberships: set[tuple[int, int]] = set()
+    for pr in person_rows:
+        for tname in pr['teams']:
             if tname not in team_by_name:
-                print(f"  Warning: unknown team {tname!r} for person {name!r} (people.csv row {i}), skipping")
+                print(f"  Warning: unknown team {tname!r} for person {pr['name']!r} (people.csv row {pr['row']}), skipping")
                 continue
-            team_by_name[tname].members.append(person_by_name[name])
+            memberships.add((person_by_name[pr['name']].id, team_by_name[tname].id))
+    return memberships
+
+
+def load_people_csv(path: Path, workspace_id: int) -> tuple[dict, dict]:
+    """Returns (team_by_name, person_by_name) dicts with created DB objects."""
+    team_rows, person_rows = _read_people_rows(path)
+
+    team_by_name: dict[str, Team] = {}
+    for tr in team_rows:
+        team = Team(name=tr['name'], workspace_id=workspace_id)
+        db.session.add(team)
+        team_by_name[tr['name']] = team
+
+    person_by_name: dict[str, Person] = {}
+    for pr in person_rows:
+        person = Person(name=pr['name'], email=pr['email'], workspace_id=workspace_id)
+        db.session.add(person)
+        person_by_name[pr['name']] = person
 
     db.session.flush()
+
+    memberships = _desired_memberships(person_rows, team_by_name, person_by_name)
+    if memberships:
+        db.session.execute(person_teams.insert(), [
+            {'person_id': person_id, 'team_id': team_id} for person_id, team_id in sorted(memberships)
+        ])
     return team_by_name, person_by_name
 
 
-def load_plan_csv(path: Path, workspace_id: int, person_by_name: dict) -> tuple[dict, dict, dict]:
-    """Parse plan.csv; create projects, tags, tasks, assignments, dependencies.
+def _bulk_insert_returning_ids(model, rows: list[dict]) -> list[int]:
+    """Insert rows in batches and return their new ids in input order."""
+    if not rows:
+        return []
+    table = model.__table__
+    stmt = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+    return list(db.session.execute(stmt, rows).scalars())
 
-    Returns (project_by_name, tag_by_name, task_by_name).
-    """
+
+def _read_plan_rows(path: Path) -> tuple[list[dict], list[dict]]:
+    """Validate plan.csv structure and return (project_rows, task_rows)."""
     with path.open(newline='', encoding='utf-8') as f:
         rows = list(csv.DictReader(f))
 
-    # ── Collect raw data in a single pass ────────────────────────────────────
     project_rows: list[dict] = []
     task_rows: list[dict] = []
+    project_names: set[str] = set()
+    task_names: set[str] = set()
     current_project_name: str | None = None
 
     for i, row in enumerate(rows, start=2):
@@ -120,8 +166,9 @@ def load_plan_csv(path: Path, workspace_id: int, person_by_name: dict) -> tuple[
             name = row['name'].strip()
             if not name:
                 fail(f"Error: empty project name at plan.csv row {i}")
-            if any(pr['name'] == name for pr in project_rows):
+            if name in project_names:
                 fail(f"Error: duplicate project name {name!r} at plan.csv row {i}")
+            project_names.add(name)
             project_rows.append({'row': i, 'name': name,
                                   'description': row.get('description', '').strip(),
                                   'start_date': row.get('start_date', '').strip(),
@@ -135,8 +182,9 @@ def load_plan_csv(path: Path, workspace_id: int, person_by_name: dict) -> tuple[
             name = row['name'].strip()
             if not name:
                 fail(f"Error: empty task name at plan.csv row {i}")
-            if any(tr['name'] == name for tr in task_rows):
+            if name in task_names:
                 fail(f"Error: duplicate task name {name!r} at plan.csv row {i}; task titles must be unique within an import so dependencies are unambiguous")
+            task_names.add(name)
             start_str = row.get('start_date', '').strip()
             end_str = row.get('end_date', '').strip()
             if not start_str or not end_str:
@@ -157,113 +205,439 @@ def load_plan_csv(path: Path, workspace_id: int, person_by_name: dict) -> tuple[
         else:
             fail(f"Error: unknown type {row.get('type')!r} at plan.csv row {i}")
 
-    # ── Create projects ───────────────────────────────────────────────────────
-    project_by_name: dict[str, Project] = {}
+    return project_rows, task_rows
+
+
+def _plan_values(project_rows: list[dict], task_rows: list[dict],
+                 workspace_id: int) -> tuple[list[dict], list[dict]]:
+    """Column values for every project and task; parses all dates up front so a bad row fails fast."""
+    project_values = []
     for pr in project_rows:
         status = pr['status'] if pr['status'] in ('active', 'completed', 'on_hold') else 'active'
-        proj = Project(
-            name=pr['name'],
-            description=pr['description'] or None,
-            start_date=parse_date(pr['start_date'], 'start_date', pr['row']),
-            end_date=parse_date(pr['end_date'], 'end_date', pr['row']),
-            status=status,
-            workspace_id=workspace_id,
-        )
-        db.session.add(proj)
-        project_by_name[pr['name']] = proj
+        project_values.append({
+            'name': pr['name'],
+            'description': pr['description'] or None,
+            'start_date': parse_date(pr['start_date'], 'start_date', pr['row']),
+            'end_date': parse_date(pr['end_date'], 'end_date', pr['row']),
+            'status': status,
+            'workspace_id': workspace_id,
+        })
+
+    task_values = []
+    for tr in task_rows:
+        status = tr['status'] if tr['status'] in ('todo', 'in_progress', 'on_hold', 'done') else 'todo'
+        priority = tr['priority'] if tr['priority'] in ('low', 'medium', 'high', 'critical') else 'medium'
+        task_values.append({
+            'title': tr['name'],
+            'description': tr['description'] or None,
+            'project_id': None,
+            'workspace_id': workspace_id,
+            'start_date': parse_date(tr['start_date'], 'start_date', tr['row']),
+            'end_date': parse_date(tr['end_date'], 'end_date', tr['row']),
+            'status': status,
+            'priority': priority,
+        })
+    return project_values, task_values
+
+
+def _plan_links(task_rows: list[dict], task_ids: list[int], tag_by_name: dict,
+                person_by_name: dict, task_by_name: dict):
+    """Resolve tag, assignment and dependency links for each task row.
+
+    Returns (tag_links, assignments, dependencies) where tag_links and
+    dependencies are lists of (task_id, other_id) pairs and assignments are
+    (task_id, person_id, is_lead) triples. Unknown names print a warning.
+    """
+    tag_links: list[tuple[int, int]] = []
+    seen_tag_links: set[tuple[int, int]] = set()
+    assignments: list[tuple[int, int, bool]] = []
+    for tr, task_id in zip(task_rows, task_ids):
+        for tname in _split_names(tr['tags']):
+            link = (task_id, tag_by_name[tname])
+            if link not in seen_tag_links:
+                seen_tag_links.add(link)
+                tag_links.append(link)
+
+        for raw in _split_names(tr['assignees']):
+            is_lead = raw.startswith('*')
+            pname = raw.lstrip('*').strip()
+            if pname not in person_by_name:
+                print(f"  Warning: unknown person {pname!r} in assignees (plan.csv row {tr['row']}), skipping")
+                continue
+            assignments.append((task_id, person_by_name[pname].id, is_lead))
 
-    db.session.flush()
+    dependencies: list[tuple[int, int]] = []
+    for tr, task_id in zip(task_rows, task_ids):
+        for dname in _split_names(tr['depends_on']):
+            if dname not in task_by_name:
+                print(f"  Warning: unknown task {dname!r} in depends_on (plan.csv row {tr['row']}), skipping")
+                continue
+            dependencies.append((task_id, task_by_name[dname]))
 
-    # ── Collect and create tags ───────────────────────────────────────────────
-    all_tag_names: set[str] = set()
-    for tr in task_rows:
-        if tr['tags']:
-            for t in tr['tags'].split(','):
-                t = t.strip()
-                if t:
-                    all_tag_names.add(t)
-
-    tag_by_name: dict[str, Tag] = {}
-    for tname in sorted(all_tag_names):
-        tag = Tag(name=tname, workspace_id=workspace_id)
-        db.session.add(tag)
-        tag_by_name[tname] = tag
+    return tag_links, assignments, dependencies
 
-    db.session.flush()
+
+def _check_acyclic(dependencies: list[tuple[int, int]], task_by_name: dict) -> None:
+    cycle = find_cycle(dependencies)
+    if cycle:
+        name_by_id = {task_id: name for name, task_id in task_by_name.items()}
+        fail("Error: plan.csv dependencies form a cycle among tasks "
+             + ", ".join(repr(name_by_id.get(task_id, task_id)) for task_id in cycle))
+
+
+def load_plan_csv(path: Path, workspace_id: int, person_by_name: dict) -> tuple[dict, dict, dict]:
+    """Parse plan.csv; create projects, tags, tasks, assignments, dependencies.
+
+    Rows are validated with in-memory sets and written with one batched
+    INSERT per table, so large plans cost a handful of statements.
+
+    Returns (project_by_name, tag_by_name, task_by_name), each mapping a name
+    to the id of the created row.
+    """
+    project_rows, task_rows = _read_plan_rows(path)
+    project_values, task_values = _plan_values(project_rows, task_rows, workspace_id)
+
+    # ── Create projects ───────────────────────────────────────────────────────
+    project_by_name = dict(zip((pr['name'] for pr in project_rows),
+                               _bulk_insert_returning_ids(Project, project_values)))
+
+    # ── Collect and create tags ───────────────────────────────────────────────
+    all_tag_names = sorted({tname for tr in task_rows for tname in _split_names(tr['tags'])})
+    tag_by_name = dict(zip(all_tag_names, _bulk_insert_returning_ids(
+        Tag, [{'name': tname, 'workspace_id': workspace_id} for tname in all_tag_names]
+    )))
 
     # ── Create tasks ──────────────────────────────────────────────────────────
-    task_by_name: dict[str, Task] = {}
-    # Track (task_raw, [dep_names]) for dependency wiring later
-    task_deps_pending: list[tuple[Task, list[str], int]] = []
+    for tr, values in zip(task_rows, task_values):
+        values['project_id'] = project_by_name[tr['project']]
+    task_ids = _bulk_insert_returning_ids(Task, task_values)
+    task_by_name = dict(zip((tr['name'] for tr in task_rows), task_ids))
+
+    # ── Tags, assignments and dependencies now that all tasks exist ──────────
+    tag_links, assignments, dependencies = _plan_links(
+        task_rows, task_ids, tag_by_name, person_by_name, task_by_name
+    )
+    _check_acyclic(dependencies, task_by_name)
+    if tag_links:
+        db.session.execute(task_tags.insert(), [
+            {'task_id': task_id, 'tag_id': tag_id} for task_id, tag_id in tag_links
+        ])
+    if assignments:
+        db.session.execute(TaskAssignment.__table__.insert(), [
+            {'task_id': task_id, 'person_id': person_id, 'is_lead': is_lead}
+            for task_id, person_id, is_lead in assignments
+        ])
+    if dependencies:
+        db.session.execute(TaskDependency.__table__.insert(), [
+            {'task_id': task_id, 'depends_on_id': depends_on_id} for task_id, depends_on_id in dependencies
+        ])
 
-    for tr in task_rows:
-        proj = project_by_name[tr['project']]
-        status = tr['status'] if tr['status'] in ('todo', 'in_progress', 'on_hold', 'done') else 'todo'
-        priority = tr['priority'] if tr['priority'] in ('low', 'medium', 'high', 'critical') else 'medium'
+    return project_by_name, tag_by_name, task_by_name
+
+
+# ── Incremental sync ─────────────────────────────────────────────────────────
+# Sync reads the current workspace state with one query per table, diffs it
+# against the CSVs by name, and writes only the rows that changed.
+
+SYNC_KINDS = ('teams', 'people', 'memberships', 'projects', 'tasks', 'tags',
+              'task tags', 'assignments', 'dependencies')
+
+
+def new_sync_changes() -> dict[str, dict[str, int]]:
+    return {kind: {'inserted': 0, 'updated': 0, 'deleted': 0} for kind in SYNC_KINDS}
 
-        task = Task(
-            title=tr['name'],
-            description=tr['description'] or None,
-            project_id=proj.id,
-            workspace_id=workspace_id,
-            start_date=parse_date(tr['start_date'], 'start_date', tr['row']),
-            end_date=parse_date(tr['end_date'], 'end_date', tr['row']),
-            status=status,
-            priority=priority,
+
+def _index_by_name(rows, label: str, name_of=lambda row: row.name) -> dict:
+    by_name = {}
+    for row in rows:
+        name = name_of(row)
+        if name in by_name:
+            fail(f"Error: workspace has more than one {label} named {name!r}; cannot sync by name")
+        by_name[name] = row
+    return by_name
+
+
+def _upsert_by_name(model, name_key: str, desired: list[dict], current: dict,
+                    fields: tuple[str, ...], counts: dict) -> tuple[dict[str, int], list[int]]:
+    """Insert rows missing from ``current`` and update rows whose fields differ.
+
+    Returns a name -> id map covering every desired row, and the ids of the
+    rows that were updated.
+    """
+    table = model.__table__
+    ids: dict[str, int] = {}
+    to_insert = []
+    to_update = []
+    for values in desired:
+        existing = current.get(values[name_key])
+        if existing is None:
+            to_insert.append(values)
+            continue
+        ids[values[name_key]] = existing.id
+        if any(getattr(existing, f) != values[f] for f in fields):
+            to_update.append({'_id': existing.id, **{f: values[f] for f in fields}})
+
+    if to_update:
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('_id')).values({f: bindparam(f) for f in fields}),
+            to_update,
         )
-        db.session.add(task)
-        task_by_name[tr['name']] = task
-
-        # Tags
-        if tr['tags']:
-            for tname in [t.strip() for t in tr['tags'].split(',') if t.strip()]:
-                if tname in tag_by_name:
-                    task.tags.append(tag_by_name[tname])
-
-        # Dependencies (deferred — tasks may reference later rows by name)
-        if tr['depends_on']:
-            dep_names = [d.strip() for d in tr['depends_on'].split(',') if d.strip()]
-            task_deps_pending.append((task, dep_names, tr['row']))
-
-        # Assignments
-        if tr['assignees']:
-            for raw in [a.strip() for a in tr['assignees'].split(',') if a.strip()]:
-                is_lead = raw.startswith('*')
-                pname = raw.lstrip('*').strip()
-                if pname not in person_by_name:
-                    print(f"  Warning: unknown person {pname!r} in assignees (plan.csv row {tr['row']}), skipping")
-                    continue
-                db.session.add(TaskAssignment(
-                    task=task,
-                    person=person_by_name[pname],
-                    is_lead=is_lead,
-                ))
+    new_ids = _bulk_insert_returning_ids(model, to_insert)
+    ids.update(zip((values[name_key] for values in to_insert), new_ids))
 
-    db.session.flush()
+    counts['inserted'] += len(to_insert)
+    counts['updated'] += len(to_update)
+    return ids, [values['_id'] for values in to_update]
 
-    # ── Wire up dependencies now that all tasks exist ─────────────────────────
-    dep_count = 0
-    for task, dep_names, row_num in task_deps_pending:
-        for dname in dep_names:
-            if dname not in task_by_name:
-                print(f"  Warning: unknown task {dname!r} in depends_on (plan.csv row {row_num}), skipping")
-                continue
-            db.session.add(TaskDependency(
-                task_id=task.id,
-                depends_on_id=task_by_name[dname].id,
-            ))
-            dep_count += 1
+
+def _delete_in(table, column, ids) -> int:
+    deleted = 0
+    for chunk in _chunks(ids):
+        deleted += db.session.execute(table.delete().where(column.in_(chunk))).rowcount
+    return deleted
+
+
+def _sync_pairs(table, left, right, current: dict[tuple[int, int], int],
+                desired: set[tuple[int, int]], counts: dict) -> None:
+    """Apply the difference between current and desired two-column link rows.
+
+    ``current`` maps (left, right) pairs to a row id, or to None for tables
+    without a surrogate key.
+    """
+    stale = [pair for pair in current if pair not in desired]
+    missing = [pair for pair in desired if pair not in current]
+    if stale:
+        if 'id' in table.c:
+            _delete_in(table, table.c.id, [current[pair] for pair in stale])
+        else:
+            db.session.execute(
+                table.delete().where(left == bindparam('_left'), right == bindparam('_right')),
+                [{'_left': a, '_right': b} for a, b in stale],
+            )
+    if missing:
+        db.session.execute(table.insert(), [{left.key: a, right.key: b} for a, b in sorted(missing)])
+    counts['deleted'] += len(stale)
+    counts['inserted'] += len(missing)
+
+
+def sync_people_csv(path: Path, workspace_id: int, changes: dict) -> tuple[dict, dict]:
+    """Bring the workspace's teams, people and memberships in line with people.csv.
+
+    Returns (team_by_name, person_by_name) like load_people_csv.
+    """
+    team_rows, person_rows = _read_people_rows(path)
+
+    current_teams = _index_by_name(Team.query.filter_by(workspace_id=workspace_id).all(), 'team')
+    current_people = _index_by_name(Person.query.filter_by(workspace_id=workspace_id).all(), 'person')
+
+    team_by_name: dict[str, Team] = {}
+    for tr in team_rows:
+        team = current_teams.get(tr['name'])
+        if team is None:
+            team = Team(name=tr['name'], workspace_id=workspace_id)
+            db.session.add(team)
+            changes['teams']['inserted'] += 1
+        team_by_name[tr['name']] = team
+
+    person_by_name: dict[str, Person] = {}
+    for pr in person_rows:
+        person = current_people.get(pr['name'])
+        if person is None:
+            person = Person(name=pr['name'], email=pr['email'], workspace_id=workspace_id)
+            db.session.add(person)
+            changes['people']['inserted'] += 1
+        elif person.email != pr['email']:
+            person.email = pr['email']
+            changes['people']['updated'] += 1
+        person_by_name[pr['name']] = person
 
     db.session.flush()
+
+    stale_people = [p.id for name, p in current_people.items() if name not in person_by_name]
+    stale_teams = [t.id for name, t in current_teams.items() if name not in team_by_name]
+    if stale_people:
+        _delete_in(TaskAssignment.__table__, TaskAssignment.__table__.c.person_id, stale_people)
+        _delete_in(status_update_mentions, status_update_mentions.c.person_id, stale_people)
+        _delete_in(person_teams, person_teams.c.person_id, stale_people)
+        changes['people']['deleted'] += _delete_in(Person.__table__, Person.__table__.c.id, stale_people)
+        # Core deletes bypass the ORM flush hook that bumps the roster.
+        bump_roster_version(workspace_ids=[workspace_id])
+    if stale_teams:
+        _delete_in(person_teams, person_teams.c.team_id, stale_teams)
+        changes['teams']['deleted'] += _delete_in(Team.__table__, Team.__table__.c.id, stale_teams)
+
+    current_memberships = {
+        (row.person_id, row.team_id): None
+        for row in db.session.execute(
+            select(person_teams.c.person_id, person_teams.c.team_id)
+            .join(Person.__table__, Person.__table__.c.id == person_teams.c.person_id)
+            .where(Person.__table__.c.workspace_id == workspace_id)
+        )
+    }
+    desired_memberships = _desired_memberships(person_rows, team_by_name, person_by_name)
+    _sync_pairs(person_teams, person_teams.c.person_id, person_teams.c.team_id,
+                current_memberships, desired_memberships, changes['memberships'])
+
+    return team_by_name, person_by_name
+
+
+def sync_plan_csv(path: Path, workspace_id: int, person_by_name: dict, changes: dict) -> tuple[dict, dict, dict]:
+    """Bring the workspace's projects, tasks and their links in line with plan.csv.
+
+    Projects and tasks are matched by name. Rows no longer in the plan are
+    deleted together with their milestones and status updates; tags are only
+    ever added. Returns name -> id maps like load_plan_csv.
+
+    Soft-deleted projects and tasks count as absent, as they do for people
+    and teams: a plan row with the same name creates a new row rather than
+    reviving the deleted one, which stays in the trash with its links until
+    it is restored or purged.
+    """
+    project_rows, task_rows = _read_plan_rows(path)
+    project_values, task_values = _plan_values(project_rows, task_rows, workspace_id)
+
+    pt = Project.__table__
+    tt = Task.__table__
+    current_projects = _index_by_name(db.session.execute(
+        select(pt.c.id, pt.c.name, pt.c.description, pt.c.start_date, pt.c.end_date, pt.c.status)
+        .where(pt.c.workspace_id == workspace_id, pt.c.deleted_at.is_(None))
+    ).all(), 'project')
+    current_tasks = _index_by_name(db.session.execute(
+        select(tt.c.id, tt.c.title, tt.c.description, tt.c.project_id, tt.c.start_date,
+               tt.c.end_date, tt.c.status, tt.c.priority)
+        .where(tt.c.workspace_id == workspace_id, tt.c.deleted_at.is_(None))
+    ).all(), 'task', name_of=lambda row: row.title)
+
+    # ── Projects and tasks ───────────────────────────────────────────────────
+    project_by_name, updated_projects = _upsert_by_name(
+        Project, 'name', project_values, current_projects,
+        ('description', 'start_date', 'end_date', 'status'), changes['projects'],
+    )
+    for tr, values in zip(task_rows, task_values):
+        values['project_id'] = project_by_name[tr['project']]
+    task_by_name, updated_tasks = _upsert_by_name(
+        Task, 'title', task_values, current_tasks,
+        ('description', 'project_id', 'start_date', 'end_date', 'status', 'priority'), changes['tasks'],
+    )
+
+    stale_tasks = [row.id for name, row in current_tasks.items() if name not in task_by_name]
+    if stale_tasks:
+        delete_tasks(stale_tasks)
+        changes['tasks']['deleted'] += len(stale_tasks)
+    stale_projects = [row.id for name, row in current_projects.items() if name not in project_by_name]
+    # delete_project_data also removes the projects' soft-deleted tasks, which
+    # current_tasks leaves out and which would otherwise point at nothing.
+    for chunk in _chunks(stale_projects):
+        changes['projects']['deleted'] += delete_project_data(chunk)
+
+    # ── Tags (added, never removed; other tasks may still use them) ──────────
+    tag_table = Tag.__table__
+    tag_by_name = {row.name: row.id for row in db.session.execute(
+        select(tag_table.c.id, tag_table.c.name).where(tag_table.c.workspace_id == workspace_id)
+    )}
+    missing_tags = sorted({tname for tr in task_rows for tname in _split_names(tr['tags'])} - tag_by_name.keys())
+    tag_by_name.update(zip(missing_tags, _bulk_insert_returning_ids(
+        Tag, [{'name': tname, 'workspace_id': workspace_id} for tname in missing_tags]
+    )))
+    changes['tags']['inserted'] += len(missing_tags)
+
+    # ── Links ─────────────────────────────────────────────────────────────────
+    task_ids = [task_by_name[tr['name']] for tr in task_rows]
+    tag_links, assignments, dependencies = _plan_links(
+        task_rows, task_ids, tag_by_name, person_by_name, task_by_name
+    )
+    _check_acyclic(dependencies, task_by_name)
+
+    in_workspace = select(tt.c.id).where(tt.c.workspace_id == workspace_id, tt.c.deleted_at.is_(None))
+    current_tag_links = {
+        (row.task_id, row.tag_id): None
+        for row in db.session.execute(
+            select(task_tags.c.task_id, task_tags.c.tag_id).where(task_tags.c.task_id.in_(in_workspace))
+        )
+    }
+    _sync_pairs(task_tags, task_tags.c.task_id, task_tags.c.tag_id,
+                current_tag_links, set(tag_links), changes['task tags'])
+
+    dep = TaskDependency.__table__
+    current_deps: dict[tuple[int, int], int] = {}
+    duplicate_deps = []
+    for row in db.session.execute(
+        select(dep.c.id, dep.c.task_id, dep.c.depends_on_id)
+        .where(dep.c.task_id.in_(in_workspace), dep.c.depends_on_id.in_(in_workspace))
+    ):
+        pair = (row.task_id, row.depends_on_id)
+        if pair in current_deps:
+            duplicate_deps.append(row.id)
+        else:
+            current_deps[pair] = row.id
+    if duplicate_deps:
+        changes['dependencies']['deleted'] += _delete_in(dep, dep.c.id, duplicate_deps)
+    _sync_pairs(dep, dep.c.task_id, dep.c.depends_on_id,
+                current_deps, set(dependencies), changes['dependencies'])
+
+    _sync_assignments(in_workspace, assignments, changes['assignments'])
+
+    # Status and date changes above were Core UPDATEs, which the milestone
+    # flush hook never sees.
+    refresh_milestone_statuses(task_ids=updated_tasks, project_ids=updated_projects)
+
     return project_by_name, tag_by_name, task_by_name
 
 
+def _sync_assignments(task_ids_query, assignments: list[tuple[int, int, bool]], counts: dict) -> None:
+    """Diff (task, person) assignments; a repeated person is lead if any entry is."""
+    at = TaskAssignment.__table__
+    desired: dict[tuple[int, int], bool] = {}
+    for task_id, person_id, is_lead in assignments:
+        desired[(task_id, person_id)] = desired.get((task_id, person_id), False) or is_lead
+
+    current: dict[tuple[int, int], tuple[int, bool]] = {}
+    stale = []
+    for row in db.session.execute(
+        select(at.c.id, at.c.task_id, at.c.person_id, at.c.is_lead).where(at.c.task_id.in_(task_ids_query))
+    ):
+        key = (row.task_id, row.person_id)
+        if key in current or key not in desired:
+            stale.append(row.id)
+        else:
+            current[key] = (row.id, bool(row.is_lead))
+
+    to_update = [{'_id': current[key][0], 'is_lead': is_lead}
+                 for key, is_lead in desired.items() if key in current and current[key][1] != is_lead]
+    to_insert = [{'task_id': task_id, 'person_id': person_id, 'is_lead': is_lead}
+                 for (task_id, person_id), is_lead in desired.items() if (task_id, person_id) not in current]
+
+    if stale:
+        _delete_in(at, at.c.id, stale)
+    if to_update:
+        db.session.execute(at.update().where(at.c.id == bindparam('_id')).values(is_lead=bindparam('is_lead')),
+                           to_update)
+    if to_insert:
+        db.session.execute(at.insert(), to_insert)
+    counts['deleted'] += len(stale)
+    counts['updated'] += len(to_update)
+    counts['inserted'] += len(to_insert)
+
+
+def print_sync_changes(changes: dict) -> None:
+    touched = False
+    for kind, counts in changes.items():
+        if any(counts.values()):
+            touched = True
+            print(f"  {kind}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                  f"{counts['deleted']} deleted")
+    if not touched:
+        print("  no changes")
+
+
 def main():
-    if len(sys.argv) < 2:
-        fail("Usage: python workspace_import.py <workspace_name> [input_dir]")
+    args = [a for a in sys.argv[1:] if a != '--sync']
+    sync = len(args) != len(sys.argv) - 1
+    if not args:
+        fail("Usage: python workspace_import.py <workspace_name> [input_dir] [--sync]")
 
-    workspace_name = sys.argv[1]
-    input_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else Path('import')
+    workspace_name = args[0]
+    input_dir = Path(args[1]) if len(args) > 1 else Path('import')
 
     plan_path = input_dir / 'plan.csv'
     people_path = input_dir / 'people.csv'
@@ -276,9 +650,25 @@ def main():
     app = create_app()
     with app.app_context():
         try:
+            existing = Workspace.query.filter_by(slug=slug, deleting_at=None).first()
+            if existing and sync:
+                changes = new_sync_changes()
+                if people_path.exists():
+                    _, person_by_name = sync_people_csv(people_path, existing.id, changes)
+                else:
+                    print(f"  (no people.csv found in {input_dir}, leaving teams/people unchanged)")
+                    person_by_name = {p.name: p for p in Person.query.filter_by(workspace_id=existing.id)}
+                sync_plan_csv(plan_path, existing.id, person_by_name, changes)
+                db.session.commit()
+
+                print(f"Synced workspace: {existing.name} ({slug})")
+                print_sync_changes(changes)
+                print("Done.")
+                return
+
             # Abort if workspace slug already taken
-            if Workspace.query.filter_by(slug=slug).first():
-                fail(f"Error: workspace with slug {slug!r} already exists")
+            if existing:
+                fail(f"Error: workspace with slug {slug!r} already exists (use --sync to update it)")
 
             # Create workspace
             ws = Workspace(name=workspace_name, slug=slug)
@@ -300,8 +690,9 @@ def main():
 
             db.session.commit()
 
-            # Count assignments and dependencies from task objects
-            assign_count = sum(len(t.assignments) for t in task_by_name.values())
+            assign_count = db.session.query(func.count(TaskAssignment.id)).join(
+                Task, TaskAssignment.task_id == Task.id
+            ).filter(Task.workspace_id == ws.id).scalar()
             dep_count = TaskDependency.query.join(
                 Task, TaskDependency.task_id == Task.id
             ).filter(Task.workspace_id == ws.id).count()